@@ -0,0 +1,41 @@
+"""Add category_facets table (Sidebar-Facetten für /results)
+
+Revision ID: 3c9d2a7e41b0
+Revises: fb68f32d0d51
+Create Date: 2026-10-17 09:12:04.118233
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3c9d2a7e41b0'
+down_revision: Union[str, Sequence[str], None] = 'fb68f32d0d51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    facets = op.create_table('category_facets',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # Backfill aus events.category (kommagetrennt, pro Event nur einmal zählen)
+    conn = op.get_bind()
+    counts = Counter()
+    for (raw,) in conn.execute(sa.text("SELECT category FROM events")):
+        cats = {c.strip() for c in (raw or "").split(",") if c.strip()}
+        counts.update(cats)
+    if counts:
+        op.bulk_insert(facets, [{"name": n, "count": c} for n, c in counts.items()])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('category_facets')
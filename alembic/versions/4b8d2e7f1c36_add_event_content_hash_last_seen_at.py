@@ -0,0 +1,31 @@
+"""Add events.content_hash + last_seen_at (No-op-Updates der Crawler überspringen)
+
+Revision ID: 4b8d2e7f1c36
+Revises: e3f1a6c8b925
+Create Date: 2026-10-17 17:48:03.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '4b8d2e7f1c36'
+down_revision: Union[str, Sequence[str], None] = 'e3f1a6c8b925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # kein Backfill: der nächste Crawl schreibt jedes Event einmal mit Hash
+    op.add_column('events', sa.Column('content_hash', sa.String(), nullable=True))
+    op.add_column('events', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('events') as batch:
+        batch.drop_column('last_seen_at')
+        batch.drop_column('content_hash')
@@ -0,0 +1,27 @@
+"""Add composite lat/lon index on events (Umkreissuche)
+
+Revision ID: 5e2c8b1f7a64
+Revises: d5b7f3a90c12
+Create Date: 2026-10-17 12:41:09.215873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5e2c8b1f7a64'
+down_revision: Union[str, Sequence[str], None] = 'd5b7f3a90c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_lat_lon', 'events', ['lat', 'lon'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_lat_lon', table_name='events')
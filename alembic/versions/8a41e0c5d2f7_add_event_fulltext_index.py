@@ -0,0 +1,72 @@
+"""Add full-text index on events (FTS5 / tsvector)
+
+Revision ID: 8a41e0c5d2f7
+Revises: 3c9d2a7e41b0
+Create Date: 2026-10-17 10:03:51.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8a41e0c5d2f7'
+down_revision: Union[str, Sequence[str], None] = '3c9d2a7e41b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        title, description, location,
+        content='events', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2"
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF title, description, location ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO events_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END""",
+    "INSERT INTO events_fts(events_fts) VALUES ('rebuild')",
+]
+
+# Umlaute falten (translate ist IMMUTABLE, unaccent nicht → in generierter Spalte erlaubt)
+_PG_FOLD = "translate(coalesce({col}, ''), 'ÄÖÜäöüß', 'AOUaous')"
+PG_UPGRADE = [
+    "ALTER TABLE events ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('german', {_PG_FOLD.format(col='title')}), 'A') || "
+    f"setweight(to_tsvector('german', {_PG_FOLD.format(col='location')}), 'B') || "
+    f"setweight(to_tsvector('german', {_PG_FOLD.format(col='description')}), 'C')"
+    ") STORED",
+    "CREATE INDEX ix_events_search_vector ON events USING GIN (search_vector)",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    stmts = SQLITE_UPGRADE if dialect == "sqlite" else PG_UPGRADE if dialect == "postgresql" else []
+    for stmt in stmts:
+        op.execute(sa.text(stmt))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for name in ("events_fts_ai", "events_fts_ad", "events_fts_au"):
+            op.execute(sa.text(f"DROP TRIGGER IF EXISTS {name}"))
+        op.execute(sa.text("DROP TABLE IF EXISTS events_fts"))
+    elif dialect == "postgresql":
+        op.execute(sa.text("DROP INDEX IF EXISTS ix_events_search_vector"))
+        op.execute(sa.text("ALTER TABLE events DROP COLUMN IF EXISTS search_vector"))
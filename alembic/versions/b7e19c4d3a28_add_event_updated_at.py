@@ -0,0 +1,35 @@
+"""Add events.updated_at (Validator für ETag/Last-Modified)
+
+Revision ID: b7e19c4d3a28
+Revises: 5e2c8b1f7a64
+Create Date: 2026-10-17 14:05:12.318842
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b7e19c4d3a28'
+down_revision: Union[str, Sequence[str], None] = '5e2c8b1f7a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Bestand: Zeitpunkt der Migration (typisierter Bind → gleiches Format wie das ORM)
+    stmt = sa.text("UPDATE events SET updated_at = :now").bindparams(
+        sa.bindparam("now", type_=sa.DateTime())
+    )
+    op.get_bind().execute(stmt, {"now": datetime.utcnow()})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('events') as batch:
+        batch.drop_column('updated_at')
@@ -0,0 +1,81 @@
+"""Add typed start_at/end_at to events (+ Backfill aus events.date)
+
+Revision ID: d5b7f3a90c12
+Revises: 8a41e0c5d2f7
+Create Date: 2026-10-17 11:20:37.664310
+
+"""
+import re
+from datetime import datetime
+from typing import Optional, Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd5b7f3a90c12'
+down_revision: Union[str, Sequence[str], None] = '8a41e0c5d2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOCAL_TZ = ZoneInfo("Europe/Berlin")
+
+
+def _parse(raw: Optional[str]) -> Optional[datetime]:
+    """Eingefrorene Kopie der Parse-Logik aus app.parse_event_datetime (Stand dieser Migration)."""
+    s = (raw or "").strip()
+    if not s:
+        return None
+    if "T" in s:
+        try:
+            dt = datetime.fromisoformat(s)
+            return dt.astimezone(LOCAL_TZ).replace(tzinfo=None) if dt.tzinfo else dt
+        except ValueError:
+            pass
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%d.%m.%Y %H:%M", "%d.%m.%Y"):
+        try:
+            dt = datetime.strptime(s.replace(" Uhr", ""), fmt)
+            return dt.replace(hour=9, minute=0) if fmt in ("%Y-%m-%d", "%d.%m.%Y") else dt
+        except ValueError:
+            continue
+    m = re.findall(r"\d+", s)
+    if len(m) >= 3:
+        try:
+            if "-" in s:
+                y, mo, d = m[:3]
+            else:
+                d, mo, y = m[:3]
+                y = "20" + y if len(y) == 2 else y
+            return datetime(int(y), int(mo), int(d), 9, 0)
+        except ValueError:
+            pass
+    return None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('start_at', sa.DateTime(), nullable=True))
+    op.add_column('events', sa.Column('end_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_events_start_at', 'events', ['start_at'])
+    op.create_index('ix_events_end_at', 'events', ['end_at'])
+
+    # Backfill: String einmal parsen, danach nie wieder beim Rendern
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, date FROM events WHERE date IS NOT NULL")).all()
+    updates = [{"id": i, "start_at": dt} for i, raw in rows if (dt := _parse(raw))]
+    if updates:
+        # typisierter Bind → gleiches Speicherformat wie das ORM (wichtig für Vergleiche in SQLite)
+        stmt = sa.text("UPDATE events SET start_at = :start_at WHERE id = :id").bindparams(
+            sa.bindparam("start_at", type_=sa.DateTime())
+        )
+        conn.execute(stmt, updates)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_end_at', table_name='events')
+    op.drop_index('ix_events_start_at', table_name='events')
+    with op.batch_alter_table('events') as batch:
+        batch.drop_column('end_at')
+        batch.drop_column('start_at')
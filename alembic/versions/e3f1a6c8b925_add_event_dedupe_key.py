@@ -0,0 +1,64 @@
+"""Add events.dedupe_key (natürlicher Schlüssel der Crawler, unique)
+
+Revision ID: e3f1a6c8b925
+Revises: b7e19c4d3a28
+Create Date: 2026-10-17 16:22:48.907314
+
+"""
+import hashlib
+import re
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e3f1a6c8b925'
+down_revision: Union[str, Sequence[str], None] = 'b7e19c4d3a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _norm(s) -> str:
+    return re.sub(r"\s+", " ", str(s or "")).strip().casefold()
+
+
+def _dedupe_key(title, source_name, start_at: Optional[datetime]) -> Optional[str]:
+    """Eingefrorene Kopie von event_bulk.dedupe_key (Stand dieser Migration)."""
+    t, src = _norm(title), _norm(source_name)
+    if not t or not src:
+        return None
+    start = start_at.isoformat(timespec="minutes") if start_at else ""
+    return hashlib.sha1(f"{src}|{t}|{start}".encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('dedupe_key', sa.String(), nullable=True))
+
+    # Backfill nur für Events mit Quelle (Crawler/Importe). Vorhandene Dubletten:
+    # das älteste Event bekommt den Schlüssel, die übrigen bleiben NULL.
+    conn = op.get_bind()
+    stmt = sa.text(
+        "SELECT id, title, source_name, start_at FROM events WHERE source_name IS NOT NULL ORDER BY id"
+    ).columns(sa.column("id", sa.Integer()), sa.column("title", sa.String()),
+              sa.column("source_name", sa.String()), sa.column("start_at", sa.DateTime()))
+    seen = set()
+    updates = []
+    for event_id, title, source_name, start_at in conn.execute(stmt):
+        key = _dedupe_key(title, source_name, start_at)
+        if key and key not in seen:
+            seen.add(key)
+            updates.append({"id": event_id, "key": key})
+    if updates:
+        conn.execute(sa.text("UPDATE events SET dedupe_key = :key WHERE id = :id"), updates)
+
+    op.create_index('ux_events_dedupe_key', 'events', ['dedupe_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_events_dedupe_key', table_name='events')
+    with op.batch_alter_table('events') as batch:
+        batch.drop_column('dedupe_key')
@@ -0,0 +1,157 @@
+# api.py
+"""
+Lese-API unter /api (Traefik routet PathPrefix(`/api`) auf diese App).
+
+    GET /api/events              gleiche Filter wie /results (q, location, radius, cats[], free, …)
+                                 + cursor, limit, fields=id,title,start_at
+                                 + format=ndjson → alle Treffer als Stream (eine Zeile pro Event)
+    GET /api/events/<id>         einzelnes Event (fields= ebenfalls möglich)
+    GET /api/facets              Kategorien mit Anzahl
+    GET /api/map/clusters        Marker-Cluster für die Karte: bbox=west,south,east,north&zoom=z
+                                 + dieselben Filter wie /events
+
+JSON-Antworten tragen ein ETag; bei passendem If-None-Match kommt 304.
+"""
+from __future__ import annotations
+import json
+from datetime import date, datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from db import SessionLocal as Session
+from models import Event
+from event_search import (
+    SearchParams, InvalidCursor, decode_cursor, fetch_page, PAGE_SIZE, MAX_PAGE_SIZE
+)
+import result_cache
+import facets
+import map_clusters
+
+api = Blueprint("api", __name__, url_prefix="/api")
+
+EVENT_FIELDS = (
+    "id", "title", "description", "start_at", "end_at", "location", "maps_url",
+    "category", "image_url", "source_url", "source_name", "lat", "lon", "price",
+    "is_free", "is_outdoor", "is_always_open", "age_group",
+)
+NDJSON_BATCH = MAX_PAGE_SIZE
+
+
+class BadFields(ValueError):
+    pass
+
+
+# ---------------------------------- Helfer -----------------------------------
+def _parse_fields(raw):
+    if not raw:
+        return EVENT_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in EVENT_FIELDS and f != "distance_km"]
+    if unknown:
+        raise BadFields(f"Unbekannte Felder: {', '.join(unknown)}")
+    return fields or EVENT_FIELDS
+
+def _json_value(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+def serialize_event(ev: Event, fields=EVENT_FIELDS) -> dict:
+    out = {f: _json_value(getattr(ev, f, None)) for f in fields}
+    if getattr(ev, "distance_km", None) is not None and "distance_km" not in out:
+        out["distance_km"] = ev.distance_km
+    return out
+
+def _conditional_json(payload):
+    resp = jsonify(payload)
+    resp.add_etag()
+    return resp.make_conditional(request)
+
+
+# ---------------------------------- Routen -----------------------------------
+@api.get("/events")
+def events_list():
+    try:
+        fields = _parse_fields(request.args.get("fields"))
+    except BadFields as e:
+        return jsonify({"error": str(e)}), 400
+    params = SearchParams.from_args(request.args)
+
+    if request.args.get("format") == "ndjson":
+        return _events_ndjson(params, fields, request.args.get("cursor"))
+
+    s = Session()
+    try:
+        try:
+            events, next_cursor = result_cache.fetch_page(
+                s, params, request.args.get("cursor"),
+                limit=request.args.get("limit", type=int) or PAGE_SIZE)
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        return _conditional_json({
+            "items": [serialize_event(e, fields) for e in events],
+            "next_cursor": next_cursor,
+        })
+    finally:
+        s.close()
+
+def _events_ndjson(params, fields, cursor):
+    """Alle Treffer als NDJSON – intern seitenweise per Keyset, der Speicher bleibt konstant."""
+    def generate():
+        s = Session()
+        try:
+            cur = cursor
+            while True:
+                events, cur = fetch_page(s, params, cur, limit=NDJSON_BATCH)
+                for e in events:
+                    yield json.dumps(serialize_event(e, fields), ensure_ascii=False) + "\n"
+                s.expunge_all()
+                if not cur:
+                    break
+        finally:
+            s.close()
+
+    try:
+        decode_cursor(cursor)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@api.get("/events/<int:event_id>")
+def event_get(event_id):
+    try:
+        fields = _parse_fields(request.args.get("fields"))
+    except BadFields as e:
+        return jsonify({"error": str(e)}), 400
+    s = Session()
+    try:
+        ev = s.get(Event, event_id)
+        if not ev:
+            return jsonify({"error": "Event nicht gefunden"}), 404
+        return _conditional_json(serialize_event(ev, fields))
+    finally:
+        s.close()
+
+@api.get("/facets")
+def facets_list():
+    s = Session()
+    try:
+        return _conditional_json({
+            "categories": [{"name": n, "count": c} for n, c in facets.get_category_facets(s)],
+        })
+    finally:
+        s.close()
+
+@api.get("/map/clusters")
+def map_cluster_list():
+    try:
+        bbox = map_clusters.parse_bbox(request.args.get("bbox"))
+    except ValueError:
+        return jsonify({"error": "bbox erwartet west,south,east,north"}), 400
+    zoom = request.args.get("zoom", default=6, type=int)
+    params = SearchParams.from_args(request.args)
+    s = Session()
+    try:
+        return _conditional_json(map_clusters.clusters_for(s, params, zoom, bbox))
+    finally:
+        s.close()
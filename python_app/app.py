@@ -14,7 +14,8 @@ import io
 import shutil
 import subprocess
 import uuid
-from datetime import datetime, date
+import hashlib
+from datetime import datetime, date, timedelta, timezone
 from urllib.parse import quote, urlparse
 
 from dotenv import load_dotenv
@@ -26,23 +27,30 @@ if os.getenv("FLASK_ENV") == "development":
 # Flask & Erweiterungen
 from flask import (
     Flask, render_template, request, redirect, url_for, flash, jsonify,
-    send_file, abort, g
+    send_file, abort, g, Response, stream_with_context
 )
 from flask_login import (
     LoginManager, login_user, logout_user, login_required, current_user
 )
 from werkzeug.utils import secure_filename
+from werkzeug.http import is_resource_modified
 from werkzeug.middleware.proxy_fix import ProxyFix
 from decimal import Decimal, InvalidOperation
 # Datenbank & Models
-from sqlalchemy import cast, String, or_
 from sqlalchemy.exc import SQLAlchemyError
 from db import engine, SessionLocal
 from models import Event, User
+import facets
+import user_cache
+from event_search import SearchParams, InvalidCursor, PAGE_SIZE
+from result_cache import fetch_page
 
 # OCR & Bildverarbeitung
 from PIL import Image
-from ocr_utils import extract_event_fields_from_path
+import ocr_jobs
+import upload_store
+import event_bulk
+from event_fields import LOCAL_TZ, parse_event_datetime
 import pytesseract
 try:
     from pdf2image import convert_from_path
@@ -66,15 +74,24 @@ UPLOAD_FOLDER = os.getenv("UPLOAD_DIR", os.path.join("static", "uploads"))
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 ALLOWED_EXT = {".jpg", ".jpeg", ".png", ".pdf", ".webp"}
+BULK_MAX_CANDIDATES = 100   # Termine pro Flyer bei /event-erstellen/bulk
 
 # Stripe-Konfig
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_PRICE_ID = os.getenv("STRIPE_PRICE_ID", "price_ABC123")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 
-# Session-Alias
+# Session-Alias – scoped_session: eine Session pro Request (Thread), am Ende entfernt
 Session = SessionLocal
 
+@app.teardown_appcontext
+def remove_session(exc=None):
+    SessionLocal.remove()
+
+# JSON-API (/api/…)
+from api import api as api_blueprint
+app.register_blueprint(api_blueprint)
+
 # =========================================================
 # 🔐 Login-Manager
 # =========================================================
@@ -84,11 +101,9 @@ login_manager.login_view = "login"
 
 @login_manager.user_loader
 def load_user(user_id):
-    s = Session()
-    try:
-        return s.get(User, int(user_id))
-    finally:
-        s.close()
+    # Request-Session wiederverwenden (nicht schließen – die Route arbeitet damit weiter);
+    # Identität + Premium-Flag kommen meist aus dem kurzlebigen user_cache
+    return user_cache.load_user(Session(), user_id)
 
 # =========================================================
 # 🌐 Sprache & Übersetzungen
@@ -154,39 +169,6 @@ def format_event_datetime(date_raw):
         return "Datum unbekannt"
 
 
-def parse_event_datetime(date_raw):
-    if isinstance(date_raw, datetime):
-        return date_raw
-    if isinstance(date_raw, str):
-        s = date_raw.strip()
-        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%d.%m.%Y %H:%M", "%d.%m.%Y"):
-            try:
-                dt = datetime.strptime(s.replace(" Uhr", ""), fmt)
-                # Falls nur Datum ohne Zeit → 09:00 annehmen
-                if fmt in ("%Y-%m-%d", "%d.%m.%Y"):
-                    dt = dt.replace(hour=9, minute=0)
-                return dt
-            except ValueError:
-                continue
-        # Fallback: Zahlen aus String ziehen (yyyy-mm-dd)
-        m = re.findall(r"\d+", s)
-        if len(m) >= 3:
-            if "-" in s:  # ISO-ähnlich
-                y, mo, d = m[:3]
-                try:
-                    return datetime(int(y), int(mo), int(d), 9, 0)
-                except Exception:
-                    pass
-            else:  # dd.mm.yyyy
-                d, mo, y = m[:3]
-                try:
-                    if len(y) == 2:
-                        y = "20" + y
-                    return datetime(int(y), int(mo), int(d), 9, 0)
-                except Exception:
-                    pass
-    return None
-
 def _guess_year(month: int) -> int:
     today = date.today()
     return today.year + (1 if month < today.month else 0)
@@ -196,26 +178,6 @@ def _norm_time(s: str) -> str:
     m = re.match(r"(\d{1,2})[:h\.]?(\d{2})?", s)
     return f"{int(m.group(1)):02d}:{int(m.group(2) or 0):02d}" if m else ""
 
-def _to_float(val):
-    if val is None or val == "":
-        return None
-    try:
-        return float(str(val).replace(",", "."))
-    except Exception:
-        return None
-
-def _to_bool(val):
-    if isinstance(val, bool):
-        return val
-    if val is None:
-        return None
-    v = str(val).strip().lower()
-    if v in ("1", "true", "wahr", "ja", "yes", "on"):
-        return True
-    if v in ("0", "false", "falsch", "nein", "no", "off"):
-        return False
-    return None
-
 @app.template_filter('priceformat')
 def priceformat(value):
     x = _to_number(value)
@@ -254,8 +216,15 @@ def extract_text_from_file(path: str) -> str:
         img = Image.open(path).convert("L")
         return pytesseract.image_to_string(img, lang="deu+eng")
     elif ext == ".pdf" and PDF_ENABLED:
-        pages = convert_from_path(path, dpi=200, fmt="png")
-        return "\n".join(pytesseract.image_to_string(p, lang="deu+eng") for p in pages[:3])
+        # nur die ersten 3 Seiten, jeweils einzeln rastern (nicht das ganze PDF im Speicher)
+        texts = []
+        for n in range(1, 4):
+            pages = convert_from_path(path, dpi=200, fmt="png", first_page=n, last_page=n)
+            if not pages:
+                break
+            texts.append(pytesseract.image_to_string(pages[0], lang="deu+eng"))
+            pages[0].close()
+        return "\n".join(texts)
     else:
         raise ValueError("Nur Bilder oder PDFs unterstützt.")
 
@@ -322,106 +291,137 @@ def index():
 def suchergebnisse():
     s = Session()  # <- bei dir Alias auf SessionLocal
     try:
-        # --- alte Parameter (kompatibel halten) ---
-        query_legacy     = (request.args.get("q", "") or request.args.get("query", "")).strip()
-        location_filter  = request.args.get("location", "").strip()
-        category_filter  = request.args.get("category", "").strip()
-        date_filter      = request.args.get("date", "").strip()
-
-        # --- neue Parameter ---
-        q       = query_legacy
-        cats    = request.args.getlist("cats[]")      # Mehrfachkategorien
-        free    = request.args.get("free") == "1"
-        outdoor = request.args.get("outdoor") == "1"
-        always  = request.args.get("always") == "1"
-
-        # --- Kategorienliste für die Sidebar (aus DB, kommagetrennt auflösen) ---
-        all_events = s.query(Event).all()
-        cat_set = set()
-        for ev in all_events:
-            if ev.category:
-                for c in str(ev.category).split(","):
-                    c = c.strip()
-                    if c:
-                        cat_set.add(c)
-        categories = sorted(cat_set)
-
-        # --- Query aufbauen ---
-        qset = s.query(Event)
-
-        if q:
-            like = f"%{q}%"
-            qset = qset.filter(
-                (Event.title.ilike(like)) |
-                (Event.description.ilike(like)) |
-                (Event.location.ilike(like))
-            )
-
-        # kompatibel zu alten Einzel-Filtern
-        if location_filter:
-            qset = qset.filter(Event.location.ilike(f"%{location_filter}%"))
-
-        # einzelner Kategorienfilter (alt)
-        if category_filter:
-            qset = qset.filter(Event.category.ilike(f"%{category_filter}%"))
-
-        # mehrere Kategorien (neu)
-        if cats:
-            cat_filters = [Event.category.ilike(f"%{c.strip()}%") for c in cats if c.strip()]
-            qset = qset.filter(or_(*cat_filters))
-
-        # Datum: prefix-match auf ISO/String
-        if date_filter:
-            # Event.date ist bei dir String – auf Nummer sicher casten
-            qset = qset.filter(cast(Event.date, String).like(f"{date_filter}%"))
-
-        # Flags
-        if free:
-            qset = qset.filter((Event.is_free == True) | (Event.price == 0))
-        if outdoor and hasattr(Event, "is_outdoor"):
-            qset = qset.filter(Event.is_outdoor == True)
-        if always and hasattr(Event, "is_always_open"):
-            qset = qset.filter(Event.is_always_open == True)
-
-        events = qset.order_by(Event.date.asc()).all()
-        
-        coords = [
-    {
-        "lat": e.lat,
-        "lon": e.lon,
-        "title": e.title,
-        "date": e.date.isoformat() if hasattr(e.date, "isoformat") else str(e.date),
-        "id": e.id
-    }
-    for e in events if e.lat and e.lon
-]
-
-        return render_template("results.html", events=events, coords=coords,
-            query=q,
-            location_filter=location_filter,
-            category_filter=category_filter,
-            date_filter=date_filter,
+        params = SearchParams.from_args(request.args)
+
+        # --- Kategorienliste für die Sidebar (gepflegte Facetten, im Speicher gecacht) ---
+        categories = facets.get_categories(s)
+
+        # --- erste Seite (Keyset), der Rest kommt per /results/more ---
+        try:
+            events, next_cursor = fetch_page(s, params, request.args.get("cursor"))
+        except InvalidCursor:
+            abort(400)
+
+        return render_template("results.html", events=events,
+            next_cursor=next_cursor,
+            query=params.q,
+            location_filter=params.location,
+            category_filter=params.category,
+            date_filter=params.date,
+            when=params.when,
             # Für die Sidebar:
             categories=categories,
         )
     finally:
         s.close()
 
+@app.route("/results/more")
+def suchergebnisse_mehr():
+    """Nächste Seite für Infinite-Scroll: HTML-Fragment (Default) oder JSON (?format=json).
+       Der Cursor für die Folgeseite steht im Header X-Next-Cursor bzw. in next_cursor."""
+    s = Session()
+    try:
+        params = SearchParams.from_args(request.args)
+        try:
+            events, next_cursor = fetch_page(s, params, request.args.get("cursor"),
+                                             limit=request.args.get("limit", type=int) or PAGE_SIZE)
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+
+        if request.args.get("format") == "json":
+            return jsonify({"items": [_event_card_dict(e) for e in events], "next_cursor": next_cursor})
+
+        resp = app.make_response(render_template("result_cards.html", events=events))
+        if next_cursor:
+            resp.headers["X-Next-Cursor"] = next_cursor
+        return resp
+    finally:
+        s.close()
+
+def _event_card_dict(e):
+    return {
+        "id": e.id,
+        "title": e.title,
+        "start_at": e.start_at.isoformat() if e.start_at else None,
+        "location": e.location,
+        "description": (e.description or "")[:300],
+        "image_url": e.image_url,
+        "category": e.category,
+        "price": e.price,
+        "is_free": e.is_free,
+        "is_outdoor": e.is_outdoor,
+        "age_group": e.age_group,
+        "lat": e.lat,
+        "lon": e.lon,
+        "url": url_for("event_detail", event_id=e.id),
+    }
+
+
+# ----- HTTP-Validatoren (ETag / Last-Modified) -----
+# Ändert sich mit jedem Deploy → neue Templates ergeben neue ETags
+APP_VERSION = os.getenv("APP_VERSION") or str(int(os.path.getmtime(__file__)))
+DETAIL_MAX_AGE = int(os.getenv("DETAIL_MAX_AGE", "300"))
+
+def _event_validators(s, event_id, kind, personal=False):
+    """(etag, last_modified) aus events.updated_at – ohne das Event komplett zu laden."""
+    row = s.query(Event.updated_at, Event.start_at, Event.date).filter(Event.id == event_id).first()
+    if row is None:
+        abort(404)
+    updated_at, start_at, raw_date = row
+    parts = [kind, str(event_id), updated_at.isoformat() if updated_at else "-", APP_VERSION, g.lang]
+    if personal:
+        # Header zeigt Login-Status → eigene Variante je Nutzer
+        parts.append(f"u{current_user.get_id()}" if current_user.is_authenticated else "anon")
+    if not start_at and not raw_date:
+        parts.append(date.today().isoformat())   # Fallback-Datum hängt vom Tag ab
+    etag = hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+    last_modified = updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+    return etag, last_modified
+
+def _not_modified(etag, last_modified):
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+def _with_validators(resp, etag, last_modified, public=True, personal=False):
+    """personal: Inhalt hängt am Login (ETag mit Nutzer) – auch die anonyme
+       Variante wird bei jedem Aufruf per ETag geprüft, sonst sähe man nach dem
+       Login noch bis zu DETAIL_MAX_AGE die Seite ohne Login."""
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = last_modified
+    if personal:
+        resp.vary.add("Cookie")
+    if public:
+        resp.cache_control.public = True
+        resp.cache_control.max_age = 0 if personal else DETAIL_MAX_AGE
+        if personal:
+            resp.cache_control.must_revalidate = True
+    else:
+        resp.cache_control.private = True
+        resp.cache_control.no_cache = True
+        resp.vary.add("Cookie")
+    return resp
 
 @app.route("/event/<int:event_id>")
 def event_detail(event_id):
     s = Session()
     try:
-        event = s.query(Event).get(event_id)
+        public = not current_user.is_authenticated
+        etag, last_modified = _event_validators(s, event_id, "html", personal=True)
+        if _not_modified(etag, last_modified):
+            return _with_validators(app.response_class(status=304), etag, last_modified, public, personal=True)
+
+        event = s.get(Event, event_id)
         if not event:
             abort(404)
-        readable_date = format_event_datetime(event.date)
+        # start_at ist schon geparst – String nur noch für Alt-Daten ohne Backfill
+        dt = event.start_at or parse_event_datetime(event.date)
+        readable_date = format_event_datetime(dt)
 
-        # Google Calendar (Bei String-Datum: 1h Event ab 09:00)
-        dt = parse_event_datetime(event.date)
+        # Google Calendar (ohne Ende: 1h Event)
         if dt:
+            end_dt = event.end_at if event.end_at and event.end_at > dt else dt + timedelta(hours=1)
             start = dt.strftime("%Y%m%dT%H%M%SZ")
-            end = (dt.replace(hour=dt.hour + 1 if dt.hour < 23 else dt.hour, minute=dt.minute)).strftime("%Y%m%dT%H%M%SZ")
+            end = end_dt.strftime("%Y%m%dT%H%M%SZ")
         else:
             today = datetime.utcnow()
             start = today.strftime("%Y%m%dT090000Z")
@@ -436,8 +436,9 @@ def event_detail(event_id):
             f"&location={quote(event.location or '')}"
         )
 
-        return render_template("event.html", event=event, readable_date=readable_date,
-                               google_calendar_url=google_calendar_url)
+        resp = app.make_response(render_template("event.html", event=event, readable_date=readable_date,
+                                                 google_calendar_url=google_calendar_url))
+        return _with_validators(resp, etag, last_modified, public, personal=True)
     finally:
         s.close()
 
@@ -445,24 +446,33 @@ def event_detail(event_id):
 def download_ics(event_id):
     s = Session()
     try:
-        event = s.query(Event).get(event_id)
+        etag, last_modified = _event_validators(s, event_id, "ics")
+        if _not_modified(etag, last_modified):
+            return _with_validators(app.response_class(status=304), etag, last_modified)
+
+        event = s.get(Event, event_id)
         if not event:
             abort(404)
         cal = Calendar()
         e = ICS_Event()
         e.name = event.title
-        dt = parse_event_datetime(event.date) or datetime.utcnow()
-        e.begin = dt
-        e.duration = {"hours": 1}
+        dt = event.start_at or parse_event_datetime(event.date) or datetime.utcnow()
+        e.begin = dt.replace(tzinfo=LOCAL_TZ)
+        if event.end_at and event.end_at > dt:
+            e.end = event.end_at.replace(tzinfo=LOCAL_TZ)
+        else:
+            e.duration = {"hours": 1}
         e.description = (event.description or "")[:1800]
         e.location = event.location or ""
         cal.events.add(e)
 
         file = io.StringIO(str(cal))
-        return send_file(io.BytesIO(file.getvalue().encode("utf-8")),
+        resp = send_file(io.BytesIO(file.getvalue().encode("utf-8")),
                          mimetype="text/calendar",
                          as_attachment=True,
-                         download_name=f"{(event.title or 'event').strip().replace(' ','_')}.ics")
+                         download_name=f"{(event.title or 'event').strip().replace(' ','_')}.ics",
+                         etag=False, max_age=DETAIL_MAX_AGE)
+        return _with_validators(resp, etag, last_modified)
     finally:
         s.close()
 
@@ -475,43 +485,15 @@ def event_erstellen():
         return render_template("event-erstellen.html")
 
     # POST → Speichern in DB (manuell oder via OCR-prefilled)
+    # Spaltenwerte wie beim Bulk-Endpoint (event_bulk.candidate_to_row) – gleiche Eingabe, gleiches Event;
+    # image_url kommt vom OCR-Upload (static/uploads/ab/cd/<sha256>.ext)
     data = request.form.to_dict()
 
-    date_str = (data.get('date') or '').strip()
-    time_str = (data.get('time') or '').strip()
-    if time_str and 'Uhr' not in time_str:
-        time_str = time_str + ' Uhr'
-    date_combined = f"{date_str} {time_str}".strip() if (date_str or time_str) else None
-
-    source_url = (data.get('source_url') or '').strip() or None
-    source_name = (data.get('source_name') or '').strip() or None
-    if not source_name and source_url:
-        try:
-            host = urlparse(source_url).netloc
-            source_name = host.replace('www.', '') if host else None
-        except Exception:
-            pass
-
     s = Session()
     try:
-        event = Event(
-            title=data.get('title'),
-            description=data.get('description'),
-            date=date_combined,
-            image_url=data.get('image_url'),   # vom OCR-Upload (static/uploads/uuid.ext)
-            location=data.get('location'),
-            maps_url=data.get('maps_url'),
-            category=data.get('category') or "Unbekannt",
-            source_url=source_url,
-            source_name=source_name,
-            lat=_to_float(data.get('lat')),
-            lon=_to_float(data.get('lon')),
-            price=_to_float(data.get('price')),
-            is_free=_to_bool(data.get('is_free')),
-            is_outdoor=_to_bool(data.get('is_outdoor')),
-            age_group=data.get('age_group')
-        )
+        event = Event(**event_bulk.candidate_to_row(data))
         s.add(event)
+        facets.record_category_change(s, None, event.category)
         s.commit()
         flash("🎉 Event gespeichert", "success")
         return redirect(url_for("event_detail", event_id=event.id))
@@ -522,19 +504,59 @@ def event_erstellen():
     finally:
         s.close()
 
+def _stored_upload_url(url):
+    """image_url aus dem OCR-Upload prüfen: muss auf eine vorhandene Datei in UPLOAD_FOLDER zeigen."""
+    prefix = url_for("static", filename="uploads/")
+    if not isinstance(url, str) or not url.startswith(prefix) or ".." in url:
+        return None
+    path = os.path.join(app.config["UPLOAD_FOLDER"], *url[len(prefix):].split("/"))
+    return url if os.path.isfile(path) else None
+
+@app.post("/event-erstellen/bulk")
+def event_erstellen_bulk():
+    """Mehrere geprüfte Kandidaten eines Flyers (ein Event pro Termin) in EINER Transaktion.
+       Body (JSON): {"image_url": "/static/uploads/ab/cd/<sha256>.jpg", "candidates": [{title, date, time, …}, …]}
+       Alle Events teilen sich das Bild. Antwort 201: {"ok": true, "ids": [...], "urls": [...]}"""
+    data = request.get_json(silent=True) or {}
+    candidates = data.get("candidates")
+    if not isinstance(candidates, list) or not candidates or not all(isinstance(c, dict) for c in candidates):
+        return jsonify({"error": "candidates: Liste von Events erwartet"}), 400
+    if len(candidates) > BULK_MAX_CANDIDATES:
+        return jsonify({"error": f"Höchstens {BULK_MAX_CANDIDATES} Termine auf einmal"}), 400
+    untitled = [i for i, c in enumerate(candidates) if not str(c.get("title") or "").strip()]
+    if untitled:
+        return jsonify({"error": "Titel fehlt", "candidates": untitled}), 400
+
+    image_url = None
+    if data.get("image_url"):
+        image_url = _stored_upload_url(data["image_url"])
+        if image_url is None:
+            return jsonify({"error": "Unbekanntes Bild"}), 400
+
+    s = Session()
+    try:
+        ids = event_bulk.insert_candidates(s, candidates, image_url=image_url)
+        s.commit()
+    except SQLAlchemyError as e:
+        s.rollback()
+        return jsonify({"error": f"DB-Fehler: {str(e)}"}), 500
+    finally:
+        s.close()
+    return jsonify({"ok": True, "ids": ids,
+                    "urls": [url_for("event_detail", event_id=i) for i in ids]}), 201
+
 # =========================================================
 # 🖼️ OCR Upload (neuer Endpoint) + Legacy-Fallback
 # =========================================================
 def _save_upload_return_path(file_storage):
+    """Inhaltsadressiert speichern (uploads/ab/cd/<sha256>.ext) – gleicher Flyer = gleiche Datei.
+       Rückgabe: ((dest_path, public_url, sha256), None) oder ((None, None, None), fehler)."""
     ext = os.path.splitext(file_storage.filename)[1].lower()
     if ext not in ALLOWED_EXT:
-        return None, "Nur JPG/PNG/PDF erlaubt"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    safe = secure_filename(fname)
-    dest_path = os.path.join(app.config["UPLOAD_FOLDER"], safe)
-    file_storage.save(dest_path)
-    public_url = url_for("static", filename=f"uploads/{safe}", _external=False)
-    return (dest_path, public_url), None
+        return (None, None, None), "Nur JPG/PNG/PDF erlaubt"
+    stored = upload_store.save_file_storage(file_storage, app.config["UPLOAD_FOLDER"])
+    public_url = url_for("static", filename=f"uploads/{stored.relpath}", _external=False)
+    return (stored.path, public_url, stored.sha256), None
 
 @app.route("/ocr/upload", methods=["POST"])
 def ocr_upload_new():
@@ -542,25 +564,67 @@ def ocr_upload_new():
     if not file or file.filename == "":
         return jsonify({"error": "Keine Datei übermittelt"}), 400
 
-    (dest_path, public_url), err = _save_upload_return_path(file)
+    (dest_path, public_url, content_hash), err = _save_upload_return_path(file)
     if err:
         return jsonify({"error": err}), 400
 
+    # Flyer schon bekannt → Ergebnis aus dem OCR-Cache, ohne Job und ohne Tesseract
+    cached = ocr_jobs.cached_result(content_hash, public_url)
+    if cached:
+        return jsonify({"ok": True, "cached": True, **cached})
+
+    # OCR läuft im Prozess-Pool (ocr_jobs) – hier nur Job anlegen und sofort antworten
     try:
-        ocr = extract_event_fields_from_path(dest_path)
+        job = ocr_jobs.submit(dest_path, image_url=public_url, content_hash=content_hash)
+    except ocr_jobs.QueueFull as e:
+        return _ocr_busy(e)
     except Exception as e:
         return jsonify({"error": f"OCR fehlgeschlagen: {str(e)}"}), 500
 
-    ocr.fields["image_url"] = public_url
+    return _ocr_accepted(job, public_url)
 
-    return jsonify({
+def _ocr_accepted(job, public_url):
+    """202 mit Job-Infos; Client pollt status_url (events_url nur mit OCR_SSE)."""
+    body = {
         "ok": True,
+        "job_id": job["id"],
+        "status": job["status"],
         "image_url": public_url,
-        "fields": ocr.fields,
-        "found": ocr.found,
-        "missing": ocr.missing,
-        "confidence": ocr.confidence
-    })
+        "status_url": url_for("ocr_job_status", job_id=job["id"]),
+    }
+    if ocr_jobs.OCR_SSE:
+        body["events_url"] = url_for("ocr_job_events", job_id=job["id"])
+    return jsonify(body), 202
+
+def _ocr_busy(e):
+    resp = jsonify({"error": str(e), "retry_after": 5})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = "5"
+    return resp
+
+@app.get("/ocr/jobs/<job_id>")
+def ocr_job_status(job_id):
+    """Status + Ergebnis eines OCR-Jobs (result = fields/found/missing/confidence/candidates)."""
+    try:
+        job = ocr_jobs.get_job(job_id)
+    except ValueError:
+        job = None
+    if not job:
+        return jsonify({"error": "Job nicht gefunden"}), 404
+    resp = jsonify(job)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+@app.get("/ocr/jobs/<job_id>/events")
+def ocr_job_events(job_id):
+    """Fortschritt als Server-Sent Events (queued → running → done|error).
+       Jede Antwort endet nach OCR_SSE_MAX_SEC, EventSource verbindet neu."""
+    if not ocr_jobs.JOB_ID_RE.match(job_id):
+        return jsonify({"error": "Job nicht gefunden"}), 404
+    resp = Response(stream_with_context(ocr_jobs.stream(job_id)), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-store"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 @app.route("/ocr-upload", methods=["POST"])
 def ocr_upload_legacy():
@@ -569,15 +633,30 @@ def ocr_upload_legacy():
     if not file or file.filename == "":
         return jsonify({"error": "Keine Datei erhalten."}), 400
 
-    (dest_path, public_url), err = _save_upload_return_path(file)
+    (dest_path, public_url, content_hash), err = _save_upload_return_path(file)
     if err:
         return jsonify({"error": err}), 400
 
-    # Erst neuer OCR-Versuch (feldernormiert). Falls etwas schiefgeht, Legacy-Text-Parsing.
+    # Erst neuer OCR-Versuch (feldernormiert, im Prozess-Pool). Falls etwas schiefgeht, Legacy-Text-Parsing.
+    # Alt-Clients kennen keine Jobs → kurz auf das Ergebnis warten (der Request-Thread rechnet
+    # nicht selbst); dauert es länger, wie /ocr/upload mit der Job-ID antworten statt den Thread zu belegen.
+    result = ocr_jobs.cached_result(content_hash, public_url)
+    if result is None:
+        try:
+            job = ocr_jobs.submit(dest_path, image_url=public_url, content_hash=content_hash)
+        except ocr_jobs.QueueFull as e:
+            return _ocr_busy(e)
+        except Exception:
+            job = None
+        if job:
+            job = ocr_jobs.wait(job["id"], timeout=ocr_jobs.OCR_LEGACY_WAIT_SEC)
+            if job and job["status"] not in ocr_jobs.FINAL:
+                return _ocr_accepted(job, public_url)
+        result = job["result"] if job and job["status"] == "done" else None
     try:
-        ocr = extract_event_fields_from_path(dest_path)
-        f = ocr.fields
-        f["image_url"] = public_url
+        if result is None:
+            raise RuntimeError((job or {}).get("error") or "OCR fehlgeschlagen")
+        f = result["fields"]
         # Flatten für Alt-Client
         resp = {
             "title": f.get("title"),
@@ -0,0 +1,295 @@
+# python_app/crawler/fetch_engine.py
+# -*- coding: utf-8 -*-
+"""
+Asynchroner Fetch-Motor für die Crawler (Liste + Detailseiten).
+
+Ein Prozess, ein Connection-Pool, viele Requests gleichzeitig – aber pro Host
+höflich begrenzt:
+  - CRAWL_CONCURRENCY   Requests insgesamt gleichzeitig (Default 100)
+  - CRAWL_PER_HOST      Requests pro Host gleichzeitig (Default 6)
+  - CRAWL_RATE_PER_HOST Request-Starts pro Sekunde und Host (Default 4;
+                        ersetzt das feste sleep(0.8) nach jeder Listenseite)
+  - CRAWL_TIMEOUT       Sekunden pro Request (Default 25)
+  - CRAWL_RETRIES       Wiederholungen bei Netzfehlern, 429 und 5xx (Default 3;
+                        exponentielles Backoff, Retry-After wird beachtet)
+
+Pro Quelle können `concurrency` und `rate_per_sec` in sources.yaml die Werte
+für deren Host überschreiben (FetchEngine.configure_host).
+
+Mit cache=HttpCache() (crawler/http_cache.py) laufen Requests als Conditional
+GET; 304 bzw. ein Eintrag jünger als die TTL liefert den Body aus dem Cache
+mit `not_modified=True`. Gespeichert wird bei 200 sofort – oder, mit
+store=False, erst wenn der Aufrufer das Ergebnis verarbeitet hat
+(FetchEngine.store), damit ein fehlgeschlagener Upsert nicht als "unverändert"
+hängen bleibt.
+
+Backend: aiohttp, wenn installiert; sonst eine gemeinsame requests.Session
+(ein Pool) in einem Thread-Pool – gleiche Limits, gleiche Schnittstelle.
+
+Nutzung:
+    async with FetchEngine() as eng:
+        resp = await eng.get("https://kingkalli.de/events/", headers)
+        html = resp.text
+    html = fetch_text(url, headers)     # synchron, für einzelne Aufrufe/CLIs
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from .http_cache import CRAWL_CACHE_TTL, HttpCache
+
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "100"))
+CRAWL_PER_HOST = int(os.getenv("CRAWL_PER_HOST", "6"))
+CRAWL_RATE_PER_HOST = float(os.getenv("CRAWL_RATE_PER_HOST", "4"))
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", "25"))
+CRAWL_RETRIES = int(os.getenv("CRAWL_RETRIES", "3"))
+CRAWL_BACKOFF_SEC = float(os.getenv("CRAWL_BACKOFF_SEC", "0.5"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER_SEC = 60.0
+
+
+class FetchError(Exception):
+    """Request endgültig fehlgeschlagen (nach allen Versuchen bzw. 4xx)."""
+    def __init__(self, url: str, msg: str, status: Optional[int] = None):
+        super().__init__(f"{msg} ({url})")
+        self.url = url
+        self.status = status
+
+
+@dataclass
+class FetchResponse:
+    url: str
+    status: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)   # Schlüssel klein geschrieben
+    from_cache: bool = False
+    not_modified: bool = False    # 304 oder TTL-frisch: Inhalt wie beim letzten Lauf
+    request_url: str = ""         # Cache-Schlüssel (url ist die nach Redirects)
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+# ------------------------------ Host-Limits ----------------------------------
+class _HostLimiter:
+    """Semaphore (gleichzeitig) + Mindestabstand zwischen Request-Starts."""
+
+    def __init__(self, concurrency: int, rate_per_sec: float):
+        self.sem = asyncio.Semaphore(max(1, concurrency))
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait_turn(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+# -------------------------------- Backends -----------------------------------
+class _AiohttpBackend:
+    def __init__(self, aiohttp, concurrency: int, timeout: float):
+        self.aiohttp = aiohttp
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+        self.retry_exc = (aiohttp.ClientError, asyncio.TimeoutError)
+
+    async def get(self, url: str, headers: Dict[str, str]) -> FetchResponse:
+        async with self.session.get(url, headers=headers, allow_redirects=True) as r:
+            text = await r.text(errors="replace")
+            return FetchResponse(str(r.url), r.status, text, {k.lower(): v for k, v in r.headers.items()})
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+class _RequestsBackend:
+    """Fallback ohne aiohttp: eine Session (Keep-Alive-Pool) im Thread-Pool."""
+
+    def __init__(self, concurrency: int, timeout: float):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawl")
+        self.retry_exc = (requests.ConnectionError, requests.Timeout)
+
+    def _get(self, url: str, headers: Dict[str, str]) -> FetchResponse:
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+        return FetchResponse(r.url, r.status_code, r.text, {k.lower(): v for k, v in r.headers.items()})
+
+    async def get(self, url: str, headers: Dict[str, str]) -> FetchResponse:
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._get, url, headers)
+
+    async def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+def _load_aiohttp():
+    try:
+        return importlib.import_module("aiohttp")
+    except ImportError:
+        return None
+
+
+# --------------------------------- Engine ------------------------------------
+class FetchEngine:
+    def __init__(self, concurrency: int = CRAWL_CONCURRENCY, per_host: int = CRAWL_PER_HOST,
+                 rate_per_sec: float = CRAWL_RATE_PER_HOST, timeout: float = CRAWL_TIMEOUT,
+                 retries: int = CRAWL_RETRIES, backend: str = "auto",
+                 cache: Optional[HttpCache] = None, cache_ttl: int = CRAWL_CACHE_TTL):
+        self.concurrency = max(1, concurrency)
+        self.per_host = per_host
+        self.rate_per_sec = rate_per_sec
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backend_name = backend
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self._host_ttl: Dict[str, int] = {}
+        self._backend = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, _HostLimiter] = {}
+        self._host_cfg: Dict[str, tuple] = {}
+        self.stats = {"requests": 0, "retries": 0, "errors": 0, "not_modified": 0, "fresh": 0}
+
+    async def __aenter__(self) -> "FetchEngine":
+        aiohttp = _load_aiohttp() if self.backend_name in ("auto", "aiohttp") else None
+        if self.backend_name == "aiohttp" and aiohttp is None:
+            raise RuntimeError("aiohttp nicht installiert (pip install aiohttp)")
+        if aiohttp is not None:
+            self._backend = _AiohttpBackend(aiohttp, self.concurrency, self.timeout)
+            self.backend_name = "aiohttp"
+        else:
+            self._backend = _RequestsBackend(self.concurrency, self.timeout)
+            self.backend_name = "requests"
+        self._global = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+    def configure_host(self, url_or_host: str, concurrency: Optional[int] = None,
+                       rate_per_sec: Optional[float] = None, cache_ttl: Optional[int] = None) -> None:
+        """Eigene Limits/Cache-TTL für einen Host (z. B. aus sources.yaml); vor dem ersten Request setzen."""
+        host = _host(url_or_host) if "//" in url_or_host else url_or_host.lower()
+        if cache_ttl is not None:
+            self._host_ttl[host] = int(cache_ttl)
+        self._host_cfg[host] = (
+            int(concurrency) if concurrency else self.per_host,
+            float(rate_per_sec) if rate_per_sec is not None else self.rate_per_sec,
+        )
+        self._hosts.pop(host, None)
+
+    def _limiter(self, url: str) -> _HostLimiter:
+        host = _host(url)
+        lim = self._hosts.get(host)
+        if lim is None:
+            conc, rate = self._host_cfg.get(host, (self.per_host, self.rate_per_sec))
+            lim = self._hosts[host] = _HostLimiter(conc, rate)
+        return lim
+
+    @staticmethod
+    def _retry_after(resp: FetchResponse) -> Optional[float]:
+        try:
+            return min(MAX_RETRY_AFTER_SEC, max(0.0, float(resp.headers.get("retry-after", ""))))
+        except ValueError:
+            return None
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+                  cache_ttl: Optional[int] = None, store: bool = True) -> FetchResponse:
+        """GET über den Cache (falls vorhanden): TTL-frisch → ohne Request,
+           sonst Conditional GET; 304 → Cache-Body mit not_modified=True."""
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None:
+            ttl = cache_ttl if cache_ttl is not None else self._host_ttl.get(_host(url), self.cache_ttl)
+            if ttl > 0 and entry.age < ttl:
+                self.stats["fresh"] += 1
+                return FetchResponse(url, 200, entry.body, entry.headers, from_cache=True, not_modified=True,
+                                 request_url=url)
+            headers = {**(headers or {}), **entry.conditional_headers()}
+
+        resp = await self._fetch(url, headers)
+        resp.request_url = url
+        if resp.status == 304 and entry is not None:
+            self.stats["not_modified"] += 1
+            self.cache.touch(url)
+            return FetchResponse(url, 304, entry.body, entry.headers, from_cache=True, not_modified=True,
+                                 request_url=url)
+        if store and resp.status == 200:
+            self.store(resp)
+        return resp
+
+    def store(self, resp: FetchResponse) -> None:
+        """Antwort in den Cache schreiben (bei get(..., store=False) nach erfolgreicher Verarbeitung)."""
+        if self.cache is None or resp.from_cache or resp.status != 200:
+            return
+        try:
+            self.cache.put(resp.request_url or resp.url, resp.text, resp.headers)
+        except OSError:
+            pass    # Cache ist optional – Crawl läuft weiter
+
+    async def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResponse:
+        """GET mit Limits und Retries. 2xx/3xx → FetchResponse, sonst FetchError."""
+        if self._backend is None:
+            raise RuntimeError("FetchEngine nicht gestartet (async with FetchEngine() as eng)")
+        lim = self._limiter(url)
+        attempt = 0
+        while True:
+            delay = None
+            # erst Host-Slot + Takt, dann globaler Slot – wer auf "seinen" Host
+            # wartet, blockiert keine Verbindungen für andere Hosts
+            async with lim.sem:
+                await lim.wait_turn()
+                async with self._global:
+                    self.stats["requests"] += 1
+                    try:
+                        resp = await self._backend.get(url, headers or {})
+                    except self._backend.retry_exc as e:
+                        if attempt >= self.retries:
+                            self.stats["errors"] += 1
+                            raise FetchError(url, f"{type(e).__name__}: {e}") from e
+                    else:
+                        if resp.status < 400:
+                            return resp
+                        if resp.status not in RETRY_STATUS or attempt >= self.retries:
+                            self.stats["errors"] += 1
+                            raise FetchError(url, f"HTTP {resp.status}", status=resp.status)
+                        delay = self._retry_after(resp)
+            # Backoff außerhalb der Semaphoren – andere Requests laufen weiter
+            attempt += 1
+            self.stats["retries"] += 1
+            if delay is None:
+                delay = CRAWL_BACKOFF_SEC * (2 ** (attempt - 1)) * (1 + random.random() / 2)
+            await asyncio.sleep(delay)
+
+
+def fetch_text(url: str, headers: Optional[Dict[str, str]] = None, cache: bool = True) -> str:
+    """Synchroner Einzelabruf (eigene kurzlebige Engine, mit HTTP-Cache) – für CLIs und Altaufrufer."""
+    async def _one() -> str:
+        async with FetchEngine(concurrency=1, cache=HttpCache() if cache else None) as eng:
+            return (await eng.get(url, headers)).text
+    return asyncio.run(_one())
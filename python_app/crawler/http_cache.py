@@ -0,0 +1,86 @@
+# python_app/crawler/http_cache.py
+# -*- coding: utf-8 -*-
+"""
+Persistenter HTTP-Cache für die Crawler (Conditional GET).
+
+Pro URL eine Datei  CRAWL_CACHE_DIR/<h[0:2]>/<sha256(url)>.json.gz  mit Body,
+ETag, Last-Modified und Content-Type. Die FetchEngine schickt damit
+If-None-Match / If-Modified-Since; antwortet der Server mit 304, kommt der
+Body aus dem Cache und die Antwort ist als `not_modified` markiert – der
+Aufrufer kann Parsen/Upserten überspringen.
+
+Frische: mtime der Datei = letzter erfolgreicher Abgleich. Jünger als die TTL
+(CRAWL_CACHE_TTL bzw. `cache_ttl` der Quelle in sources.yaml) → gar kein
+Request. TTL 0 = immer per Conditional GET nachfragen.
+
+Liegt per Default unter var/http-cache, außerhalb von static/ (sonst wäre der
+Seiten-Spiegel per HTTP abrufbar); auf Fly per CRAWL_CACHE_DIR auf dem Volume
+(fly.toml), damit er Deploys überlebt.
+"""
+from __future__ import annotations
+import gzip, hashlib, json, os, time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+CRAWL_CACHE_DIR = os.getenv("CRAWL_CACHE_DIR", os.path.join("var", "http-cache"))
+CRAWL_CACHE_TTL = int(os.getenv("CRAWL_CACHE_TTL", "0"))
+
+_KEEP_HEADERS = ("etag", "last-modified", "content-type")
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    headers: Dict[str, str]
+    validated_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.validated_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        out = {}
+        if self.headers.get("etag"):
+            out["If-None-Match"] = self.headers["etag"]
+        if self.headers.get("last-modified"):
+            out["If-Modified-Since"] = self.headers["last-modified"]
+        return out
+
+
+class HttpCache:
+    def __init__(self, cache_dir: str = CRAWL_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, url: str) -> str:
+        h = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, h[:2], f"{h}.json.gz")
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            mtime = os.path.getmtime(path)
+        except (OSError, ValueError, EOFError):
+            return None
+        if data.get("url") != url:
+            return None
+        return CacheEntry(url, data.get("body") or "", data.get("headers") or {}, mtime)
+
+    def put(self, url: str, body: str, headers: Dict[str, str]) -> None:
+        """Ohne ETag/Last-Modified hilft der Eintrag nur über die TTL (kein 304 möglich)."""
+        keep = {k: v for k, v in headers.items() if k in _KEEP_HEADERS}
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+            json.dump({"url": url, "headers": keep, "body": body}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def touch(self, url: str) -> None:
+        """304 erhalten → Eintrag gilt ab jetzt wieder als frisch."""
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import re, time, urllib.parse
-from typing import List, Set
-import requests
+import asyncio, re, urllib.parse
+from typing import AsyncIterator, List, Optional, Set
 from parsel import Selector
+from .fetch_engine import FetchEngine, fetch_text
+from .http_cache import HttpCache
 from .source_loader import get_source
 
 EXCLUDE_PATTERNS = (
@@ -16,11 +17,10 @@ EXCLUDE_PATTERNS = (
 )
 DETAIL_ALLOW_FRAGMENT = "/event/"
 
-def fetch(url: str, headers: dict, sleep: float = 0.8) -> str:
-    r = requests.get(url, headers=headers or {}, timeout=25)
-    r.raise_for_status()
-    if sleep: time.sleep(sleep)
-    return r.text
+def fetch(url: str, headers: dict) -> str:
+    # Höflichkeit (Takt pro Host) regelt die FetchEngine – kein festes sleep mehr;
+    # Conditional GET über den HTTP-Cache (304 → Body aus dem Cache)
+    return fetch_text(url, headers=headers)
 
 def norm_url(url: str, base: str) -> str:
     u = urllib.parse.urljoin(base, url)
@@ -64,26 +64,37 @@ def find_next_page(html: str, page_url: str) -> str | None:
             return u
     return None
 
-def crawl_list(start_url: str, headers: dict, max_pages: int = 3) -> List[str]:
-    urls: List[str] = []
+async def iter_list_pages(eng: FetchEngine, start_url: str, headers: dict,
+                          max_pages: int = 3) -> AsyncIterator[List[str]]:
+    """Pro Listenseite die neuen Detail-Links – sobald die Seite da ist (Streaming)."""
     seen: Set[str] = set()
-    url = start_url
+    url: Optional[str] = start_url
     page = 1
     while url and page <= max_pages:
-        html = fetch(url, headers=headers)
-        details = extract_detail_links(html, url)
-        for d in details:
-            if d not in seen:
-                seen.add(d)
-                urls.append(d)
+        # Listenseiten immer nachfragen (neue Events), 304 liefert den alten Body
+        html = (await eng.get(url, headers=headers, cache_ttl=0)).text
+        fresh = [d for d in extract_detail_links(html, url) if d not in seen]
+        seen.update(fresh)
+        yield fresh
         nxt = find_next_page(html, url)
         if nxt and nxt != url:
             url = nxt
             page += 1
         else:
             break
+
+async def crawl_list_async(eng: FetchEngine, start_url: str, headers: dict, max_pages: int = 3) -> List[str]:
+    urls: List[str] = []
+    async for links in iter_list_pages(eng, start_url, headers, max_pages):
+        urls.extend(links)
     return urls
 
+def crawl_list(start_url: str, headers: dict, max_pages: int = 3) -> List[str]:
+    async def _run() -> List[str]:
+        async with FetchEngine(cache=HttpCache()) as eng:
+            return await crawl_list_async(eng, start_url, headers, max_pages)
+    return asyncio.run(_run())
+
 def main():
     src = get_source("kingkalli") or {}
     base = src.get("base", "https://kingkalli.de")
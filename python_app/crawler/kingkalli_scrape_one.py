@@ -17,12 +17,13 @@ from typing import Any, Dict, Optional
 from urllib.parse import parse_qs, unquote, urlparse
 
 import pytz
-import requests
 from dateutil import parser as dateparser
 from extruct.jsonld import JsonLdExtractor
 from parsel import Selector
 from w3lib.html import remove_tags
 
+from .fetch_engine import FetchEngine, fetch_text
+
 HEADERS = {"User-Agent": "familysout-scraper/1.0 (+https://www.familysout.de)"}
 TZ = pytz.timezone("Europe/Berlin")
 DE_MONTHS = {
@@ -44,9 +45,7 @@ DE_MONTHS = {
 
 # ----------------- Helpers -----------------
 def fetch(url: str) -> str:
-    r = requests.get(url, headers=HEADERS, timeout=25)
-    r.raise_for_status()
-    return r.text
+    return fetch_text(url, headers=HEADERS)
 
 
 def _norm_text(x: Optional[str]) -> Optional[str]:
@@ -156,7 +155,16 @@ def _parse_de_datetime(text: str) -> tuple[Optional[datetime.datetime], Optional
 
 # ----------------- Main scraper -----------------
 def scrape_kingkalli_detail(url: str) -> Dict[str, Any]:
-    html = fetch(url)
+    return parse_kingkalli_detail(fetch(url), url)
+
+
+async def scrape_kingkalli_detail_async(eng: FetchEngine, url: str) -> Dict[str, Any]:
+    """Wie scrape_kingkalli_detail, aber über eine laufende FetchEngine."""
+    html = (await eng.get(url, headers=HEADERS)).text
+    return parse_kingkalli_detail(html, url)
+
+
+def parse_kingkalli_detail(html: str, url: str) -> Dict[str, Any]:
     sel = Selector(html)
     main = _find_main(sel)
     jld = _parse_jsonld(html, url)
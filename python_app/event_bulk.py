@@ -0,0 +1,204 @@
+# event_bulk.py
+"""
+Mehrere Events in einem Rutsch anlegen (OCR-Kandidaten, Batch-Import).
+
+Ein Flyer mit N Terminen ergibt N Kandidaten (OCRResult.candidates); statt N
+Formular-POSTs mit N Commits werden sie hier mit einem einzigen
+INSERT … RETURNING id (executemany/insertmanyvalues) in einer Transaktion
+angelegt.
+
+Der Bulk-INSERT läuft an der ORM-Unit-of-Work vorbei – die after_flush-Hooks
+sehen die neuen Events nicht. Deshalb wird hier ausdrücklich
+  - result_cache.mark_events_written() gesetzt (Such-Cache-Version beim Commit),
+  - facets.record_categories_added() aufgerufen (Kategorie-Zähler).
+Die Volltext-Suche pflegen die DB-Trigger selbst.
+
+upsert_events() ist der Schreibweg der Crawler: natürlicher Schlüssel
+dedupe_key (Titel + Quelle + Startzeit, unique) und ein
+INSERT … ON CONFLICT (dedupe_key) DO UPDATE pro Batch (SQLite/Postgres);
+unveränderte Events (gleicher content_hash) bekommen nur last_seen_at.
+"""
+from __future__ import annotations
+import hashlib, json, re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from sqlalchemy import Boolean, insert, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from event_fields import clean_str, parse_event_datetime, to_bool, to_float
+from models import Event
+import facets
+import result_cache
+
+
+def candidate_to_row(c: Dict[str, Any], image_url: Optional[str] = None) -> Dict[str, Any]:
+    """OCR-Kandidat bzw. Formularwerte (/event-erstellen, Bulk) → Spaltenwerte für Event.
+       Datum wie im Formular: "YYYY-MM-DD HH:MM Uhr" bzw. nur "YYYY-MM-DD"."""
+    day = (clean_str(c.get("date")) or "").split(" ")[0] or None
+    time_str = clean_str(c.get("time"))
+    if time_str and "Uhr" not in time_str:
+        time_str += " Uhr"
+    date_combined = f"{day or ''} {time_str or ''}".strip() or None
+
+    source_url = clean_str(c.get("source_url"))
+    source_name = clean_str(c.get("source_name"))
+    if not source_name and source_url:
+        host = urlparse(source_url).netloc
+        source_name = host.replace("www.", "") if host else None
+
+    return {
+        "title": clean_str(c.get("title")) or "ohne Titel",
+        "description": clean_str(c.get("description")),
+        "date": date_combined,
+        "start_at": parse_event_datetime(date_combined),
+        "image_url": image_url if image_url is not None else clean_str(c.get("image_url")),
+        "location": clean_str(c.get("location")),
+        "maps_url": clean_str(c.get("maps_url")),
+        "category": clean_str(c.get("category")) or "Unbekannt",
+        "source_url": source_url,
+        "source_name": source_name,
+        "lat": to_float(c.get("lat")),
+        "lon": to_float(c.get("lon")),
+        "price": to_float(c.get("price")),
+        "is_free": to_bool(c.get("is_free")),
+        "is_outdoor": to_bool(c.get("is_outdoor")),
+        "age_group": clean_str(c.get("age_group")),
+    }
+
+def insert_events(sess, rows: List[Dict[str, Any]]) -> List[int]:
+    """Ein INSERT … RETURNING id für alle Zeilen (Reihenfolge bleibt). Commit macht der Aufrufer."""
+    if not rows:
+        return []
+    ids = sess.execute(insert(Event).returning(Event.id, sort_by_parameter_order=True), rows).scalars().all()
+    facets.record_categories_added(sess, (r.get("category") for r in rows))
+    result_cache.mark_events_written(sess)
+    return list(ids)
+
+def insert_candidates(sess, candidates: Iterable[Dict[str, Any]], image_url: Optional[str] = None) -> List[int]:
+    return insert_events(sess, [candidate_to_row(c, image_url) for c in candidates])
+
+
+# ---------------------------- Upsert (Crawler) ------------------------------
+def _norm_key(s: Any) -> str:
+    return re.sub(r"\s+", " ", str(s or "")).strip().casefold()
+
+def dedupe_key(title: Any, source_name: Any, start_at: Optional[datetime]) -> Optional[str]:
+    """Titel + Quelle + Startzeit (normalisiert, minutengenau) → SHA-1.
+       None ohne Titel oder Quelle – solche Events bekommen keinen Schlüssel."""
+    t, src = _norm_key(title), _norm_key(source_name)
+    if not t or not src:
+        return None
+    start = start_at.isoformat(timespec="minutes") if start_at else ""
+    return hashlib.sha1(f"{src}|{t}|{start}".encode("utf-8")).hexdigest()
+
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+def check_upsert_support(bind) -> None:
+    """Beim Start der Crawler aufrufen: ohne ON CONFLICT kein upsert_events() –
+       lieber sofort abbrechen als nach dem ersten Batch."""
+    name = bind.dialect.name
+    if name not in _UPSERT_INSERTS:
+        raise RuntimeError(
+            f"Upserts (Events, Facetten) brauchen INSERT … ON CONFLICT (SQLite/Postgres); "
+            f"DATABASE_URL zeigt auf {name!r}"
+        )
+
+def dialect_insert(sess, table=Event):
+    """INSERT mit on_conflict_do_update() für den Dialekt der Session (auch für facets)."""
+    bind = sess.get_bind()
+    check_upsert_support(bind)
+    return _UPSERT_INSERTS[bind.dialect.name](table)
+
+_HASH_IGNORE = {"id", "dedupe_key", "content_hash", "updated_at", "last_seen_at"}
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """Fingerabdruck der Spaltenwerte (ohne Verwaltungsspalten) – gleich → nichts zu schreiben."""
+    payload = {k: v for k, v in row.items() if k not in _HASH_IGNORE}
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+                     default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def touch_seen(sess, where, now: Optional[datetime] = None) -> int:
+    """Nur last_seen_at setzen – updated_at bleibt (sonst liefe onupdate mit und
+       ETag/Last-Modified der Detailseite würden sich ohne Änderung ändern)."""
+    res = sess.execute(
+        update(Event).where(where)
+        .values(last_seen_at=now or datetime.utcnow(), updated_at=Event.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return res.rowcount
+
+def touch_seen_urls(sess, urls: Iterable[str], chunk: int = 500) -> int:
+    """last_seen_at für Events, deren Seite unverändert war (HTTP 304) – ohne Parsen."""
+    urls = list(dict.fromkeys(u for u in urls if u))
+    now = datetime.utcnow()
+    return sum(touch_seen(sess, Event.source_url.in_(urls[i:i + chunk]), now)
+               for i in range(0, len(urls), chunk))
+
+def upsert_events(sess, rows: Iterable[Dict[str, Any]]) -> Dict[str, Tuple[int, str]]:
+    """
+    Ein INSERT … ON CONFLICT (dedupe_key) DO UPDATE … RETURNING für alle
+    geänderten Zeilen. Rückgabe: dedupe_key → (event_id, "new" | "updated" |
+    "unchanged"). Commit macht der Aufrufer.
+
+    Vorher eine Abfrage über den Unique-Index: alte Kategorie (Facetten) und
+    content_hash. Stimmt der Hash, wird die Zeile nicht geschrieben – nur
+    last_seen_at (ein UPDATE für alle unveränderten). Gleicher Schlüssel
+    zweimal im Batch → die letzte Zeile gewinnt.
+
+    Neu oder aktualisiert sagt das Statement selbst: Postgres liefert
+    `xmax = 0` im RETURNING (nur frisch eingefügte Zeilen haben xmax 0).
+    SQLite kennt nichts Vergleichbares – dort zählt die Vorab-Abfrage (fehlt
+    der Schlüssel → neu). Das stimmt, solange nur ein Writer upsertet (der
+    DB-Thread der Crawler-Pipeline); ein paralleler INSERT desselben
+    Schlüssels zwischen Abfrage und Statement würde als "new" gemeldet.
+    """
+    by_key: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        key = r.get("dedupe_key") or dedupe_key(r.get("title"), r.get("source_name"), r.get("start_at"))
+        if key is None:
+            raise ValueError(f"Event ohne Titel/Quelle – kein dedupe_key: {r.get('source_url') or r.get('title')!r}")
+        by_key[key] = {**r, "dedupe_key": key, "content_hash": content_hash(r)}
+    if not by_key:
+        return {}
+
+    old = {k: (event_id, cat, h) for k, event_id, cat, h in sess.execute(
+        select(Event.dedupe_key, Event.id, Event.category, Event.content_hash)
+        .where(Event.dedupe_key.in_(list(by_key)))
+    ).all()}
+    now = datetime.utcnow()
+
+    out: Dict[str, Tuple[int, str]] = {}
+    unchanged = [k for k, r in by_key.items() if k in old and old[k][2] == r["content_hash"]]
+    if unchanged:
+        touch_seen(sess, Event.dedupe_key.in_(unchanged), now)
+        out.update({k: (old[k][0], "unchanged") for k in unchanged})
+    changed = {k: r for k, r in by_key.items() if k not in out}
+    if not changed:
+        return out
+
+    # executemany braucht überall dieselben Spalten; updated_at setzt hier niemand automatisch
+    cols = sorted(set().union(*(r.keys() for r in changed.values())) - {"id", "updated_at", "last_seen_at"})
+    values = [{**{c: r.get(c) for c in cols}, "updated_at": now, "last_seen_at": now} for r in changed.values()]
+
+    ins = dialect_insert(sess)
+    stmt = ins.on_conflict_do_update(
+        index_elements=[Event.dedupe_key],
+        set_={c: ins.excluded[c] for c in cols + ["updated_at", "last_seen_at"] if c != "dedupe_key"},
+    )
+    if sess.get_bind().dialect.name == "postgresql":
+        stmt = stmt.returning(Event.id, Event.dedupe_key, literal_column("xmax = 0", Boolean).label("inserted"))
+        for event_id, key, inserted in sess.execute(stmt, values).all():
+            out[key] = (event_id, "new" if inserted else "updated")
+    else:
+        for event_id, key in sess.execute(stmt.returning(Event.id, Event.dedupe_key), values).all():
+            out[key] = (event_id, "updated" if key in old else "new")
+
+    facets.record_category_changes(
+        sess, ((old[k][1] if k in old else None, r.get("category")) for k, r in changed.items())
+    )
+    result_cache.mark_events_written(sess)
+    return out
@@ -0,0 +1,91 @@
+# event_fields.py
+"""
+Formular-/Kandidatenwerte → Event-Spalten, an EINER Stelle.
+
+Das Einzel-Formular (/event-erstellen), der Bulk-Endpoint
+(/event-erstellen/bulk) und jobs/ocr_batch parsen Datum, Zahlen und
+Ja/Nein-Felder hiermit – gleiche Eingabe ergibt überall dieselben Werte.
+"""
+from __future__ import annotations
+import re
+from datetime import datetime
+from typing import Any, Optional
+from zoneinfo import ZoneInfo
+
+LOCAL_TZ = ZoneInfo("Europe/Berlin")
+
+_TRUE = ("1", "true", "wahr", "ja", "yes", "on")
+_FALSE = ("0", "false", "falsch", "nein", "no", "off")
+
+
+def clean_str(val: Any) -> Optional[str]:
+    """Getrimmter String oder None (leer/fehlend)."""
+    s = (str(val).strip() if val is not None else "")
+    return s or None
+
+def to_float(val: Any) -> Optional[float]:
+    if val is None or val == "":
+        return None
+    try:
+        return float(str(val).replace(",", "."))
+    except Exception:
+        return None
+
+def to_bool(val: Any) -> Optional[bool]:
+    """Ja/Nein aus Formularen und OCR; Unbekanntes → None (nicht False)."""
+    if isinstance(val, bool):
+        return val
+    if val is None:
+        return None
+    v = str(val).strip().lower()
+    if v in _TRUE:
+        return True
+    if v in _FALSE:
+        return False
+    return None
+
+def to_local_naive(dt):
+    """Zeitzonen-behaftete Zeit → naive Europe/Berlin-Zeit (so steht sie in start_at/end_at)."""
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(LOCAL_TZ).replace(tzinfo=None)
+
+def parse_event_datetime(date_raw):
+    if isinstance(date_raw, datetime):
+        return date_raw
+    if isinstance(date_raw, str):
+        s = date_raw.strip()
+        # ISO mit Zeit/Offset (Crawler: 2025-08-14T13:00:00+02:00) → lokale, naive Zeit
+        if "T" in s:
+            try:
+                dt = datetime.fromisoformat(s)
+                return to_local_naive(dt)
+            except ValueError:
+                pass
+        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%d.%m.%Y %H:%M", "%d.%m.%Y"):
+            try:
+                dt = datetime.strptime(s.replace(" Uhr", ""), fmt)
+                # Falls nur Datum ohne Zeit → 09:00 annehmen
+                if fmt in ("%Y-%m-%d", "%d.%m.%Y"):
+                    dt = dt.replace(hour=9, minute=0)
+                return dt
+            except ValueError:
+                continue
+        # Fallback: Zahlen aus String ziehen (yyyy-mm-dd)
+        m = re.findall(r"\d+", s)
+        if len(m) >= 3:
+            if "-" in s:  # ISO-ähnlich
+                y, mo, d = m[:3]
+                try:
+                    return datetime(int(y), int(mo), int(d), 9, 0)
+                except Exception:
+                    pass
+            else:  # dd.mm.yyyy
+                d, mo, y = m[:3]
+                try:
+                    if len(y) == 2:
+                        y = "20" + y
+                    return datetime(int(y), int(mo), int(d), 9, 0)
+                except Exception:
+                    pass
+    return None
@@ -0,0 +1,287 @@
+# event_search.py
+"""
+Filter + Sortierung + Keyset-Pagination für die Event-Suche.
+
+Gemeinsame Grundlage für /results (HTML), /results/more (Fragment/JSON)
+und die JSON-API – alle lesen dieselben Query-Parameter über
+`SearchParams.from_args(request.args)`.
+
+Pagination ist cursor-basiert (Keyset): statt OFFSET merken wir uns den
+Sortierschlüssel des letzten Treffers und lesen ab dort weiter –
+    Datum:    (start_at NULLS LAST, id)
+    Relevanz: (rank, id)            # nur bei Volltextsuche
+    Distanz:  (distance_km, id)     # nur bei Umkreissuche (location + radius)
+"""
+from __future__ import annotations
+import base64, json, os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import String, and_, cast, or_
+
+from models import Event
+import geo_utils
+import search_index
+
+PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "24"))
+MAX_PAGE_SIZE = 100
+MAX_RADIUS_KM = 200.0
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# ---------------------------------- Datum -----------------------------------
+def parse_iso_date(s) -> Optional[date]:
+    try:
+        return date.fromisoformat((s or "").strip()[:10])
+    except ValueError:
+        return None
+
+def day_range(d: date):
+    start = datetime.combine(d, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+def weekend_range(today: date = None):
+    """Samstag 00:00 bis Montag 00:00 – am Wochenende selbst ab heute."""
+    today = today or date.today()
+    if today.weekday() >= 5:
+        start = today
+    else:
+        start = today + timedelta(days=5 - today.weekday())
+    end = today + timedelta(days=7 - today.weekday())
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+
+# -------------------------------- Parameter ---------------------------------
+@dataclass
+class SearchParams:
+    q: str = ""
+    location: str = ""
+    category: str = ""
+    date: str = ""
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    when: str = ""                      # today | weekend
+    cats: List[str] = field(default_factory=list)
+    free: bool = False
+    outdoor: bool = False
+    always: bool = False
+    radius_km: Optional[float] = None
+    origin: Optional[Tuple[float, float]] = None   # explizit per lat/lon ("in meiner Nähe")
+    sort: str = ""                                 # date | distance (Default je nach Suche)
+
+    @classmethod
+    def from_args(cls, args) -> "SearchParams":
+        return cls(
+            q=(args.get("q", "") or args.get("query", "")).strip(),
+            location=args.get("location", "").strip(),
+            category=args.get("category", "").strip(),
+            date=args.get("date", "").strip(),
+            date_from=parse_iso_date(args.get("date_from")),
+            date_to=parse_iso_date(args.get("date_to")),
+            when=args.get("when", "").strip(),
+            cats=[c.strip() for c in args.getlist("cats[]") if c.strip()],
+            free=args.get("free") == "1",
+            outdoor=args.get("outdoor") == "1",
+            always=args.get("always") == "1",
+            radius_km=_parse_radius(args.get("radius")),
+            origin=geo_utils.parse_latlon(args.get("lat"), args.get("lon")),
+            sort=args.get("sort", "").strip(),
+        )
+
+    def cache_key(self) -> str:
+        """Normalisierter Schlüssel für Caches – gleiche Filter ⇒ gleicher Schlüssel."""
+        return json.dumps({
+            "q": self.q.lower(),
+            "location": self.location.lower(),
+            "category": self.category.lower(),
+            "date": self.date,
+            "date_from": self.date_from.isoformat() if self.date_from else None,
+            "date_to": self.date_to.isoformat() if self.date_to else None,
+            "when": self.when,
+            "cats": sorted({c.lower() for c in self.cats}),
+            "free": self.free,
+            "outdoor": self.outdoor,
+            "always": self.always,
+            "radius_km": self.radius_km,
+            "origin": [round(c, 4) for c in self.origin] if self.origin else None,
+            "sort": self.sort,
+        }, sort_keys=True, separators=(",", ":"))
+
+def _parse_radius(raw) -> Optional[float]:
+    try:
+        r = float(str(raw).replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+    return min(r, MAX_RADIUS_KM) if r > 0 else None
+
+def resolve_origin(sess, p: SearchParams) -> Optional[Tuple[float, float]]:
+    """Mittelpunkt der Umkreissuche oder None (→ normale Ortssuche per ILIKE)."""
+    if not p.radius_km:
+        return None
+    return p.origin or (geo_utils.geocode(p.location, sess) if p.location else None)
+
+
+# ------------------------------- Query-Aufbau -------------------------------
+def build_query(sess, p: SearchParams, qset=None, origin=None):
+    """Wendet alle Filter an. Rückgabe: (query, rank_expr|None).
+       Mit `origin` wird statt des Ortsnamens die Bounding-Box des Umkreises gefiltert –
+       die exakte Distanz prüft fetch_page()."""
+    qset = qset if qset is not None else sess.query(Event)
+
+    # Volltext (FTS5 / tsvector, sonst ILIKE-Fallback) – liefert optional Ranking
+    qset, rank = search_index.apply_text_search(sess, qset, p.q)
+
+    if origin:
+        min_lat, max_lat, min_lon, max_lon = geo_utils.bbox(origin[0], origin[1], p.radius_km)
+        qset = qset.filter(Event.lat.between(min_lat, max_lat), Event.lon.between(min_lon, max_lon))
+    # kompatibel zu alten Einzel-Filtern
+    elif p.location:
+        qset = qset.filter(Event.location.ilike(f"%{p.location}%"))
+
+    # einzelner Kategorienfilter (alt)
+    if p.category:
+        qset = qset.filter(Event.category.ilike(f"%{p.category}%"))
+
+    # mehrere Kategorien (neu)
+    if p.cats:
+        qset = qset.filter(or_(*[Event.category.ilike(f"%{c}%") for c in p.cats]))
+
+    # Datum: Bereichsfilter auf dem indizierten start_at
+    day = parse_iso_date(p.date) if p.date else None
+    if day:
+        lo, hi = day_range(day)
+        qset = qset.filter(Event.start_at >= lo, Event.start_at < hi)
+    elif p.date:
+        # unvollständige Angabe (z. B. "2025-08") → alter Präfix-Match auf dem String
+        qset = qset.filter(cast(Event.date, String).like(f"{p.date}%"))
+    if p.date_from:
+        qset = qset.filter(Event.start_at >= day_range(p.date_from)[0])
+    if p.date_to:
+        qset = qset.filter(Event.start_at < day_range(p.date_to)[1])
+    if p.when == "today":
+        lo, hi = day_range(date.today())
+        qset = qset.filter(Event.start_at >= lo, Event.start_at < hi)
+    elif p.when == "weekend":
+        lo, hi = weekend_range()
+        qset = qset.filter(Event.start_at >= lo, Event.start_at < hi)
+
+    # Flags
+    if p.free:
+        qset = qset.filter((Event.is_free == True) | (Event.price == 0))
+    if p.outdoor:
+        qset = qset.filter(Event.is_outdoor == True)
+    if p.always:
+        qset = qset.filter(Event.is_always_open == True)
+
+    return qset, rank
+
+
+# --------------------------------- Cursor -----------------------------------
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: Optional[str]) -> Optional[dict]:
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        int(data["i"])
+        return data
+    except Exception:
+        raise InvalidCursor("ungültiger Cursor")
+
+def _cursor_for(ev: Event, rank_value, by_distance: bool = False) -> dict:
+    if by_distance:
+        return {"d": ev.distance_km, "i": ev.id}
+    if rank_value is not None:
+        return {"r": float(rank_value), "i": ev.id}
+    return {"s": ev.start_at.isoformat() if ev.start_at else None, "i": ev.id}
+
+def _after(cur: dict, rank):
+    """WHERE-Bedingung 'liegt hinter dem Cursor' passend zur Sortierung."""
+    last_id = int(cur["i"])
+    if rank is not None:
+        if "r" not in cur:
+            raise InvalidCursor("Cursor passt nicht zur Sortierung")
+        r = float(cur["r"])
+        return or_(rank > r, and_(rank == r, Event.id > last_id))
+    if "s" not in cur:
+        raise InvalidCursor("Cursor passt nicht zur Sortierung")
+    if cur["s"] is None:
+        return and_(Event.start_at.is_(None), Event.id > last_id)
+    s = datetime.fromisoformat(cur["s"])
+    return or_(
+        Event.start_at > s,
+        and_(Event.start_at == s, Event.id > last_id),
+        Event.start_at.is_(None),
+    )
+
+
+# ------------------------------- Seitenabruf --------------------------------
+def _radius_hits(sess, p: SearchParams, origin) -> List[Tuple[float, int]]:
+    """Alle Treffer im Umkreis als sortierte [(distanz_km, id)] – lädt nur id/lat/lon."""
+    qset, _ = build_query(sess, p, qset=sess.query(Event.id, Event.lat, Event.lon), origin=origin)
+    return geo_utils.within_radius(origin[0], origin[1], p.radius_km, qset.all())
+
+def _fetch_radius_page(sess, p, origin, cur, limit) -> Tuple[List[Event], bool]:
+    """Seite einer Umkreissuche. Rückgabe: (events inkl. distance_km, nach Distanz sortiert?)."""
+    hits = _radius_hits(sess, p, origin)
+    dist_by_id = {i: d for d, i in hits}
+
+    if p.sort == "date":
+        # Datumssortierung innerhalb des Umkreises: Keyset wie gewohnt, auf die Treffer begrenzt
+        qset = sess.query(Event).filter(Event.id.in_(list(dist_by_id) or [-1]))
+        if cur:
+            qset = qset.filter(_after(cur, None))
+        order = [Event.start_at.asc().nulls_last(), Event.id.asc()]
+        events = qset.order_by(*order).limit(limit + 1).all()
+        by_distance = False
+    else:
+        if cur:
+            if "d" not in cur:
+                raise InvalidCursor("Cursor passt nicht zur Sortierung")
+            after = (float(cur["d"]), int(cur["i"]))
+            hits = [h for h in hits if h > after]
+        page_ids = [i for _, i in hits[:limit + 1]]
+        by_id = {e.id: e for e in sess.query(Event).filter(Event.id.in_(page_ids or [-1])).all()}
+        events = [by_id[i] for i in page_ids if i in by_id]
+        by_distance = True
+
+    for ev in events:
+        ev.distance_km = dist_by_id.get(ev.id)
+    return events, by_distance
+
+def fetch_page(sess, p: SearchParams, cursor: Optional[str] = None,
+               limit: int = PAGE_SIZE) -> Tuple[List[Event], Optional[str]]:
+    """Eine Seite Events + Cursor für die nächste Seite (None = Ende)."""
+    limit = max(1, min(int(limit or PAGE_SIZE), MAX_PAGE_SIZE))
+    cur = decode_cursor(cursor)
+
+    origin = resolve_origin(sess, p)
+    if origin:
+        events, by_distance = _fetch_radius_page(sess, p, origin, cur, limit)
+        has_more = len(events) > limit
+        events = events[:limit]
+        next_cursor = _cursor_for(events[-1], None, by_distance) if has_more and events else None
+        return events, (encode_cursor(next_cursor) if next_cursor else None)
+
+    qset, rank = build_query(sess, p)
+    if cur:
+        qset = qset.filter(_after(cur, rank))
+
+    if rank is None:
+        order = [Event.start_at.asc().nulls_last(), Event.id.asc()]
+        rows = [(ev, None) for ev in qset.order_by(*order).limit(limit + 1).all()]
+    else:
+        rows = qset.add_columns(rank).order_by(rank.asc(), Event.id.asc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _cursor_for(*rows[-1]) if has_more and rows else None
+    return [ev for ev, _ in rows], (encode_cursor(next_cursor) if next_cursor else None)
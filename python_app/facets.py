@@ -0,0 +1,145 @@
+# facets.py
+"""
+Kategorie-Facetten für die Sidebar in /results.
+
+Statt bei jeder Suche alle Events zu laden, pflegen wir die Tabelle
+`category_facets` (Name → Anzahl Events) inkrementell bei jedem Schreiben
+und halten die Liste zusätzlich im Speicher. Die Zähler ändern sich nur per
+`count = count + d` in der DB (neue Namen per INSERT … ON CONFLICT) – Web-
+Requests und der Crawler-Writer schreiben parallel, ohne Updates zu verlieren. Nach einem Commit mit
+Änderungen wird der Speicher-Cache verworfen; Schreibvorgänge in anderen
+Workern erkennen wir an der geteilten Version aus result_cache.
+
+Neu aufbauen (z. B. nach manuellen DB-Eingriffen):
+    python facets.py --rebuild
+"""
+from __future__ import annotations
+import os, sys, threading, time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.orm import Session as _SASession
+
+from models import Event, CategoryFacet
+import result_cache
+
+FACET_TTL_SEC = int(os.getenv("FACET_TTL_SEC", "300"))
+
+_lock = threading.Lock()
+_cache: dict = {"items": None, "ts": 0.0, "version": None}
+
+
+# ---------------------------------- Utils -----------------------------------
+def split_categories(raw: Optional[str]) -> List[str]:
+    """'Familie, Sport & Spaß, Familie' → ['Familie', 'Sport & Spaß'] (Reihenfolge bleibt)."""
+    if not raw:
+        return []
+    out = [c.strip() for c in str(raw).split(",")]
+    return list(dict.fromkeys(c for c in out if c))
+
+def _count_categories(values: Iterable[Optional[str]]) -> Counter:
+    counts: Counter = Counter()
+    for raw in values:
+        counts.update(split_categories(raw))
+    return counts
+
+
+# ------------------------------ Schreib-Pfad --------------------------------
+def record_category_change(sess, old: Optional[str], new: Optional[str]) -> None:
+    """Passt die Zähler für ein einzelnes Event an (alt → neu).
+       Muss in derselben Session/Transaktion wie das Event-Update laufen."""
+    record_category_changes(sess, [(old, new)])
+
+def record_category_changes(sess, changes: Iterable[Tuple[Optional[str], Optional[str]]]) -> None:
+    """Wie record_category_change für viele Events (Bulk-Upsert) – eine Differenz für alle."""
+    delta: Counter = Counter()
+    for old, new in changes:
+        old_set, new_set = set(split_categories(old)), set(split_categories(new))
+        delta.subtract(old_set - new_set)
+        delta.update(new_set - old_set)
+    _apply_delta(sess, delta)
+
+def record_categories_added(sess, values: Iterable[Optional[str]]) -> None:
+    """Zähler für viele neue Events auf einmal (Bulk-INSERT)."""
+    _apply_delta(sess, _count_categories(values))
+
+def _apply_delta(sess, delta: Dict[str, int]) -> None:
+    """Zähler atomar in der DB ändern – nie lesen, in Python rechnen, zurückschreiben."""
+    from event_bulk import dialect_insert   # event_bulk importiert facets
+    facet_t = CategoryFacet.__table__
+    up = [{"name": c, "count": d} for c, d in delta.items() if d > 0]
+    down = {c: d for c, d in delta.items() if d < 0}
+    if not up and not down:
+        return
+    if up:
+        ins = dialect_insert(sess, facet_t)
+        sess.execute(ins.on_conflict_do_update(
+            index_elements=[facet_t.c.name],
+            set_={"count": facet_t.c.count + ins.excluded["count"]},
+        ), up)
+    for name, d in down.items():
+        sess.execute(update(facet_t).where(facet_t.c.name == name).values(count=facet_t.c.count + d))
+    if down:
+        sess.execute(delete(facet_t).where(facet_t.c.name.in_(list(down)), facet_t.c.count <= 0))
+    sess.info["facets_dirty"] = True
+
+def rebuild(sess) -> int:
+    """Baut die Facetten-Tabelle komplett aus events.category neu auf."""
+    values = sess.execute(select(Event.category)).scalars()
+    counts = _count_categories(values)
+    sess.query(CategoryFacet).delete(synchronize_session=False)
+    sess.add_all(CategoryFacet(name=n, count=c) for n, c in counts.items())
+    sess.info["facets_dirty"] = True
+    return len(counts)
+
+@event.listens_for(_SASession, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("facets_dirty", False):
+        invalidate()
+
+@event.listens_for(_SASession, "after_rollback")
+def _reset_after_rollback(session):
+    session.info.pop("facets_dirty", None)
+
+
+# ------------------------------- Lese-Pfad ----------------------------------
+def invalidate() -> None:
+    with _lock:
+        _cache["items"] = None
+
+def get_category_facets(sess) -> List[Tuple[str, int]]:
+    """Sortierte Liste (Name, Anzahl) – aus dem Speicher, sonst aus category_facets."""
+    version = result_cache.current_version()
+    with _lock:
+        items, ts, cached_version = _cache["items"], _cache["ts"], _cache["version"]
+    if items is not None and cached_version == version and time.monotonic() - ts < FACET_TTL_SEC:
+        return items
+
+    rows = sess.execute(
+        select(CategoryFacet.name, CategoryFacet.count).where(CategoryFacet.count > 0)
+    ).all()
+    if rows:
+        items = sorted((name, int(cnt)) for name, cnt in rows)
+    else:
+        # Tabelle noch leer (frische DB ohne Backfill) → nur die Spalte lesen
+        items = sorted(_count_categories(sess.execute(select(Event.category)).scalars()).items())
+
+    with _lock:
+        _cache["items"], _cache["ts"], _cache["version"] = items, time.monotonic(), version
+    return items
+
+def get_categories(sess) -> List[str]:
+    return [name for name, _ in get_category_facets(sess)]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--rebuild":
+        from db import SessionLocal
+        s = SessionLocal()
+        try:
+            n = rebuild(s)
+            s.commit()
+            print(f"[facets] {n} Kategorien neu aufgebaut")
+        finally:
+            SessionLocal.remove()
@@ -0,0 +1,266 @@
+# field_extract.py
+"""
+Feld-Extraktion aus OCR-Text in einem Durchgang.
+
+Statt jede Heuristik einzeln über den Text laufen zu lassen (Datum, Uhrzeit,
+Preis, URL, Altersangabe je eine Regex, jeder Hinweis ein eigenes Suchen),
+gibt es hier zwei vorkompilierte Matcher:
+
+  - _TOKEN_RE: eine Alternation aller Muster mit benannten Gruppen, ein
+    finditer() über den Text. Die Reihenfolge der Alternativen entscheidet,
+    wer ein Textstück bekommt – "12.05.2025" ist ein Datum und nicht
+    zusätzlich "12:05" Uhr, Ziffern in URLs werden nicht als Datum gelesen.
+  - HintMatcher: Trie über alle Stichwörter (frei/kostenlos, Open Air, Orte,
+    Kategorien, Kinder/Familie) nach Aho-Corasick-Art, als eine Regex
+    kompiliert; ein Lauf über den kleingeschriebenen Text findet alle
+    Treffer gleichzeitig, auch überlappende.
+
+extract_fields() liefert alle Felder plus die Fundstellen (spans).
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from datetime import date as _date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MONTH_WORDS = {
+    'jan':1,'feb':2,'mär':3,'mrz':3,'apr':4,'mai':5,'jun':6,'jul':7,'aug':8,'sep':9,'sept':9,'okt':10,'nov':11,'dez':12
+}
+FREE_HINTS   = ['eintritt frei','kostenlos','gratis','ohne eintritt','frei']
+OUTDOOR_HINTS= ['open air','open-air','freiluft','park','platz','festivalgelände','strand','garten']
+LOCATION_HINTS=['Theater Brand','Buchhandlung am Markt','Stadthalle','Rathaus','Markt','Park','Platz','Kirche','Haus','Theater','Bürgerhaus','Bürgerzentrum']
+# Kategorie → Stichwörter; bei mehreren Treffern gewinnt die erste Kategorie
+CATEGORY_HINTS = [
+    ("Theater", ['theater']),
+    ("Familie", ['zirkus', 'kinder', 'familie']),
+    ("Konzert", ['konzert', 'musik']),
+]
+FAMILY_HINTS = ['kinder', 'familie', 'kids']
+
+# Reihenfolge = Priorität bei gleichem Startpunkt. Jahr nach Leerzeichen nur
+# vierstellig: "Sa 3.8. 14.30 Uhr" ist 3.8. plus Uhrzeit, nicht der 3.8.2014.
+_TOKEN_RE = re.compile(r'''
+    (?=[0-9hwa])     # Vorfilter: jede Alternative beginnt mit Ziffer, http/www oder "ab"
+    (?:
+    (?P<url>https?://[^\s\)\]]+|www\.[^\s\)\]]+)
+  | \b(?P<fd>\d{1,2})\s*[\.\-/]\s*(?P<fm>\d{1,2})\s*[\.\-/](?:\s+(?=\d{4}\b))?(?P<fy>\d{2,4})\b
+  | \b(?P<wd>\d{1,2})\.\s*(?P<wm>Jan|Feb|Mär|Mrz|Apr|Mai|Jun|Jul|Aug|Sep|Sept|Okt|Nov|Dez)\w*\.?,?\s*(?:(?P<wy>\d{2,4})\b(?!\s*[\.\-/]\s*\d))?
+  | (?P<price>\d{1,3}(?:[\.\,]\d{3})*(?:[\.\,]\d{2}))\s*(?:€|EUR\b)
+  | \b(?P<uh>\d{1,2})[:\.h ](?P<um>\d{2})\s*uhr\b
+  | \bab\s*(?P<age>\d{1,2})\s*(?:J|Jahre|Jahren)\b
+  | \b(?P<dd>\d{1,2})\s*[\.\-/]\s*(?P<dm>\d{1,2})(?!\s*[\.\-/](?:\d|\s+\d{4}\b))\b
+  | \b(?P<th>\d{1,2})[:\.h ](?P<tm>\d{2})\b
+    )
+''', re.I | re.X)
+# ungültiges Datum wie "14.30 - 16" oder "14.30" → als Uhrzeit retten
+_LEAD_TIME_RE = re.compile(r'(\d{1,2})[:\.h ](\d{2})\b')
+_ADDRESS_RE = re.compile(r'([A-Za-zÄÖÜäöüß\.\- ]+\s\d{1,4}[a-zA-Z]?,\s?\d{4,5}\s[A-Za-zÄÖÜäöüß\.\- ]+)')
+
+Span = Tuple[int, int]
+
+
+# -------------------------------- Stichwörter ---------------------------------
+class HintMatcher:
+    """Mehrfach-Stichwortsuche über kleingeschriebenen Text (Aho-Corasick-Idee:
+       alle Wörter in einem Trie, ein Lauf über den Text).
+
+       Ein Automat in reinem Python ist hier langsamer als die alten `in`-Prüfungen
+       (C-Schleifen) – deshalb wird der Trie in EINE Regex übersetzt
+       (b(?:ürger(?:haus|zentrum)|uchhandlung am markt)|…) und der Lauf macht die
+       re-Engine. Der Lookahead liefert an jeder Startposition das längste Wort;
+       kürzere Wörter mit gleichem Anfang ("theater" in "theater brand") hängen als
+       Präfixe schon an dessen Payload. Jedes Wort trägt eine Liste von (art, wert) –
+       dasselbe Wort kann mehreren Heuristiken dienen."""
+
+    def __init__(self, patterns: Dict[str, List[Tuple[str, object]]]):
+        trie: dict = {}
+        for word in patterns:
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[""] = word
+        # Payload eines Wortes = eigene + die aller Wörter, die Präfix davon sind
+        self._payload: Dict[str, List[Tuple[str, List[Tuple[str, object]]]]] = {}
+        for word in patterns:
+            self._payload[word] = [(word[:i], patterns[word[:i]]) for i in range(1, len(word) + 1)
+                                   if word[:i] in patterns]
+        first = "".join(sorted(trie))
+        self._re = re.compile(f"(?=[{re.escape(first)}])(?=({self._trie_re(trie)}))")
+
+    @classmethod
+    def _trie_re(cls, node: dict) -> str:
+        alts = [re.escape(ch) + cls._trie_re(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:   # hier endet ein Wort – Rest optional (gierig → längstes Wort)
+            body = (f"(?:{body})?" if len(alts) == 1 else body + "?")
+        return body
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, str, List[Tuple[str, object]]]]:
+        """(start, ende, wort, payload) für jeden – auch überlappenden – Treffer."""
+        for m in self._re.finditer(text):
+            start = m.start()
+            for word, payload in self._payload[m.group(1)]:
+                yield start, start + len(word), word, payload
+
+
+def _build_hint_matcher() -> HintMatcher:
+    patterns: Dict[str, List[Tuple[str, object]]] = {}
+    def add(word: str, kind: str, value: object) -> None:
+        patterns.setdefault(word.lower(), []).append((kind, value))
+    for h in FREE_HINTS:
+        add(h, "free", True)
+    for h in OUTDOOR_HINTS:
+        add(h, "outdoor", True)
+    for i, h in enumerate(LOCATION_HINTS):
+        add(h, "location", i)
+    for i, (_, words) in enumerate(CATEGORY_HINTS):
+        for w in words:
+            add(w, "category", i)
+    for h in FAMILY_HINTS:
+        add(h, "family", True)
+    return HintMatcher(patterns)
+
+HINTS = _build_hint_matcher()
+
+
+# --------------------------------- Ergebnis ----------------------------------
+@dataclass
+class ExtractedFields:
+    dates: List[str] = field(default_factory=list)
+    time: Optional[str] = None
+    prices: List[float] = field(default_factory=list)
+    is_free: Optional[bool] = None
+    is_outdoor: Optional[bool] = None
+    location: Optional[str] = None
+    category: str = "Sonstiges"
+    age_group: Optional[str] = None
+    url: Optional[str] = None
+    spans: Dict[str, List[Span]] = field(default_factory=dict)
+
+    def _span(self, name: str, span: Span) -> None:
+        self.spans.setdefault(name, []).append(span)
+
+    @property
+    def price(self) -> Optional[float]:
+        return min(self.prices) if self.prices else None
+
+
+def _guess_year(month: int) -> int:
+    today = _date.today()
+    return today.year + (1 if month < today.month else 0)
+
+def _iso(year: int, month: int, day: int) -> Optional[str]:
+    try:
+        return _date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+def _time(h: str, m: str) -> Optional[str]:
+    hh, mm = int(h), int(m)
+    return f"{hh:02d}:{mm:02d}" if hh < 24 and mm < 60 else None
+
+
+# -------------------------------- Extraktion ---------------------------------
+def extract_fields(text: str) -> ExtractedFields:
+    """Alle Felder aus (normalisiertem, einzeiligem) OCR-Text."""
+    r = ExtractedFields()
+    dates: set = set()
+    full_dm: set = set()    # (tag, monat) aus vollen Daten – "12.05." daneben ist kein neues Datum
+    short: List[Tuple[int, int, Span]] = []
+    times: List[Tuple[int, str, Span]] = []
+
+    def rescue_time(m) -> None:
+        lt = _LEAD_TIME_RE.match(text, m.start())
+        t = lt and _time(*lt.groups())
+        if t:
+            times.append((lt.start(), t, lt.span()))
+
+    for m in _TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "url":
+            if r.url is None:
+                u = m.group("url")
+                r.url = "http://" + u if u.lower().startswith("www.") else u
+            r._span("source_url", m.span())
+        elif kind == "fy":
+            y = m.group("fy")
+            year = int(y) if len(y) == 4 else 2000 + int(y)
+            d, mo = int(m.group("fd")), int(m.group("fm"))
+            iso = _iso(year, mo, d)
+            if iso:
+                dates.add(iso); full_dm.add((d, mo)); r._span("date", m.span())
+            else:
+                rescue_time(m)
+        elif kind in ("wm", "wy"):
+            mw = m.group("wm").lower()
+            month = next((v for k, v in MONTH_WORDS.items() if mw.startswith(k)), 0)
+            if month:
+                y = m.group("wy")
+                year = int(y) if y else _guess_year(month)
+                if year < 100: year += 2000
+                iso = _iso(year, month, int(m.group("wd")))
+                if iso:
+                    dates.add(iso); r._span("date", m.span())
+        elif kind == "price":
+            try:
+                r.prices.append(float(m.group("price").replace('.', '').replace(',', '.')))
+                r._span("price", m.span())
+            except ValueError:
+                pass
+        elif kind in ("um", "tm"):
+            t = _time(*(m.group("uh", "um") if kind == "um" else m.group("th", "tm")))
+            if t:
+                times.append((m.start(), t, m.span()))
+        elif kind == "age":
+            if r.age_group is None:
+                r.age_group = f"ab {m.group('age')} Jahren"; r._span("age_group", m.span())
+        elif kind == "dm":
+            short.append((int(m.group("dd")), int(m.group("dm")), m))
+
+    for d, mo, m in short:
+        if (d, mo) in full_dm:
+            continue
+        iso = _iso(_guess_year(mo), mo, d) if 1 <= mo <= 12 else None
+        if iso:
+            dates.add(iso); r._span("date", m.span())
+        else:
+            rescue_time(m)
+    r.dates = sorted(dates)
+    if times:
+        _, r.time, span = min(times)
+        r._span("time", span)
+
+    # Stichwörter: ein Aho-Corasick-Lauf
+    loc_idx, cat_idx, family = None, None, False
+    for start, end, _, payload in HINTS.iter(text.lower()):
+        for kind, value in payload:
+            if kind == "free":
+                r.is_free = True; r._span("is_free", (start, end))
+            elif kind == "outdoor":
+                r.is_outdoor = True; r._span("is_outdoor", (start, end))
+            elif kind == "location":
+                if loc_idx is None or value < loc_idx:
+                    loc_idx = value
+                r._span("location", (start, end))
+            elif kind == "category":
+                if cat_idx is None or value < cat_idx:
+                    cat_idx = value
+                r._span("category", (start, end))
+            elif kind == "family":
+                family = True
+
+    if r.is_free is None and r.prices:
+        r.is_free = False
+    if loc_idx is not None:
+        r.location = LOCATION_HINTS[loc_idx]
+    else:
+        m = _ADDRESS_RE.search(text)   # nur ohne bekannten Ort – die Regex ist teuer
+        if m:
+            r.location = m.group(1); r._span("location", m.span(1))
+    if cat_idx is not None:
+        r.category = CATEGORY_HINTS[cat_idx][0]
+    if r.age_group is None and family:
+        r.age_group = "Familie/Kinder"
+    return r
@@ -0,0 +1,138 @@
+# geo_utils.py
+"""
+Umkreissuche: Geocoding des Suchorts, Bounding-Box und Haversine-Distanzen.
+
+Ablauf in event_search:
+  1) Ort → (lat, lon) per geocode() (Speicher-Cache → Nominatim → bekannte Events;
+     Fehlschläge/Fallback nur GEOCODE_MISS_TTL_SEC im Cache)
+  2) Vorfilter in SQL über die indizierte Bounding-Box (ix_events_lat_lon)
+  3) exakte Distanzen für alle Box-Kandidaten in einem Durchgang
+     (numpy, falls installiert – sonst reines Python)
+"""
+from __future__ import annotations
+import importlib, math, os, threading, time
+from typing import Iterable, List, Optional, Tuple
+
+import requests
+from sqlalchemy import func
+
+from models import Event
+
+EARTH_RADIUS_KM = 6371.0088
+GEOCODER_URL = os.getenv("GEOCODER_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODER_ONLINE = os.getenv("GEOCODER_ONLINE", "1") == "1"
+GEOCODER_TIMEOUT_SEC = float(os.getenv("GEOCODER_TIMEOUT_SEC", "4"))
+GEOCODER_HEADERS = {"User-Agent": "familysout/1.0 (+https://www.familysout.de)"}
+GEOCODE_CACHE_MAX = 2048
+# Fehlschläge und der Event-Mittelpunkt (Nominatim down, Ort noch ohne Events)
+# nur kurz merken – ein Treffer von Nominatim bleibt bis zur Verdrängung.
+GEOCODE_MISS_TTL_SEC = int(os.getenv("GEOCODE_MISS_TTL_SEC", "300"))
+
+_lock = threading.Lock()
+_geocode_cache: dict = {}     # key → (point, expires_at | None)
+
+
+def _np():
+    try:
+        return importlib.import_module("numpy")
+    except Exception:
+        return None
+
+
+# --------------------------------- Distanzen ---------------------------------
+def bbox(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) – umschließt den Kreis vollständig."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    coslat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(math.degrees(radius_km / (EARTH_RADIUS_KM * coslat)), 180.0)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+def haversine_km(lat0: float, lon0: float, lats: Iterable[float], lons: Iterable[float]) -> List[float]:
+    """Distanzen (km) von einem Punkt zu vielen Punkten in einem Durchgang."""
+    np = _np()
+    if np is not None:
+        la = np.radians(np.asarray(lats, dtype=float))
+        lo = np.radians(np.asarray(lons, dtype=float))
+        p0, l0 = math.radians(lat0), math.radians(lon0)
+        a = np.sin((la - p0) / 2) ** 2 + math.cos(p0) * np.cos(la) * np.sin((lo - l0) / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))).tolist()
+
+    p0, l0 = math.radians(lat0), math.radians(lon0)
+    cos_p0 = math.cos(p0)
+    sin, cos, asin, sqrt, rad = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    out = []
+    for la, lo in zip(lats, lons):
+        la, lo = rad(la), rad(lo)
+        a = sin((la - p0) / 2) ** 2 + cos_p0 * cos(la) * sin((lo - l0) / 2) ** 2
+        out.append(2 * EARTH_RADIUS_KM * asin(sqrt(min(a, 1.0))))
+    return out
+
+def within_radius(lat0: float, lon0: float, radius_km: float,
+                  rows: List[Tuple[int, float, float]]) -> List[Tuple[float, int]]:
+    """rows = [(id, lat, lon), …] → sortierte [(distanz_km, id), …] innerhalb des Radius."""
+    if not rows:
+        return []
+    ids, lats, lons = zip(*rows)
+    dists = haversine_km(lat0, lon0, lats, lons)
+    return sorted((round(d, 3), i) for d, i in zip(dists, ids) if d <= radius_km)
+
+
+# -------------------------------- Geocoding ----------------------------------
+def parse_latlon(lat, lon) -> Optional[Tuple[float, float]]:
+    try:
+        la, lo = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if -90 <= la <= 90 and -180 <= lo <= 180:
+        return la, lo
+    return None
+
+def _geocode_online(place: str) -> Optional[Tuple[float, float]]:
+    try:
+        r = requests.get(
+            GEOCODER_URL,
+            params={"q": place, "format": "json", "limit": 1, "countrycodes": "de"},
+            headers=GEOCODER_HEADERS,
+            timeout=GEOCODER_TIMEOUT_SEC,
+        )
+        r.raise_for_status()
+        hits = r.json()
+        if hits:
+            return float(hits[0]["lat"]), float(hits[0]["lon"])
+    except Exception:
+        pass
+    return None
+
+def _geocode_from_events(sess, place: str) -> Optional[Tuple[float, float]]:
+    """Fallback: Mittelpunkt bekannter Events mit passendem Ort."""
+    row = (
+        sess.query(func.avg(Event.lat), func.avg(Event.lon))
+        .filter(Event.location.ilike(f"%{place}%"), Event.lat.isnot(None), Event.lon.isnot(None))
+        .one()
+    )
+    return (float(row[0]), float(row[1])) if row[0] is not None else None
+
+def geocode(place: str, sess=None) -> Optional[Tuple[float, float]]:
+    key = (place or "").strip().lower()
+    if not key:
+        return None
+    with _lock:
+        hit = _geocode_cache.get(key)
+        if hit is not None:
+            point, expires_at = hit
+            if expires_at is None or time.monotonic() < expires_at:
+                return point
+            del _geocode_cache[key]
+
+    point = _geocode_online(place) if GEOCODER_ONLINE else None
+    expires_at = None
+    if point is None:
+        if sess is not None:
+            point = _geocode_from_events(sess, place)
+        expires_at = time.monotonic() + GEOCODE_MISS_TTL_SEC
+
+    with _lock:
+        if len(_geocode_cache) >= GEOCODE_CACHE_MAX:
+            _geocode_cache.pop(next(iter(_geocode_cache)))
+        _geocode_cache[key] = (point, expires_at)
+    return point
@@ -0,0 +1,200 @@
+"""
+Mikro-Benchmark der Feld-Extraktion: field_extract (ein Durchlauf) gegen die
+frühere Variante (eine Regex/Suche pro Heuristik, unten als legacy_extract).
+
+Korpus: .txt-Dateien, OCR-Cache-Einträge (*.json mit "text") oder synthetische
+Flyer-Texte. Vor jeder Messung laufen die Korrektheitsfälle (CASES) – ein
+schnellerer, aber falscher Extraktor bricht mit Exit-Code 1 ab.
+
+Beispiele:
+  python -m jobs.field_bench                      # OCR-Cache (OCR_CACHE_DIR)
+  python -m jobs.field_bench ocr-texte/ --repeat 20
+  python -m jobs.field_bench --synthetic 500 --json
+  python -m jobs.field_bench --check              # nur Korrektheitsfälle
+"""
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import date as _date
+from typing import List
+
+from field_extract import (
+    FREE_HINTS, LOCATION_HINTS, MONTH_WORDS, OUTDOOR_HINTS, extract_fields,
+)
+from ocr_cache import OCR_CACHE_DIR
+
+
+# ------------------------- frühere Implementierung ---------------------------
+TIME_RE = re.compile(r'\b(\d{1,2})[:\.h ](\d{2})\s*(?:uhr)?\b', re.I)
+DATE_FULL_RE = re.compile(r'\b(\d{1,2})\s*[\.\-/]\s*(\d{1,2})\s*[\.\-/]\s*(\d{2,4})\b')
+DATE_DM_RE = re.compile(r'\b(\d{1,2})\s*[\.\-/]\s*(\d{1,2})(?!\s*[\.\-/]\s*\d)\b')
+DATE_WORD_RE = re.compile(r'\b(\d{1,2})\.\s*(Jan|Feb|Mär|Mrz|Apr|Mai|Jun|Jul|Aug|Sep|Sept|Okt|Nov|Dez)\w*\.?,?\s*(\d{2,4})?\b', re.I)
+PRICE_RE = re.compile(r'(\d{1,3}(?:[\.\,]\d{3})*(?:[\.\,]\d{2}))\s*(?:€|EUR)\b')
+URL_RE   = re.compile(r'(https?://[^\s\)\]]+|www\.[^\s\)\]]+)', re.I)
+
+def _guess_year(month: int) -> int:
+    today = _date.today()
+    return today.year + (1 if month < today.month else 0)
+
+def legacy_extract(text: str) -> dict:
+    dates = set()
+    for d, m, y in DATE_FULL_RE.findall(text):
+        try:
+            year = int(y) if len(y) == 4 else 2000 + int(y)
+            dates.add(_date(year, int(m), int(d)).isoformat())
+        except ValueError: pass
+    for d, m in DATE_DM_RE.findall(text):
+        if re.search(rf'\b{re.escape(d)}\s*[\.\-/]\s*{re.escape(m)}\s*[\.\-/]\s*\d{{2,4}}\b', text):
+            continue
+        try:
+            dates.add(_date(_guess_year(int(m)), int(m), int(d)).isoformat())
+        except ValueError: pass
+    for d, mw, y in DATE_WORD_RE.findall(text):
+        month = next((v for k, v in MONTH_WORDS.items() if mw.lower().startswith(k)), 0)
+        if not month: continue
+        try:
+            year = int(y) if y else _guess_year(month)
+            if year < 100: year += 2000
+            dates.add(_date(year, month, int(d)).isoformat())
+        except ValueError: pass
+    m = TIME_RE.search(text)
+    time_ = f"{int(m.group(1)):02d}:{int(m.group(2)):02d}" if m else None
+    prices = []
+    for raw in PRICE_RE.findall(text):
+        try: prices.append(float(raw.replace('.', '').replace(',', '.')))
+        except ValueError: pass
+    t = text.lower()
+    is_free = True if any(h in t for h in FREE_HINTS) else (False if prices else None)
+    location = next((h for h in LOCATION_HINTS if re.search(re.escape(h), text, flags=re.I)), None)
+    if location is None:
+        m = re.search(r'([A-Za-zÄÖÜäöüß\.\- ]+\s\d{1,4}[a-zA-Z]?,\s?\d{4,5}\s[A-Za-zÄÖÜäöüß\.\- ]+)', text)
+        location = m.group(1) if m else None
+    t = text.lower()
+    if re.search(r'theater|theaterst(ü|u)ck', t): category = "Theater"
+    elif 'zirkus' in t or 'kinder' in t or 'familie' in t: category = "Familie"
+    elif 'konzert' in t or 'musik' in t: category = "Konzert"
+    else: category = "Sonstiges"
+    m_age = re.search(r'\bab\s*(\d{1,2})\s*(?:J|Jahre|Jahren)\b', text, flags=re.I)
+    age_group = f"ab {m_age.group(1)} Jahren" if m_age else (
+        "Familie/Kinder" if re.search(r'Kinder|Familie|Kids', text, flags=re.I) else None)
+    m = URL_RE.search(text)
+    url = m.group(1) if m else None
+    t = text.lower()
+    is_outdoor = True if any(h in t for h in OUTDOOR_HINTS) else None
+    return {"dates": sorted(dates), "time": time_, "prices": prices, "is_free": is_free,
+            "location": location, "category": category, "age_group": age_group,
+            "url": url, "is_outdoor": is_outdoor}
+
+
+# ---------------------------------- Korpus -----------------------------------
+SNIPPETS = [
+    "Kinderfest im Stadtpark", "am {d}.{m}.2026", "{d}. Mai", "ab {h}:30 Uhr", "Eintritt frei",
+    "Tickets 12,50 €", "Stadthalle", "Musik & Theater für die ganze Familie", "ab 6 Jahren",
+    "www.beispiel.de/programm", "Open Air", "Lindenstraße 12, 12345 Musterstadt", "Bastelworkshop",
+    "Einlass {h}.00 Uhr", "Vorverkauf 8,00 EUR", "Bürgerhaus", "Lesung mit Autorin", "Zirkus Roncalli",
+]
+
+# Text → erwartete Felder; Daten als (Monat, Tag), das Jahr rät _guess_year wie
+# in field_extract (Kurzdaten ohne Jahr).
+CASES = [
+    ("Sa 3.8. 14.30 Uhr", {"dates": [(8, 3)], "time": "14:30"}),
+    ("Fr 7.11. 10.00 Uhr", {"dates": [(11, 7)], "time": "10:00"}),
+    ("12. 05. 2025 um 15:00 Uhr", {"dates": ["2025-05-12"], "time": "15:00"}),
+    ("3.8. 2026, Einlass 14 Uhr", {"dates": ["2026-08-03"], "time": None}),
+    ("Kinderfest 14.30 - 16 Uhr, Eintritt frei", {"dates": [], "time": "14:30", "is_free": True}),
+    ("So 5. Okt. 2025 ab 11:00 Uhr, Tickets 8,50 €", {"dates": ["2025-10-05"], "time": "11:00", "prices": [8.5]}),
+]
+
+def _expected_dates(dates) -> List[str]:
+    return sorted(d if isinstance(d, str) else _date(_guess_year(d[0]), d[0], d[1]).isoformat() for d in dates)
+
+def check_cases() -> List[str]:
+    """Abweichungen von CASES als lesbare Zeilen (leer = alles korrekt)."""
+    errors = []
+    for text, expected in CASES:
+        r = extract_fields(text)
+        for key, want in expected.items():
+            got = getattr(r, key)
+            if key == "dates":
+                want = _expected_dates(want)
+            if got != want:
+                errors.append(f"{text!r}: {key} = {got!r}, erwartet {want!r}")
+    return errors
+
+def synthetic_corpus(n: int, seed: int = 7) -> List[str]:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        parts = rnd.choices(SNIPPETS, k=rnd.randint(8, 40))
+        out.append(" ".join(p.format(d=rnd.randint(1, 28), m=rnd.randint(1, 12), h=rnd.randint(9, 20)) for p in parts))
+    return out
+
+def load_corpus(target: str) -> List[str]:
+    paths = glob.glob(os.path.join(target, "**", "*"), recursive=True) if os.path.isdir(target) else glob.glob(target)
+    texts = []
+    for p in sorted(paths):
+        try:
+            if p.endswith(".txt"):
+                with open(p, "r", encoding="utf-8") as f:
+                    texts.append(f.read())
+            elif p.endswith(".json"):
+                with open(p, "r", encoding="utf-8") as f:
+                    texts.append(json.load(f).get("text") or "")
+        except (OSError, ValueError):
+            continue
+    return [re.sub(r'\s+', ' ', t) for t in texts if t]
+
+def timed(fn, texts: List[str], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - t0) * 1e6 / (repeat * len(texts))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("target", nargs="?", default=OCR_CACHE_DIR, help="Verzeichnis/Glob mit .txt oder OCR-Cache-.json")
+    ap.add_argument("--synthetic", type=int, default=0, help="N synthetische Flyer-Texte statt Dateien")
+    ap.add_argument("--repeat", type=int, default=10, help="Durchläufe über das Korpus")
+    ap.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    ap.add_argument("--check", action="store_true", help="nur die Korrektheitsfälle prüfen")
+    args = ap.parse_args()
+
+    errors = check_cases()
+    for line in errors:
+        print(f"FALSCH {line}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+    if args.check:
+        print(f"{len(CASES)} Korrektheitsfälle ok")
+        return
+
+    texts = synthetic_corpus(args.synthetic) if args.synthetic else load_corpus(args.target)
+    if not texts:
+        print(f"Kein Korpus gefunden: {args.target} (oder --synthetic N)", file=sys.stderr)
+        sys.exit(2)
+
+    repeat = max(1, args.repeat)
+    legacy_us = timed(legacy_extract, texts, repeat)
+    single_us = timed(extract_fields, texts, repeat)
+    avg_len = sum(len(t) for t in texts) / len(texts)
+    result = {"texts": len(texts), "avg_chars": round(avg_len), "legacy_us": round(legacy_us, 1),
+              "single_pass_us": round(single_us, 1), "speedup": round(legacy_us / single_us, 2)}
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{len(texts)} Texte (Ø {avg_len:.0f} Zeichen) × {repeat}")
+    print(f"  legacy       {legacy_us:>9.1f} µs/Text")
+    print(f"  single-pass  {single_us:>9.1f} µs/Text  ×{result['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,42 @@ Beispiele:
   python -m jobs.kingkalli_run_batch
   python -m jobs.kingkalli_run_batch --max-pages 1 --limit 10 --dry-run
   python -m jobs.kingkalli_run_batch --workers 1 --json
+
+Liste und Detailseiten laufen über eine gemeinsame asynchrone FetchEngine
+(crawler/fetch_engine.py): ein Connection-Pool, Limits pro Host, Timeouts und
+Retries. --workers = gleichzeitige Requests pro Host (sonst `concurrency`
+aus sources.yaml bzw. CRAWL_PER_HOST).
+
+HTTP-Cache (crawler/http_cache.py): Detailseiten laufen als Conditional GET;
+bei 304 (oder jünger als `cache_ttl` der Quelle) wird weder geparst noch
+upgesertet ("Unverändert (HTTP)"). In den Cache kommt eine Seite erst nach
+erfolgreichem Upsert – nicht im --dry-run. --no-cache lädt alles neu.
+
+Ablauf als Pipeline (CrawlPipeline): Liste → Detail-Fetch → Parse → DB-Writer,
+gleichzeitig und über begrenzte Queues verbunden; Detailseiten starten mit den
+Links der ersten Listenseite. Kein festes Warten mehr zwischen Upserts –
+höflich bleibt der Crawl über die Limits der FetchEngine.
 """
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
 import argparse
-import concurrent.futures as cf
+import asyncio
 import json
 import sys
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 
 from crawler.source_loader import get_source
-from crawler.kingkalli_list import crawl_list
-from crawler.kingkalli_scrape_one import scrape_kingkalli_detail
+from crawler.fetch_engine import CRAWL_PER_HOST, FetchEngine
+from crawler.http_cache import HttpCache
+from crawler.kingkalli_list import iter_list_pages
+from crawler.kingkalli_scrape_one import HEADERS as DETAIL_HEADERS, parse_kingkalli_detail
 from db import SessionLocal
-import models as m
-from jobs.kingkalli_upsert import upsert_event
+from event_bulk import check_upsert_support, touch_seen_urls, upsert_events
+from jobs.kingkalli_upsert import row_from_scraped
 
 import yaml
 from datetime import datetime
@@ -32,6 +50,9 @@ ALWAYS_OPEN_PATH = os.path.join(
     "..", "crawler", "data", "always_open.yaml"
 )
 ALWAYS_OPEN_PATH = os.path.abspath(ALWAYS_OPEN_PATH)
+CRAWL_QUEUE_SIZE = int(os.getenv("CRAWL_QUEUE_SIZE", "50"))
+CRAWL_WRITE_BATCH = int(os.getenv("CRAWL_WRITE_BATCH", "50"))
+CRAWL_WRITE_WAIT_SEC = float(os.getenv("CRAWL_WRITE_WAIT_SEC", "1.0"))
 
 def load_always_open():
     if not os.path.exists(ALWAYS_OPEN_PATH):
@@ -74,157 +95,262 @@ def log_err(msg: str):  print(f"{RED}[ERR]{RESET}  {msg}")
 def log_step(title: str): print(f"\n{BOLD}{title}{RESET}")
 
 # -------- Worker: eine Detailseite verarbeiten --------
-def process_one(url: str, json_out: bool = False) -> Tuple[Optional[dict], Optional[str]]:
+def enrich(data: dict, url: str, json_out: bool = False) -> dict:
+    """Immer-offen / Öffnungszeiten anreichern (+ optional JSON-Zeile loggen)."""
+    ao = match_always_open(data.get("location"))
+    if ao:
+        data["is_always_open"] = True
+        data["opening_hours"] = ao.get("opening_hours", {})
+        data["holidays_closed"] = ao.get("holidays_closed", [])
+    else:
+        data["is_always_open"] = False
+
+    if json_out:
+        print(json.dumps({
+            "url": url,
+            "title": data.get("title"),
+            "start_dt": data.get("start_dt"),
+            "always_open": data.get("is_always_open"),
+        }, ensure_ascii=False))
+    return data
+
+# -------- Pipeline --------
+_DONE = object()   # Ende-Marker in den Queues
+_STATE_STAT = {"new": "new", "updated": "upd", "unchanged": "unchanged"}
+_STATE_LABEL = {"new": "Neu", "updated": "Aktualisiert", "unchanged": "Unverändert"}
+
+class CrawlPipeline:
     """
-    Scraped eine Event-Detailseite.
-    Rückgabe: (data, err_msg). Bei Erfolg err_msg=None.
+    Liste → Detail-Fetch → Parse → DB-Writer als gleichzeitige Stufen,
+    verbunden über begrenzte Queues (CRAWL_QUEUE_SIZE):
+
+      - list:   reicht die Links jeder Listenseite sofort weiter
+      - fetch:  `fetchers` Tasks, Conditional GET über die gemeinsame Engine
+      - parse:  Parsen/Anreichern in einem eigenen Thread (Event-Loop bleibt frei)
+      - write:  sammelt Batches (CRAWL_WRITE_BATCH) und schreibt sie mit einem
+                INSERT … ON CONFLICT (dedupe_key) DO UPDATE + einem Commit,
+                in genau einem DB-Thread (eine Session); Events mit gleichem
+                content_hash werden nicht geschrieben, nur last_seen_at
+
+    Volle Queues bremsen die Stufe davor (Backpressure) – Detailseiten laufen
+    schon, während die Liste noch blättert; die Laufzeit nähert sich der
+    langsamsten Stufe statt der Summe aller Stufen.
     """
-    t0 = time.time()
-    try:
-        data = scrape_kingkalli_detail(url)
-
-        # Immer-offen / Öffnungszeiten anreichern
-        ao = match_always_open(data.get("location"))
-        if ao:
-            data["is_always_open"] = True
-            data["opening_hours"] = ao.get("opening_hours", {})
-            data["holidays_closed"] = ao.get("holidays_closed", [])
-        else:
-            data["is_always_open"] = False
-
-        if json_out:
-            print(json.dumps({
-                "url": url,
-                "title": data.get("title"),
-                "start_dt": data.get("start_dt"),
-                "always_open": data.get("is_always_open"),
-            }, ensure_ascii=False))
-
-        return data, None
-    except Exception as e:
-        return None, f"{e.__class__.__name__}: {e}"
-    finally:
-        _ = (time.time() - t0) * 1000  # für spätere Messungen
-
-# -------- Helper --------
-def _find_existing_event(sess, data):
-    """Heuristik: prüft, ob Event in der DB existiert (Titel + Quelle + Datum)."""
-    q = sess.query(m.Event).filter(m.Event.title.ilike((data.get("title") or "").lower()))
-    if hasattr(m.Event, "source_name"):
-        q = q.filter(m.Event.source_name.ilike((data.get("source_name") or "").lower()))
-    if hasattr(m.Event, "date"):
-        q = q.filter(m.Event.date == (data.get("start_dt") or data.get("date") or ""))
-    return q.first()
-
-# -------- Runner --------
-def run(source_name="kingkalli", workers=4, limit=None, throttle=0.3,
-        dry_run=False, json_out=False, override_max_pages=None):
 
-    sess = SessionLocal()
-    try:
+    def __init__(self, eng: FetchEngine, sess, fetchers: int, limit=None,
+                 dry_run=False, json_out=False, queue_size: int = CRAWL_QUEUE_SIZE,
+                 batch_size: int = CRAWL_WRITE_BATCH):
+        self.eng = eng
+        self.sess = sess
+        self.fetchers = max(1, fetchers)
+        self.limit = limit
+        self.dry_run = dry_run
+        self.json_out = json_out
+        self.batch_size = max(1, batch_size)
+        self.url_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.html_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.write_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.parse_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse")
+        self.db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        self.stats = {"links": 0, "done": 0, "ok": 0, "upd": 0, "new": 0, "unchanged": 0, "err": 0,
+                      "not_modified": 0}
+        self.not_modified_urls: List[str] = []
+
+    def _prefix(self) -> str:
+        return f"{self.stats['done']}/{self.stats['links']} "
+
+    def _fail(self, url: str, what: str, e: Exception) -> None:
+        self.stats["done"] += 1
+        self.stats["err"] += 1
+        log_err(f"{self._prefix()}{what} fail: {url} -> {e.__class__.__name__}: {e}")
+
+    async def _list_stage(self, start_url: str, headers: dict, max_pages: int) -> None:
         try:
-            src = get_source(source_name)
+            async for links in iter_list_pages(self.eng, start_url, headers, max_pages):
+                for u in links:
+                    if self.limit and self.stats["links"] >= self.limit:
+                        break
+                    self.stats["links"] += 1
+                    await self.url_q.put(u)
+                if self.limit and self.stats["links"] >= self.limit:
+                    break
         except Exception as e:
-            log_err(str(e))
-            return 2
+            # bis hierhin gefundene Links laufen weiter durch die Pipeline
+            self.stats["err"] += 1
+            log_err(f"Listenseite fehlgeschlagen: {e.__class__.__name__}: {e}")
+        for _ in range(self.fetchers):
+            await self.url_q.put(_DONE)
 
-        start_url = src["start_url"]
-        headers = src.get("headers", {})
-        max_pages = int(override_max_pages or src.get("max_pages", 3))
+    async def _fetch_stage(self) -> None:
+        while True:
+            url = await self.url_q.get()
+            if url is _DONE:
+                return
+            try:
+                resp = await self.eng.get(url, headers=DETAIL_HEADERS, store=False)
+            except Exception as e:
+                self._fail(url, "scrape", e)
+                continue
+            if resp.not_modified:
+                self.stats["done"] += 1
+                self.stats["not_modified"] += 1
+                self.not_modified_urls.append(url)
+                continue
+            await self.html_q.put((url, resp))
 
-        log_step(f"1) {source_name}: Liste crawlen")
-        links = crawl_list(start_url, headers=headers, max_pages=max_pages)
-        if not links:
-            log_warn("Keine Links gefunden.")
-            return 0
-        if limit:
-            links = links[:limit]
-        log_info(f"{len(links)} Links gefunden.")
+    async def _fetch_all(self) -> None:
+        await asyncio.gather(*(self._fetch_stage() for _ in range(self.fetchers)))
+        await self.html_q.put(_DONE)
 
-        # Stats
-        n_done = n_ok = n_upd = n_new = n_err = 0
-        t_start = time.time()
+    def _parse(self, url: str, html: str) -> dict:
+        return enrich(parse_kingkalli_detail(html, url), url, self.json_out)
 
-        if workers <= 1:
-            # Seriell
-            for idx, url in enumerate(links, 1):
-                log_info(f"{idx}/{len(links)} – scrape: {url}")
-                data, err = process_one(url, json_out=json_out)
-                n_done += 1
-                if err:
-                    n_err += 1
-                    log_err(f"scrape fail: {url} -> {err}")
-                    continue
+    async def _parse_stage(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.html_q.get()
+            if item is _DONE:
+                break
+            url, resp = item
+            try:
+                data = await loop.run_in_executor(self.parse_pool, self._parse, url, resp.text)
+            except Exception as e:
+                self._fail(url, "parse", e)
+                continue
+            await self.write_q.put((url, data, resp))
+        await self.write_q.put(_DONE)
 
-                if dry_run:
+    def _write_batch(self, batch: List[tuple]) -> List[Tuple[tuple, Optional[str], Optional[Exception]]]:
+        """Im DB-Thread: ein Upsert-Statement + ein Commit für den ganzen Batch.
+           Schlägt der Batch fehl, einzeln nachschreiben (fehlerhaftes Item isolieren).
+           Rückgabe pro Item (item, zustand | None, fehler | None) – Statistik und
+           Log führt der Event-Loop, self.stats wird hier nicht angefasst."""
+        rows = [row_from_scraped(data) for _, data, _ in batch]
+        try:
+            res = upsert_events(self.sess, rows)
+            self.sess.commit()
+        except Exception as e:
+            self.sess.rollback()
+            if len(batch) == 1:
+                return [(batch[0], None, e)]
+            log_warn(f"Batch mit {len(batch)} Events fehlgeschlagen ({e.__class__.__name__}) – schreibe einzeln")
+            outcomes = []
+            for item in batch:
+                outcomes += self._write_batch([item])
+            return outcomes
+        return [(item, res[row["dedupe_key"]][1], None) for item, row in zip(batch, rows)]
+
+    async def _next_batch(self) -> Tuple[List[tuple], bool]:
+        """Bis zu batch_size Items; wartet nach dem ersten höchstens CRAWL_WRITE_WAIT_SEC
+           auf weitere. Rückgabe: (batch, ende_erreicht)."""
+        item = await self.write_q.get()
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        while len(batch) < self.batch_size:
+            try:
+                item = await asyncio.wait_for(self.write_q.get(), CRAWL_WRITE_WAIT_SEC)
+            except asyncio.TimeoutError:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _write_stage(self) -> None:
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            batch, finished = await self._next_batch()
+            if not batch:
+                continue
+            if self.dry_run:
+                for url, data, _ in batch:
+                    self.stats["done"] += 1
                     badge = " [Immer offen]" if data.get("is_always_open") else ""
-                    log_ok(f"OK (dry-run): {data.get('title')} | {data.get('start_dt')}{badge}")
-                else:
-                    try:
-                        existed = _find_existing_event(sess, data) is not None
-                        upsert_event(sess, data)
-                        sess.commit()
-                        badge = " [Immer offen]" if data.get("is_always_open") else ""
-                        if not existed:
-                            n_new += 1
-                            log_ok(f"Neu: {data.get('title')} | {data.get('start_dt')}{badge}")
-                        else:
-                            n_upd += 1
-                            log_ok(f"Aktualisiert: {data.get('title')} | {data.get('start_dt')}{badge}")
-                        n_ok += 1
-                    except Exception as e:
-                        sess.rollback()
-                        n_err += 1
-                        log_err(f"upsert fail: {url} -> {e}")
-
-                if throttle:
-                    time.sleep(throttle)
-        else:
-            # Parallel (I/O-bound)
-            with cf.ThreadPoolExecutor(max_workers=workers) as ex:
-                fut_map = {ex.submit(process_one, u, json_out): u for u in links}
-                for i, fut in enumerate(cf.as_completed(fut_map), 1):
-                    url = fut_map[fut]
-                    data, err = fut.result()
-                    n_done += 1
-                    if err:
-                        n_err += 1
-                        log_err(f"{i}/{len(links)} scrape fail: {url} -> {err}")
-                        continue
-
-                    if dry_run:
-                        badge = " [Immer offen]" if data.get("is_always_open") else ""
-                        log_ok(f"{i}/{len(links)} OK (dry-run): {data.get('title')} | {data.get('start_dt')}{badge}")
-                    else:
-                        try:
-                            existed = _find_existing_event(sess, data) is not None
-                            upsert_event(sess, data)
-                            sess.commit()
-                            badge = " [Immer offen]" if data.get("is_always_open") else ""
-                            if not existed:
-                                n_new += 1
-                                log_ok(f"{i}/{len(links)} Neu: {data.get('title')} | {data.get('start_dt')}{badge}")
-                            else:
-                                n_upd += 1
-                                log_ok(f"{i}/{len(links)} Aktualisiert: {data.get('title')} | {data.get('start_dt')}{badge}")
-                            n_ok += 1
-                        except Exception as e:
-                            sess.rollback()
-                            n_err += 1
-                            log_err(f"{i}/{len(links)} upsert fail: {url} -> {e}")
-
-                    if throttle:
-                        time.sleep(throttle)
+                    log_ok(f"{self._prefix()}OK (dry-run): {data.get('title')} | {data.get('start_dt')}{badge}")
+                continue
+            for (url, data, resp), state, err in await loop.run_in_executor(self.db_pool, self._write_batch, batch):
+                if err is not None:
+                    self._fail(url, "upsert", err)
+                    continue
+                self.eng.store(resp)
+                self.stats["done"] += 1
+                self.stats["ok"] += 1
+                self.stats[_STATE_STAT[state]] += 1
+                badge = " [Immer offen]" if data.get("is_always_open") else ""
+                log_ok(f"{self._prefix()}{_STATE_LABEL[state]}: {data.get('title')} | {data.get('start_dt')}{badge}")
+
+    def _touch_not_modified(self) -> None:
+        """Seiten mit 304/TTL-Treffer: Events nur als gesehen markieren (last_seen_at)."""
+        try:
+            touch_seen_urls(self.sess, self.not_modified_urls)
+            self.sess.commit()
+        except Exception as e:
+            self.sess.rollback()
+            log_warn(f"last_seen_at für unveränderte Seiten nicht gesetzt: {e}")
+
+    async def run(self, start_url: str, headers: dict, max_pages: int) -> dict:
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._list_stage(start_url, headers, max_pages))
+                tg.create_task(self._fetch_all())
+                tg.create_task(self._parse_stage())
+                tg.create_task(self._write_stage())
+            if self.not_modified_urls and not self.dry_run:
+                await asyncio.get_running_loop().run_in_executor(self.db_pool, self._touch_not_modified)
+        finally:
+            self.parse_pool.shutdown(wait=True)
+            self.db_pool.shutdown(wait=True)
+        return self.stats
+
+async def _run_async(sess, src, source_name, workers, limit, dry_run, json_out, max_pages,
+                     use_cache=True):
+    start_url = src["start_url"]
+    headers = src.get("headers", {})
+    per_host = int(workers or src.get("concurrency") or CRAWL_PER_HOST)
+
+    async with FetchEngine(cache=HttpCache() if use_cache else None) as eng:
+        eng.configure_host(start_url, concurrency=per_host,
+                           rate_per_sec=src.get("rate_per_sec"), cache_ttl=src.get("cache_ttl"))
+
+        log_step(f"1) {source_name}: Liste → Detailseiten → Parse → DB (Fetch-Backend: {eng.backend_name})")
+        t_start = time.time()
+        pipe = CrawlPipeline(eng, sess, fetchers=per_host, limit=limit, dry_run=dry_run, json_out=json_out)
+        stats = await pipe.run(start_url, headers, max_pages)
+        if not stats["links"]:
+            log_warn("Keine Links gefunden.")
+            return 0 if not stats["err"] else 1
 
         dur = time.time() - t_start
-        log_step("3) Zusammenfassung")
+        log_step("2) Zusammenfassung")
         print(
             f"{CYAN}{BOLD}"
-            f"Links gesamt: {len(links)} | verarbeitet: {n_done} | OK: {n_ok} "
-            f"| Neu: {n_new} | Updates: {n_upd} | Fehler: {n_err} | Dauer: {dur:.1f}s"
+            f"Links gesamt: {stats['links']} | verarbeitet: {stats['done']} | OK: {stats['ok']} "
+            f"| Neu: {stats['new']} | Updates: {stats['upd']} | Unverändert: {stats['unchanged']} "
+            f"| Unverändert (HTTP): {stats['not_modified']} "
+            f"| Fehler: {stats['err']} | Requests: {eng.stats['requests']} (Retries: {eng.stats['retries']}, "
+            f"304: {eng.stats['not_modified']}, Cache frisch: {eng.stats['fresh']}) | Dauer: {dur:.1f}s"
             f"{RESET}"
         )
-        return 0 if n_err == 0 else 1
+        return 0 if stats["err"] == 0 else 1
+
+def run(source_name="kingkalli", workers=None, limit=None,
+        dry_run=False, json_out=False, override_max_pages=None, use_cache=True):
+
+    sess = SessionLocal()
+    try:
+        try:
+            src = get_source(source_name)
+            if not dry_run:
+                check_upsert_support(sess.get_bind())
+        except Exception as e:
+            log_err(str(e))
+            return 2
+
+        max_pages = int(override_max_pages or src.get("max_pages", 3))
+        return asyncio.run(_run_async(sess, src, source_name, workers, limit,
+                                      dry_run, json_out, max_pages, use_cache))
 
     finally:
         try:
@@ -242,21 +368,21 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--source", default="kingkalli")
     ap.add_argument("--max-pages", type=int, default=None, help="überschreibt YAML max_pages")
-    ap.add_argument("--workers", type=int, default=4, help="Parallelität (1 = seriell)")
+    ap.add_argument("--workers", type=int, default=None, help="gleichzeitige Requests pro Host (1 = seriell)")
     ap.add_argument("--limit", type=int, default=None, help="Max. Anzahl Detail-Links verarbeiten")
-    ap.add_argument("--throttle", type=float, default=0.3, help="Sleep zwischen Upserts (freundlich bleiben)")
     ap.add_argument("--dry-run", action="store_true", help="Nichts in DB schreiben (nur scrapen & loggen)")
     ap.add_argument("--json", action="store_true", help="pro Item eine kompakte JSON-Zeile loggen")
+    ap.add_argument("--no-cache", action="store_true", help="HTTP-Cache ignorieren (alles neu laden und upserten)")
     args = ap.parse_args()
 
     sys.exit(run(
         source_name=args.source,
         workers=args.workers,
         limit=args.limit,
-        throttle=args.throttle,
         dry_run=args.dry_run,
         json_out=args.json,
         override_max_pages=args.max_pages,
+        use_cache=not args.no_cache,
     ))
 
 if __name__ == "__main__":
@@ -10,11 +10,16 @@ Oder ohne URL (nimmt das Beispiel aus dem Scraper):
 from __future__ import annotations
 import sys
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from dateutil import parser as dtp
 
 from crawler.kingkalli_scrape_one import scrape_kingkalli_detail
 from db import SessionLocal  # deine Session aus db.py
 import models as m           # dein Event-Model
+import facets
+from event_bulk import content_hash, dedupe_key, touch_seen
+
+LOCAL_TZ = ZoneInfo("Europe/Berlin")
 
 def _to_iso_datetime_str(x):
     if not x:
@@ -26,47 +31,67 @@ def _to_iso_datetime_str(x):
     except Exception:
         return None
 
-def _norm_key(s: str | None) -> str:
-    return (s or "").strip().lower()
+def _to_local_naive(x):
+    """ISO-String/datetime → naive Europe/Berlin-Zeit für start_at/end_at."""
+    if not x:
+        return None
+    try:
+        dt = x if isinstance(x, datetime) else dtp.parse(str(x))
+    except Exception:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(LOCAL_TZ).replace(tzinfo=None)
+    return dt
+
+def row_from_scraped(data: dict) -> dict:
+    """Scraper-Payload → Spaltenwerte für Event (inkl. dedupe_key).
+       `date` bleibt ISO-String (Kompatibilität), start_at/end_at typisiert."""
+    start_at = _to_local_naive(data.get("start_dt") or data.get("date"))
+    return {
+        "title": data.get("title"),
+        "description": data.get("description"),
+        "date": _to_iso_datetime_str(data.get("start_dt") or data.get("date")),
+        "start_at": start_at,
+        "end_at": _to_local_naive(data.get("end_dt")),
+        "image_url": data.get("image_url"),
+        "location": data.get("location"),
+        "maps_url": data.get("maps_url"),
+        "category": data.get("category") or "Unbekannt",
+        "source_url": data.get("source_url"),
+        "source_name": data.get("source_name"),
+        "lat": data.get("lat"),
+        "lon": data.get("lon"),
+        "price": data.get("price"),
+        "is_free": data.get("is_free"),
+        "is_outdoor": data.get("is_outdoor"),
+        "age_group": data.get("age_group"),
+        "dedupe_key": dedupe_key(data.get("title"), data.get("source_name"), start_at),
+    }
 
 def upsert_event(sess, data: dict) -> m.Event:
     """
-    Dupe-Heuristik: title + (start_dt/date) + source_name.
-    Achtung: Dein Model hat 'date' als String – wir schreiben dort ISO rein.
+    Einzel-Upsert über den ORM (CLI). Dupe-Erkennung über dedupe_key
+    (Titel + Quelle + Startzeit, Unique-Index) – Batch-Variante: event_bulk.upsert_events.
+    Unveränderter Inhalt (content_hash) → nur last_seen_at.
     """
-    title_key = _norm_key(data.get("title"))
-    start_iso = _to_iso_datetime_str(data.get("start_dt") or data.get("date"))
-    source_key = _norm_key(data.get("source_name"))
-
-    # Bestehendes Event finden (title + source_name + date)
-    q = sess.query(m.Event).filter(m.Event.title.ilike(title_key))
-    if hasattr(m.Event, "source_name"):
-        q = q.filter(m.Event.source_name.ilike(source_key))
-    if hasattr(m.Event, "date"):
-        q = q.filter(m.Event.date == (start_iso or ""))
-
-    obj = q.first()
+    row = row_from_scraped(data)
+    row["content_hash"] = content_hash(row)
+    obj = None
+    if row["dedupe_key"]:
+        obj = sess.query(m.Event).filter(m.Event.dedupe_key == row["dedupe_key"]).first()
+    if obj is not None and obj.content_hash == row["content_hash"]:
+        touch_seen(sess, m.Event.id == obj.id)
+        return obj
     if not obj:
         obj = m.Event()
         sess.add(obj)
+    old_category = obj.category
+    row["last_seen_at"] = datetime.utcnow()
 
-    # Zuweisungen (nur Felder, die es bei dir gibt)
-    obj.title = data.get("title")
-    obj.description = data.get("description")
-    obj.date = start_iso  # <- dein Schema: String
-    obj.image_url = data.get("image_url")
-    obj.location = data.get("location")
-    obj.maps_url = data.get("maps_url")
-    obj.category = data.get("category") or "Unbekannt"
-    obj.source_url = data.get("source_url")
-    obj.source_name = data.get("source_name")
-    obj.lat = data.get("lat")
-    obj.lon = data.get("lon")
-    obj.price = data.get("price")
-    obj.is_free = data.get("is_free")
-    obj.is_outdoor = data.get("is_outdoor")
-    obj.age_group = data.get("age_group")
+    for col, val in row.items():
+        setattr(obj, col, val)
 
+    facets.record_category_change(sess, old_category, obj.category)
     return obj
 
 def main():
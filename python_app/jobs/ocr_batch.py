@@ -0,0 +1,291 @@
+"""
+Batch-OCR für Flyer-Sammlungen (Partner schicken sie zu Hunderten).
+
+Verteilt die Dateien auf einen Prozess-Pool – jeder Prozess behält seine
+OCR-Engine (tesserocr-API, Pass-Pool, ggf. Paddle-Worker) über alle Dateien
+warm – und schreibt pro Kandidat (OCRResult.candidates) eine NDJSON-Zeile,
+danach pro Datei eine Statuszeile:
+
+    {"file": …, "sha256": …, "status": "done", "candidates": 2, "event_ids": [17, 18]}
+    {"file": …, "sha256": …, "status": "error", "error": "…"}
+
+Fortsetzen nach Abbruch:
+  - Ergebnisse landen im OCR-Cache (Schlüssel = SHA-256 des Inhalts) –
+    bekannte Flyer werden nicht noch einmal erkannt.
+  - Mit --out werden Dateien, deren Hash dort mit Status "done" steht (auch
+    ohne Kandidaten), komplett übersprungen. Gehasht wird vor allem anderen –
+    erledigte Dateien werden nicht erneut nach UPLOAD_DIR kopiert.
+
+Mit --insert (nur zusammen mit --out) werden die Bilder inhaltsadressiert in
+UPLOAD_DIR abgelegt und die Kandidaten pro Datei per Bulk-INSERT als Events
+angelegt (event_bulk). Vor dem Commit steht eine Zeile "status": "inserting"
+mit der höchsten Event-ID davor ("after_id") und der Zahl der Kandidaten;
+bricht der Lauf zwischen Commit und "done" ab, findet der nächste Lauf genau
+diese Events (gleiche image_url, ID > after_id) und trägt nur ihre IDs nach.
+Ältere Events mit demselben Bild (gleicher Flyer über /event-erstellen)
+zählen nicht.
+
+Beispiele:
+  python -m jobs.ocr_batch partner-dump/
+  python -m jobs.ocr_batch "partner-dump/**/*.jpg" --workers 2 --out flyer.ndjson
+  python -m jobs.ocr_batch partner-dump/ --out flyer.ndjson --insert   # --insert nur mit --out
+"""
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import argparse
+import concurrent.futures as cf
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import asdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import ocr_cache
+
+OCR_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff", ".bmp", ".pdf")
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join("static", "uploads"))
+
+
+def log_info(msg: str) -> None:
+    print(f"\033[94m[INFO]\033[0m {msg}", file=sys.stderr)
+
+def log_ok(msg: str) -> None:
+    print(f"\033[92m[OK]\033[0m {msg}", file=sys.stderr)
+
+def log_err(msg: str) -> None:
+    print(f"\033[91m[ERR]\033[0m {msg}", file=sys.stderr)
+
+
+# ---------------------------------- Dateien ----------------------------------
+def collect_files(target: str) -> List[str]:
+    if os.path.isdir(target):
+        paths = glob.glob(os.path.join(target, "**", "*"), recursive=True)
+    else:
+        paths = glob.glob(target, recursive=True)
+    return sorted(p for p in paths if p.lower().endswith(OCR_EXTS) and os.path.isfile(p))
+
+def sha256_file(path: str, chunk: int = 64 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def read_progress(out_path: Optional[str]) -> Tuple[Set[str], Dict[str, dict]]:
+    """(erledigte Hashes, offene Inserts {sha256: inserting-Zeile}) aus einer früheren Ausgabe.
+
+    Erledigt: Statuszeile "done" – oder, für Ausgaben älterer Läufe ohne
+    Statuszeilen, eine Kandidatenzeile ohne Fehler."""
+    done: Set[str] = set()
+    inserting: Dict[str, dict] = {}
+    if not out_path or not os.path.exists(out_path):
+        return done, inserting
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue   # halbe Zeile vom Abbruch
+            sha = row.get("sha256")
+            if not sha or row.get("error"):
+                continue
+            status = row.get("status")
+            if status == "inserting":
+                inserting[sha] = row
+            elif status == "done" or "candidate" in row:
+                done.add(sha)
+    for sha in done:
+        inserting.pop(sha, None)
+    return done, inserting
+
+
+# ------------------------------ Im Pool-Prozess ------------------------------
+def _init_worker() -> None:
+    import ocr_utils
+    ocr_utils.get_engine()   # Engine einmal pro Prozess laden, nicht pro Datei
+
+def _ocr_file(path: str, content_hash: str) -> dict:
+    """OCRResult als dict; Ergebnis geht zusätzlich in den OCR-Cache."""
+    from ocr_utils import extract_event_fields_from_path
+    try:
+        ocr = asdict(extract_event_fields_from_path(path))
+    except Exception as e:
+        # manche Exceptions (z. B. TesseractNotFoundError) lassen sich nicht zurück-picklen
+        # und würden den ganzen Pool als "broken" markieren
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    try:
+        ocr_cache.put(content_hash, ocr)
+    except OSError as e:
+        print(f"[ocr_batch] OCR-Cache nicht geschrieben: {e}", file=sys.stderr)
+    return ocr
+
+
+# ---------------------------------- Ablauf -----------------------------------
+def _store_upload(path: str) -> str:
+    """Bild inhaltsadressiert nach UPLOAD_DIR (wie /ocr/upload) → image_url."""
+    import upload_store
+    with open(path, "rb") as f:
+        stored = upload_store.save_stream(f, UPLOAD_DIR, os.path.splitext(path)[1])
+    return f"/static/uploads/{stored.relpath}"
+
+def _max_event_id(sess) -> int:
+    from sqlalchemy import func
+    from models import Event
+    return sess.query(func.max(Event.id)).scalar() or 0
+
+def _recover_insert(sess, row: dict) -> List[int]:
+    """Events eines abgebrochenen Inserts (Commit durch, "done"-Zeile fehlt): gleiche
+       image_url, angelegt nach "after_id". Nur wenn es genau so viele sind wie
+       Kandidaten – sonst gilt der Insert als nicht passiert."""
+    from models import Event
+    if not row.get("image_url") or row.get("after_id") is None:
+        return []
+    ids = [i for (i,) in sess.query(Event.id)
+           .filter(Event.image_url == row["image_url"], Event.id > row["after_id"])
+           .order_by(Event.id)]
+    return ids if len(ids) == row.get("candidates") else []
+
+def _write_lines(out, rows: List[dict], sync: bool = False) -> None:
+    """Zeilen einer Datei gemeinsam schreiben – Fortsetzen sieht nie halbe Dateien."""
+    out.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+    out.flush()
+    if sync:
+        os.fsync(out.fileno())
+
+def _results(files: List[Dict], workers: int) -> Iterator[tuple]:
+    """(datei, ocr-dict | None, fehler | None, aus_cache) – Cache-Treffer sofort,
+       Rest über den Pool mit begrenztem Vorlauf (nicht alle Futures auf einmal)."""
+    todo = []
+    for f in files:
+        hit = ocr_cache.get(f["sha256"])
+        if hit is not None:
+            yield f, hit, None, True
+        else:
+            todo.append(f)
+    if not todo:
+        return
+    ctx = multiprocessing.get_context("spawn")
+    with cf.ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as ex:
+        pending = iter(todo)
+        running: Dict[cf.Future, Dict] = {}
+        while True:
+            while len(running) < workers * 2:
+                f = next(pending, None)
+                if f is None:
+                    break
+                running[ex.submit(_ocr_file, f["path"], f["sha256"])] = f
+            if not running:
+                return
+            done, _ = cf.wait(running, return_when=cf.FIRST_COMPLETED)
+            for fut in done:
+                f = running.pop(fut)
+                try:
+                    yield f, fut.result(), None, False
+                except Exception as e:
+                    yield f, None, str(e), False
+
+def run(target: str, workers: int, out_path: Optional[str], insert: bool, limit: Optional[int]) -> dict:
+    if insert and not out_path:
+        raise ValueError("--insert nur mit --out – sonst legt ein Neustart alle Events doppelt an")
+    paths = collect_files(target)[:limit]
+    skip, inserting = read_progress(out_path)
+    stats = {"files": len(paths), "skipped": 0, "recovered": 0, "cached": 0, "ocr": 0, "failed": 0,
+             "candidates": 0, "inserted": 0}
+
+    sess = None
+    if insert:
+        from db import SessionLocal
+        import event_bulk
+        sess = SessionLocal()
+    out = open(out_path, "a", encoding="utf-8") if out_path else sys.stdout
+    t0 = time.time()
+    try:
+        files = []
+        for p in paths:
+            sha = sha256_file(p)   # vor dem Ablegen – erledigte Dateien nicht erneut kopieren
+            if sha in skip:
+                stats["skipped"] += 1
+                continue
+            skip.add(sha)   # gleicher Inhalt unter zwei Namen → nur einmal
+            if sess is not None and sha in inserting:
+                ids = _recover_insert(sess, inserting[sha])
+                if ids:
+                    _write_lines(out, [{"file": p, "sha256": sha, "status": "done",
+                                        "candidates": len(ids), "event_ids": ids, "recovered": True}])
+                    stats["recovered"] += 1
+                    continue
+            image_url = _store_upload(p) if insert else None
+            files.append({"path": p, "sha256": sha, "image_url": image_url})
+        log_info(f"{len(paths)} Dateien, {stats['skipped'] + stats['recovered']} schon erledigt, {len(files)} offen")
+
+        for f, ocr, err, cached in _results(files, workers):
+            base = {"file": f["path"], "sha256": f["sha256"]}
+            if err is not None:
+                stats["failed"] += 1
+                log_err(f"{f['path']}: {err}")
+                _write_lines(out, [{**base, "status": "error", "error": err}])
+                continue
+            stats["cached" if cached else "ocr"] += 1
+            candidates = ocr.get("candidates") or []
+            ids: List[Optional[int]] = [None] * len(candidates)
+            if sess is not None and candidates:
+                _write_lines(out, [{**base, "status": "inserting", "image_url": f["image_url"],
+                                    "after_id": _max_event_id(sess), "candidates": len(candidates)}], sync=True)
+                try:
+                    ids = event_bulk.insert_candidates(sess, candidates, image_url=f["image_url"])
+                    sess.commit()
+                    stats["inserted"] += len(ids)
+                except Exception as e:
+                    sess.rollback()
+                    stats["failed"] += 1
+                    log_err(f"{f['path']}: DB-Fehler: {e}")
+                    _write_lines(out, [{**base, "status": "error", "error": f"DB-Fehler: {e}"}])
+                    continue
+            rows = []
+            for i, (c, event_id) in enumerate(zip(candidates, ids)):
+                row = {**base, "candidate": i, **c}
+                if f["image_url"]:
+                    row["image_url"] = f["image_url"]
+                if event_id is not None:
+                    row["event_id"] = event_id
+                rows.append(row)
+            rows.append({**base, "status": "done", "candidates": len(candidates),
+                         "event_ids": [i for i in ids if i is not None]})
+            _write_lines(out, rows, sync=sess is not None)
+            stats["candidates"] += len(candidates)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if sess is not None:
+            sess.close()
+    stats["seconds"] = round(time.time() - t0, 1)
+    return stats
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("target", help="Verzeichnis (rekursiv) oder Glob mit Bildern/PDFs")
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1), help="OCR-Prozesse")
+    ap.add_argument("--out", default=None, help="NDJSON-Datei (anhängen + Fortsetzen); sonst stdout")
+    ap.add_argument("--insert", action="store_true", help="Kandidaten als Events in die DB schreiben")
+    ap.add_argument("--limit", type=int, default=None, help="Max. Anzahl Dateien")
+    args = ap.parse_args()
+    if args.insert and not args.out:
+        ap.error("--insert braucht --out (Fortsetzen ohne doppelte Events)")
+
+    workers = max(1, args.workers)
+    if workers > 1:
+        # mehrere Prozesse teilen sich die CPUs – Passes pro Bild nicht zusätzlich parallelisieren
+        os.environ.setdefault("OCR_PASS_CONCURRENCY", "1")
+        os.environ.setdefault("OCR_PDF_PAGE_CONCURRENCY", "1")
+
+    stats = run(args.target, workers, args.out, args.insert, args.limit)
+    log_ok(json.dumps(stats, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+OCR-Benchmark: Tesseract-Backends im Vergleich (ms pro Bild).
+
+Pro Bild laufen alle Vorverarbeitungen × TESS_CONFIGS seriell über jedes
+Backend – also genau die Arbeit, die der Pass-Scheduler ohne Early-Exit macht.
+Der erste Durchlauf pro Backend zählt als Aufwärmen (Modell laden).
+
+Beispiele:
+  python -m jobs.ocr_bench static/uploads
+  python -m jobs.ocr_bench "flyer/*.jpg" --repeat 3
+  python -m jobs.ocr_bench flyer/ --backends pytesseract,tesserocr --json
+"""
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from PIL import Image
+
+import ocr_utils
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".webp", ".bmp")
+
+
+def collect_images(target: str) -> List[str]:
+    if os.path.isdir(target):
+        paths = [os.path.join(target, n) for n in sorted(os.listdir(target))]
+    else:
+        paths = sorted(glob.glob(target, recursive=True))
+    return [p for p in paths if p.lower().endswith(IMAGE_EXTS) and os.path.isfile(p)]
+
+def run_image(engine, images: Dict[str, Image.Image]) -> float:
+    t0 = time.perf_counter()
+    for img in images.values():
+        for cfg in ocr_utils.TESS_CONFIGS:
+            ocr_utils._ocr_pass(img, cfg, engine)
+    return (time.perf_counter() - t0) * 1000.0
+
+def bench(backend: str, inputs: Dict[str, Dict[str, Image.Image]], repeat: int) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    engine = ocr_utils.make_engine(backend)
+    first = next(iter(inputs.values()))
+    run_image(engine, first)   # Aufwärmen
+    setup_ms = (time.perf_counter() - t0) * 1000.0
+    per_image = [run_image(engine, imgs) for _ in range(repeat) for imgs in inputs.values()]
+    return {
+        "setup_ms": round(setup_ms, 1),
+        "mean_ms": round(statistics.mean(per_image), 1),
+        "median_ms": round(statistics.median(per_image), 1),
+        "runs": len(per_image),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("target", help="Verzeichnis oder Glob mit Flyer-Bildern")
+    ap.add_argument("--backends", default="pytesseract,tesserocr", help="kommagetrennt")
+    ap.add_argument("--repeat", type=int, default=1, help="Durchläufe pro Bild")
+    ap.add_argument("--limit", type=int, default=None, help="Max. Anzahl Bilder")
+    ap.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = ap.parse_args()
+
+    paths = collect_images(args.target)[:args.limit]
+    if not paths:
+        print(f"Keine Bilder gefunden: {args.target}", file=sys.stderr)
+        sys.exit(2)
+    inputs = {p: ocr_utils._prepare_images(p) for p in paths}
+
+    results: Dict[str, dict] = {}
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        try:
+            results[backend] = bench(backend, inputs, max(1, args.repeat))
+        except Exception as e:
+            results[backend] = {"error": str(e)}
+
+    base = results.get("pytesseract", {}).get("mean_ms")
+    for r in results.values():
+        if base and r.get("mean_ms"):
+            r["speedup"] = round(base / r["mean_ms"], 2)
+
+    if args.json:
+        print(json.dumps({"images": len(paths), "results": results}, ensure_ascii=False))
+        return
+    print(f"{len(paths)} Bilder × {args.repeat} Durchläufe, {len(ocr_utils.TESS_CONFIGS)} PSM-Modi")
+    for backend, r in results.items():
+        if "error" in r:
+            print(f"  {backend:<12} nicht verfügbar: {r['error']}")
+            continue
+        speed = f"  ×{r['speedup']}" if "speedup" in r else ""
+        print(f"  {backend:<12} {r['mean_ms']:>8.1f} ms/Bild (Median {r['median_ms']:.1f}, "
+              f"Start {r['setup_ms']:.0f} ms){speed}")
+
+
+if __name__ == "__main__":
+    main()
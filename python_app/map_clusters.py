@@ -0,0 +1,152 @@
+# map_clusters.py
+"""
+Server-seitiges Marker-Clustering für die Ergebnis-Karte.
+
+Grid-Clustering im Web-Mercator-Pixelraum: pro Zoomstufe werden alle Punkte
+in Zellen von CLUSTER_CELL_PX × CLUSTER_CELL_PX Pixeln zusammengefasst
+(Schwerpunkt + Anzahl + Bounds). Die geladenen Punkte je Filter und die
+Cluster je (Filter, Zoom) liegen in einem kleinen LRU-Cache mit TTL;
+die Anfrage schneidet daraus nur noch den sichtbaren Ausschnitt (bbox).
+Die Schlüssel enthalten die Version aus result_cache – nach einem Schreiben
+werden alte Einträge in allen Workern nicht mehr gelesen.
+"""
+from __future__ import annotations
+import math, os, threading, time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from models import Event
+import event_search
+import geo_utils
+import result_cache
+
+CLUSTER_CELL_PX = int(os.getenv("MAP_CLUSTER_CELL_PX", "60"))
+MAP_CACHE_TTL_SEC = int(os.getenv("MAP_CACHE_TTL_SEC", "120"))
+MAP_CACHE_MAX = int(os.getenv("MAP_CACHE_MAX", "256"))
+MAX_ZOOM = 18
+SAME_SPOT_ITEMS = 20
+TILE_PX = 256
+
+_lock = threading.Lock()
+_cache: "OrderedDict[tuple, Tuple[float, object]]" = OrderedDict()
+
+
+# ---------------------------------- Cache -----------------------------------
+def _cache_get(key):
+    with _lock:
+        hit = _cache.get(key)
+        if hit is None:
+            return None
+        ts, value = hit
+        if time.monotonic() - ts > MAP_CACHE_TTL_SEC:
+            _cache.pop(key, None)
+            return None
+        _cache.move_to_end(key)
+        return value
+
+def _cache_put(key, value):
+    with _lock:
+        _cache[key] = (time.monotonic(), value)
+        _cache.move_to_end(key)
+        while len(_cache) > MAP_CACHE_MAX:
+            _cache.popitem(last=False)
+
+def invalidate() -> None:
+    with _lock:
+        _cache.clear()
+
+
+# --------------------------------- Mercator ---------------------------------
+def _project(lat: float, lon: float, zoom: int) -> Tuple[float, float]:
+    world = TILE_PX * (2 ** zoom)
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    s = math.sin(math.radians(lat))
+    x = (lon + 180.0) / 360.0 * world
+    y = (0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)) * world
+    return x, y
+
+
+# ---------------------------------- Punkte -----------------------------------
+def _load_points(sess, p: event_search.SearchParams) -> List[tuple]:
+    """(id, lat, lon, title, start_at) aller geokodierten Treffer – pro Filter gecacht."""
+    key = ("points", result_cache.current_version(), p.cache_key())
+    pts = _cache_get(key)
+    if pts is not None:
+        return pts
+
+    origin = event_search.resolve_origin(sess, p)
+    cols = sess.query(Event.id, Event.lat, Event.lon, Event.title, Event.start_at)
+    qset, _ = event_search.build_query(sess, p, qset=cols, origin=origin)
+    rows = qset.filter(Event.lat.isnot(None), Event.lon.isnot(None)).all()
+    if origin:
+        keep = {i for _, i in geo_utils.within_radius(origin[0], origin[1], p.radius_km,
+                                                      [(r[0], r[1], r[2]) for r in rows])}
+        rows = [r for r in rows if r[0] in keep]
+    pts = [tuple(r) for r in rows]
+    _cache_put(key, pts)
+    return pts
+
+def _cluster(points: List[tuple], zoom: int) -> List[dict]:
+    cells: Dict[Tuple[int, int], list] = {}
+    for pt in points:
+        x, y = _project(pt[1], pt[2], zoom)
+        cells.setdefault((int(x // CLUSTER_CELL_PX), int(y // CLUSTER_CELL_PX)), []).append(pt)
+
+    out = []
+    for members in cells.values():
+        lats = [m[1] for m in members]
+        lons = [m[2] for m in members]
+        if len(members) == 1:
+            eid, lat, lon, title, start_at = members[0]
+            out.append({"lat": lat, "lon": lon, "count": 1, "id": eid, "title": title,
+                        "date": start_at.isoformat() if start_at else None})
+        else:
+            c = {
+                "lat": sum(lats) / len(lats),
+                "lon": sum(lons) / len(lons),
+                "count": len(members),
+                "bounds": [min(lats), min(lons), max(lats), max(lons)],
+            }
+            # gleiche Adresse (z. B. mehrere Termine am selben Ort) zerfällt bei keinem Zoom –
+            # dann die Events direkt mitliefern, die Karte zeigt sie als Liste im Popup
+            if min(lats) == max(lats) and min(lons) == max(lons):
+                c["items"] = [
+                    {"id": m[0], "title": m[3], "date": m[4].isoformat() if m[4] else None}
+                    for m in sorted(members, key=lambda m: (m[4] is None, m[4] or 0, m[0]))[:SAME_SPOT_ITEMS]
+                ]
+            out.append(c)
+    return out
+
+def clusters_for(sess, p: event_search.SearchParams, zoom: int,
+                 bbox: Optional[Tuple[float, float, float, float]] = None) -> dict:
+    """Cluster für eine Zoomstufe, optional auf bbox=(west, south, east, north) beschnitten."""
+    zoom = max(0, min(int(zoom), MAX_ZOOM))
+    key = ("clusters", result_cache.current_version(), p.cache_key(), zoom)
+    clusters = _cache_get(key)
+    if clusters is None:
+        clusters = _cluster(_load_points(sess, p), zoom)
+        _cache_put(key, clusters)
+
+    if bbox:
+        w, s, e, n = bbox
+        if w <= e:
+            visible = [c for c in clusters if s <= c["lat"] <= n and w <= c["lon"] <= e]
+        else:  # über die Datumsgrenze
+            visible = [c for c in clusters if s <= c["lat"] <= n and (c["lon"] >= w or c["lon"] <= e)]
+    else:
+        visible = clusters
+
+    pts = _load_points(sess, p)
+    bounds = None
+    if pts:
+        bounds = [min(x[1] for x in pts), min(x[2] for x in pts), max(x[1] for x in pts), max(x[2] for x in pts)]
+    return {"zoom": zoom, "total": len(pts), "bounds": bounds, "clusters": visible}
+
+def parse_bbox(raw: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """'west,south,east,north' → Tupel; ungültig → ValueError."""
+    if not raw:
+        return None
+    parts = [float(x) for x in raw.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox erwartet west,south,east,north")
+    return tuple(parts)
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     Float,
+    Index,
     create_engine,
 )
 from sqlalchemy.dialects.postgresql import JSON
@@ -24,11 +25,17 @@ load_dotenv()
 # 🗂 Event-Modell
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_lat_lon", "lat", "lon"),   # Bounding-Box der Umkreissuche
+        Index("ux_events_dedupe_key", "dedupe_key", unique=True),   # ON CONFLICT der Crawler
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     description = Column(String)
     date = Column(String)
+    start_at = Column(DateTime, index=True)   # lokale Zeit (Europe/Berlin), naiv
+    end_at = Column(DateTime, index=True)
     image_url = Column(String)
     location = Column(String)
     maps_url = Column(String)
@@ -45,6 +52,22 @@ class Event(Base):
     is_always_open = Column(Boolean, default=False)
     opening_hours = Column(JSON, nullable=True)
     holidays_closed = Column(JSON, nullable=True)
+    # UTC, bei jedem ORM-Update neu gesetzt → ETag/Last-Modified der Detailseite
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Titel + Quelle + Startzeit (event_bulk.dedupe_key); nur bei Crawler-Events gesetzt
+    dedupe_key = Column(String, nullable=True)
+    # Hash der normalisierten Crawler-Daten (event_bulk.content_hash) → unveränderte
+    # Events werden nicht neu geschrieben, nur last_seen_at (UTC) wird gesetzt
+    content_hash = Column(String, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)
+
+
+# 🏷️ Kategorie-Facetten (Sidebar in /results)
+class CategoryFacet(Base):
+    __tablename__ = "category_facets"
+
+    name = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
 
 # 📚 Quellen-Modell
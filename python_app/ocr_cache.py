@@ -0,0 +1,45 @@
+# ocr_cache.py
+"""
+Persistenter Cache für OCR-Ergebnisse.
+
+Schlüssel: SHA-256 des Uploads (upload_store) + ocr_utils.ocr_config_version()
+(Engine samt Tesseract-Backend, Sprachen, PSM-Modi, PIPELINE_VERSION). Wert: das OCRResult als JSON,
+eine Datei pro Eintrag unter  OCR_CACHE_DIR/<h[0:2]>/<hash>-<version>.json.
+
+Liegt per Default unter var/ocr-cache – NICHT unter static/: der Static-Route
+sind Punkt-Verzeichnisse egal, und der Hash steht in jeder öffentlichen
+image_url; OCR-Texte (auch verworfener Entwürfe) wären sonst abrufbar. Auf Fly
+zeigt OCR_CACHE_DIR auf das Volume (fly.toml) und überlebt damit Deploys; alle
+gunicorn-Worker und OCR-Prozesse teilen ihn.
+"""
+from __future__ import annotations
+import json, os, re
+from typing import Optional
+
+from ocr_utils import ocr_config_version
+
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join("var", "ocr-cache"))
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _path(content_hash: str, version: Optional[str] = None, cache_dir: str = OCR_CACHE_DIR) -> str:
+    if not _HASH_RE.match(content_hash or ""):
+        raise ValueError("ungültiger Inhalts-Hash")
+    version = version or ocr_config_version()
+    return os.path.join(cache_dir, content_hash[:2], f"{content_hash}-{version}.json")
+
+def get(content_hash: str, cache_dir: str = OCR_CACHE_DIR) -> Optional[dict]:
+    """OCRResult als dict (text, fields, found, missing, confidence, candidates) oder None."""
+    try:
+        with open(_path(content_hash, cache_dir=cache_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def put(content_hash: str, result: dict, cache_dir: str = OCR_CACHE_DIR) -> None:
+    path = _path(content_hash, cache_dir=cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(tmp, path)
@@ -0,0 +1,277 @@
+# ocr_jobs.py
+"""
+Asynchrone OCR-Jobs für /ocr/upload.
+
+Die Upload-Route legt nur noch einen Job an und antwortet sofort mit der
+Job-ID; die eigentliche OCR (mehrere Tesseract-Durchläufe, optional Paddle)
+läuft in einem kleinen Prozess-Pool außerhalb der gunicorn-Request-Threads.
+
+  - Pool: OCR_WORKERS Prozesse pro gunicorn-Worker (Default 1 – die VM hat
+    eine geteilte CPU), "spawn"-Kontext, Prozesse werden nach
+    OCR_TASKS_PER_CHILD Jobs ersetzt (Speicher bleibt klein).
+  - Backpressure: mehr als OCR_QUEUE_MAX offene Jobs pro Worker → QueueFull
+    (Route antwortet mit 503 + Retry-After).
+  - Status: eine JSON-Datei pro Job in OCR_JOBS_DIR – jeder gunicorn-Worker
+    kann den Status beantworten, egal wo der Job läuft. Der OCR-Prozess
+    schreibt Fortschritt und Ergebnis selbst hinein.
+
+Status-Werte: queued → running → done | error
+
+PDFs werden seitenweise erkannt (ocr_utils.iter_pdf_pages); nach jeder Seite
+stehen Fortschritt ("progress") und die bisherigen Kandidaten ("partial") in
+der Job-Datei, stream() meldet das als "progress"-Event.
+
+Mit Inhalts-Hash (upload_store) wird das Ergebnis zusätzlich in ocr_cache
+abgelegt; cached_result() liefert bekannte Flyer ohne Job sofort zurück.
+
+Warten auf das Ergebnis darf keinen Request-Thread lange belegen (gthread,
+wenige Threads pro Worker):
+  - Das Frontend pollt /ocr/jobs/<id>. SSE (stream()) nur mit OCR_SSE=1,
+    gedacht für eine asynchrone Worker-Klasse.
+  - Auch dann endet jede SSE-Antwort nach OCR_SSE_MAX_SEC; EventSource
+    verbindet sich von selbst neu (retry-Hinweis im Stream).
+  - Der Legacy-Endpoint wartet höchstens OCR_LEGACY_WAIT_SEC und antwortet
+    sonst mit der Job-ID (202).
+"""
+from __future__ import annotations
+import json, multiprocessing, os, re, threading, time, uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Optional
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "1"))
+OCR_QUEUE_MAX = int(os.getenv("OCR_QUEUE_MAX", "4"))
+OCR_TASKS_PER_CHILD = int(os.getenv("OCR_TASKS_PER_CHILD", "50"))
+OCR_JOB_TIMEOUT_SEC = int(os.getenv("OCR_JOB_TIMEOUT_SEC", "120"))
+OCR_JOB_TTL_SEC = int(os.getenv("OCR_JOB_TTL_SEC", "3600"))
+OCR_JOBS_DIR = os.getenv("OCR_JOBS_DIR", "/tmp/familysout-ocr-jobs")
+OCR_SSE = os.getenv("OCR_SSE", "0").lower() in ("1", "true", "yes")
+OCR_SSE_MAX_SEC = float(os.getenv("OCR_SSE_MAX_SEC", "5"))
+OCR_LEGACY_WAIT_SEC = float(os.getenv("OCR_LEGACY_WAIT_SEC", "3"))
+
+JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+FINAL = ("done", "error")
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+# -------------------------------- Job-Dateien --------------------------------
+def _job_path(job_id: str, jobs_dir: str = OCR_JOBS_DIR) -> str:
+    if not JOB_ID_RE.match(job_id or ""):
+        raise ValueError("ungültige Job-ID")
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+def _write_job(job: dict, jobs_dir: str = OCR_JOBS_DIR) -> None:
+    job["updated_at"] = time.time()
+    path = _job_path(job["id"], jobs_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f, ensure_ascii=False)
+    os.replace(tmp, path)   # atomar – Leser sehen nie eine halbe Datei
+
+def get_job(job_id: str, jobs_dir: str = OCR_JOBS_DIR) -> Optional[dict]:
+    try:
+        with open(_job_path(job_id, jobs_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _update_job(job_id: str, jobs_dir: str = OCR_JOBS_DIR, **changes) -> Optional[dict]:
+    job = get_job(job_id, jobs_dir)
+    if job is None:
+        return None
+    job.update(changes)
+    _write_job(job, jobs_dir)
+    return job
+
+def _cleanup_old_jobs(jobs_dir: str = OCR_JOBS_DIR) -> None:
+    cutoff = time.time() - OCR_JOB_TTL_SEC
+    try:
+        for name in os.listdir(jobs_dir):
+            p = os.path.join(jobs_dir, name)
+            try:
+                if os.path.getmtime(p) < cutoff:
+                    os.remove(p)
+            except OSError:
+                pass
+    except FileNotFoundError:
+        pass
+
+
+# ---------------------------------- Ergebnis ----------------------------------
+def result_payload(ocr: dict, image_url: Optional[str]) -> dict:
+    """OCRResult-dict → Antwortformat (ohne Volltext, image_url in Feldern + Kandidaten)."""
+    result = json.loads(json.dumps(ocr))   # tiefe Kopie, Cache-Eintrag bleibt unverändert
+    result.pop("text", None)
+    result["fields"]["image_url"] = image_url
+    for c in result.get("candidates", []):
+        c["image_url"] = image_url
+    result["image_url"] = image_url
+    return result
+
+def cached_result(content_hash: Optional[str], image_url: Optional[str]) -> Optional[dict]:
+    """Treffer im persistenten OCR-Cache → fertiges Ergebnis, sonst None."""
+    if not content_hash:
+        return None
+    import ocr_cache
+    try:
+        hit = ocr_cache.get(content_hash)
+    except ValueError:
+        return None
+    return result_payload(hit, image_url) if hit else None
+
+
+# ------------------------------ Im OCR-Prozess --------------------------------
+def _run_job(job_id: str, path: str, image_url: Optional[str], jobs_dir: str,
+             content_hash: Optional[str] = None) -> dict:
+    """Läuft im Pool-Prozess: OCR ausführen, Ergebnis in Job-Datei (+ OCR-Cache) schreiben."""
+    import ocr_utils   # erst hier → schlanker Elternprozess
+
+    _update_job(job_id, jobs_dir, status="running", started_at=time.time())
+    try:
+        if ocr_utils.is_pdf(path):
+            ocr = asdict(_run_pdf(job_id, path, image_url, jobs_dir))
+        else:
+            ocr = asdict(ocr_utils.extract_event_fields_from_path(path))
+    except Exception as e:
+        _update_job(job_id, jobs_dir, status="error", error=f"OCR fehlgeschlagen: {e}")
+        raise
+    if content_hash:
+        import ocr_cache
+        try:
+            ocr_cache.put(content_hash, ocr)
+        except Exception as e:
+            print(f"[ocr_jobs] OCR-Cache nicht geschrieben: {e}")
+    result = result_payload(ocr, image_url)
+    _update_job(job_id, jobs_dir, status="done", result=result)
+    return result
+
+
+def _run_pdf(job_id: str, path: str, image_url: Optional[str], jobs_dir: str):
+    """PDF Seite für Seite; Kandidaten jeder fertigen Seite sofort in die Job-Datei."""
+    import ocr_utils
+    pages, partial = [], []
+    for page, total, res in ocr_utils.iter_pdf_pages(path):
+        pages.append((page, res))
+        partial.extend(dict(c, image_url=image_url) for c in ocr_utils.page_candidates(page, res))
+        _update_job(job_id, jobs_dir, partial=partial,
+                    progress={"pages_done": len(pages), "pages_total": total, "page": page})
+    return ocr_utils.merge_pdf_pages(pages)
+
+
+# ----------------------------------- Pool ------------------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pending = 0
+_futures: dict = {}   # job_id → Future (nur in diesem Prozess)
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=OCR_TASKS_PER_CHILD,
+            )
+        return _pool
+
+def _reset_pool() -> None:
+    """Nach einem abgestürzten Kindprozess (BrokenProcessPool) neu aufbauen."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def submit(path: str, image_url: Optional[str] = None, content_hash: Optional[str] = None,
+           jobs_dir: str = OCR_JOBS_DIR) -> dict:
+    """Legt einen Job an und reiht ihn ein. Volle Queue → QueueFull."""
+    global _pending
+    with _pool_lock:
+        if _pending >= OCR_QUEUE_MAX:
+            raise QueueFull("OCR ist gerade ausgelastet")
+        _pending += 1
+
+    os.makedirs(jobs_dir, exist_ok=True)
+    _cleanup_old_jobs(jobs_dir)
+    job = {"id": uuid.uuid4().hex, "status": "queued", "created_at": time.time(),
+           "image_url": image_url, "result": None, "error": None}
+    _write_job(job, jobs_dir)
+
+    try:
+        fut = _get_pool().submit(_run_job, job["id"], path, image_url, jobs_dir, content_hash)
+    except Exception as e:
+        _reset_pool()
+        with _pool_lock:
+            _pending -= 1
+        _update_job(job["id"], jobs_dir, status="error", error=f"OCR nicht verfügbar: {e}")
+        raise
+
+    def _done(f: Future, job_id=job["id"]):
+        global _pending
+        with _pool_lock:
+            _pending -= 1
+            _futures.pop(job_id, None)
+        exc = f.exception()
+        if exc is not None:
+            if exc.__class__.__name__ == "BrokenProcessPool":
+                _reset_pool()
+            cur = get_job(job_id, jobs_dir)
+            if cur and cur.get("status") not in FINAL:
+                _update_job(job_id, jobs_dir, status="error", error=f"OCR fehlgeschlagen: {exc}")
+
+    with _pool_lock:
+        _futures[job["id"]] = fut
+    fut.add_done_callback(_done)
+    return job
+
+def wait(job_id: str, timeout: float = OCR_JOB_TIMEOUT_SEC, jobs_dir: str = OCR_JOBS_DIR) -> Optional[dict]:
+    """Blockiert bis der Job fertig ist (für den synchronen Legacy-Endpoint)."""
+    fut = _futures.get(job_id)
+    if fut is not None:
+        try:
+            fut.result(timeout=timeout)
+        except Exception:
+            pass
+        return get_job(job_id, jobs_dir)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id, jobs_dir)
+        if job is None or job["status"] in FINAL:
+            return job
+        time.sleep(0.25)
+    return get_job(job_id, jobs_dir)
+
+def stream(job_id: str, poll_sec: float = 0.5, jobs_dir: str = OCR_JOBS_DIR,
+           max_sec: float = OCR_SSE_MAX_SEC):
+    """Server-Sent Events: ein Event bei jeder Statusänderung (queued/running/done/failed),
+       bei PDFs zusätzlich "progress" nach jeder fertigen Seite.
+       Eine Antwort lebt höchstens max_sec – danach verbindet EventSource sich neu
+       und bekommt den aktuellen Stand noch einmal."""
+    yield "retry: 1000\n\n"
+    last, last_progress = None, None
+    deadline = time.monotonic() + max_sec
+    while True:
+        job = get_job(job_id, jobs_dir)
+        if job is None:
+            yield "event: failed\ndata: {\"status\": \"error\", \"error\": \"Job nicht gefunden\"}\n\n"
+            return
+        if job["status"] not in FINAL and time.time() - job.get("created_at", time.time()) > OCR_JOB_TIMEOUT_SEC:
+            yield "event: failed\ndata: {\"status\": \"error\", \"error\": \"Zeitüberschreitung\"}\n\n"
+            return
+        if job["status"] != last:
+            last = job["status"]
+            name = "failed" if last == "error" else last   # "error" ist in EventSource reserviert
+            yield f"event: {name}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if last in FINAL:
+                return
+        elif job.get("progress") and job["progress"] != last_progress:
+            last_progress = job["progress"]
+            data = {"progress": last_progress, "partial": job.get("partial") or []}
+            yield f"event: progress\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        if time.monotonic() >= deadline:
+            return   # Thread freigeben; Client verbindet sich neu
+        time.sleep(poll_sec)
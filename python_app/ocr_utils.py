@@ -1,19 +1,47 @@
 # ocr_utils.py
 from __future__ import annotations
-import os, re, sys, json, importlib, subprocess
-from dataclasses import dataclass
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import date as _date
+import os, re, sys, json, math, hashlib, importlib, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from PIL import Image, ImageFilter, ImageOps
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from field_extract import extract_fields
 
 # ---------------------------------- Config ----------------------------------
 LANGS = "deu+eng"
 TESS_CONFIGS = [r'--oem 3 --psm 6', r'--oem 3 --psm 11', r'--oem 3 --psm 4']
 USE_PADDLE = os.getenv("OCR_ENGINE", "tesseract").lower().startswith("paddle")
 PADDLE_TIMEOUT_SEC = int(os.getenv("PADDLE_TIMEOUT_SEC", "25"))
+# Pass-Scheduler: parallele Tesseract-Läufe, Abbruch sobald ein Lauf sicher genug ist
+OCR_PASS_CONCURRENCY = int(os.getenv("OCR_PASS_CONCURRENCY", str(min(os.cpu_count() or 1, 3))))
+OCR_EARLY_EXIT_CONF = float(os.getenv("OCR_EARLY_EXIT_CONF", "80"))
+OCR_PASS_STATS = os.getenv("OCR_PASS_STATS", os.path.join(tempfile.gettempdir(), "familysout-ocr-pass-stats.json"))
+# Tesseract-Backend: auto (tesserocr wenn installiert, sonst pytesseract) | tesserocr | pytesseract
+OCR_TESS_BACKEND = os.getenv("OCR_TESS_BACKEND", "auto").lower()
+# Normalisierung vor allen Passes: reduziert dekodieren, entzerren, auf Text zuschneiden,
+# auf Ziel-x-Höhe skalieren (Tesseract arbeitet am besten bei ~20–30 px x-Höhe)
+OCR_NORMALIZE = os.getenv("OCR_NORMALIZE", "1") not in ("0", "false", "no")
+OCR_TARGET_XHEIGHT_PX = int(os.getenv("OCR_TARGET_XHEIGHT_PX", "24"))
+OCR_MAX_SIDE_PX = int(os.getenv("OCR_MAX_SIDE_PX", "2600"))
+OCR_DESKEW_MAX_DEG = float(os.getenv("OCR_DESKEW_MAX_DEG", "5"))
+# PDFs: Seite für Seite rastern (nie alle Seiten gleichzeitig im Speicher)
+OCR_PDF_DPI = int(os.getenv("OCR_PDF_DPI", "200"))
+OCR_PDF_MAX_PAGES = int(os.getenv("OCR_PDF_MAX_PAGES", "60"))
+OCR_PDF_PAGE_CONCURRENCY = int(os.getenv("OCR_PDF_PAGE_CONCURRENCY", "2"))
+# Erhöhen, sobald sich Vorverarbeitung oder Feld-Heuristiken ändern → OCR-Cache wird neu befüllt
+PIPELINE_VERSION = 4
+
+def ocr_config_version() -> str:
+    """Kurzer Fingerabdruck von Engine + Konfiguration – Teil des OCR-Cache-Schlüssels.
+       Enthält das tatsächlich gewählte Tesseract-Backend: OCR_TESS_BACKEND=auto kann je
+       Host anders ausgehen (tesserocr/pytesseract), der Cache liegt aber auf einem Volume."""
+    raw = json.dumps([PIPELINE_VERSION, "paddle" if USE_PADDLE else "tesseract", get_engine().name,
+                      LANGS, TESS_CONFIGS])
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
 
 # --------------------------------- Dataclass --------------------------------
 @dataclass
@@ -24,20 +52,7 @@ class OCRResult:
     missing: List[str]
     confidence: Dict[str, float]
     candidates: List[Dict[str, Any]]
-
-# ------------------------------- Regex/Heuristik -----------------------------
-MONTH_WORDS = {
-    'jan':1,'feb':2,'mär':3,'mrz':3,'apr':4,'mai':5,'jun':6,'jul':7,'aug':8,'sep':9,'sept':9,'okt':10,'nov':11,'dez':12
-}
-TIME_RE = re.compile(r'\b(\d{1,2})[:\.h ](\d{2})\s*(?:uhr)?\b', re.I)
-DATE_FULL_RE = re.compile(r'\b(\d{1,2})\s*[\.\-/]\s*(\d{1,2})\s*[\.\-/]\s*(\d{2,4})\b')
-DATE_DM_RE = re.compile(r'\b(\d{1,2})\s*[\.\-/]\s*(\d{1,2})(?!\s*[\.\-/]\s*\d)\b')
-DATE_WORD_RE = re.compile(r'\b(\d{1,2})\.\s*(Jan|Feb|Mär|Mrz|Apr|Mai|Jun|Jul|Aug|Sep|Sept|Okt|Nov|Dez)\w*\.?,?\s*(\d{2,4})?\b', re.I)
-PRICE_RE = re.compile(r'(\d{1,3}(?:[\.\,]\d{3})*(?:[\.\,]\d{2}))\s*(?:€|EUR)\b')
-URL_RE   = re.compile(r'(https?://[^\s\)\]]+|www\.[^\s\)\]]+)', re.I)
-FREE_HINTS   = ['eintritt frei','kostenlos','gratis','ohne eintritt','frei']
-OUTDOOR_HINTS= ['open air','open-air','freiluft','park','platz','festivalgelände','strand','garten']
-LOCATION_HINTS=['Theater Brand','Buchhandlung am Markt','Stadthalle','Rathaus','Markt','Park','Platz','Kirche','Haus','Theater','Bürgerhaus','Bürgerzentrum']
+    spans: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)   # Fundstellen im einzeiligen Text (field_extract)
 
 # ---------------------------------- Utils -----------------------------------
 def _normalize_text(t: str) -> str:
@@ -46,10 +61,6 @@ def _normalize_text(t: str) -> str:
     t = re.sub(r'[–—]', '-', t)
     return t
 
-def _guess_year(month: int) -> int:
-    today = _date.today()
-    return today.year + (1 if month < today.month else 0)
-
 def _preprocess_pil(img: Image.Image) -> Image.Image:
     gray = ImageOps.grayscale(img)
     gray = ImageOps.autocontrast(gray)
@@ -57,19 +68,142 @@ def _preprocess_pil(img: Image.Image) -> Image.Image:
     bw = gray.point(lambda x: 0 if x < 140 else 255, mode='1')
     return bw.convert("L")
 
-def _preprocess_cv2(path: str) -> Optional[Image.Image]:
+def _preprocess_cv2(img: Image.Image) -> Optional[Image.Image]:
     try:
         cv2 = importlib.import_module("cv2")
+        np = importlib.import_module("numpy")
     except Exception:
         return None
-    img = cv2.imread(path, cv2.IMREAD_COLOR)
-    if img is None: return None
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = np.asarray(img.convert("L"))
     gray = cv2.bilateralFilter(gray, 9, 75, 75)
     bw = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                                cv2.THRESH_BINARY, 31, 15)
     return Image.fromarray(bw)
 
+# ------------------------------ Normalisierung -------------------------------
+# Handyfotos haben oft 12+ MP – jeder Pass auf voller Auflösung kostet CPU und
+# auf der 512-MB-VM vor allem Speicher. Analyse läuft auf einer kleinen
+# Binärkopie (_ANALYSIS_SIDE), angewendet wird auf das Graustufenbild.
+_ANALYSIS_SIDE = 900
+
+def _open_reduced(path: str, max_side: int = OCR_MAX_SIDE_PX) -> Image.Image:
+    """Öffnet das Bild in Graustufen; JPEGs werden per draft() gleich verkleinert dekodiert."""
+    img = Image.open(path)
+    w, h = img.size
+    if img.format == "JPEG" and max(w, h) > max_side:
+        # draft() skaliert in 1/2, 1/4, 1/8 – mindestens `max_side`, um Reserve zum Hochrechnen zu haben
+        s = max_side / max(w, h)
+        img.draft("L", (int(w * s) + 1, int(h * s) + 1))
+    img = ImageOps.exif_transpose(img)
+    return img.convert("L")
+
+def _binary_small(gray: Image.Image) -> Tuple[Image.Image, float]:
+    """Kleine Binärkopie (Tinte = 255) + Faktor klein→groß."""
+    f = min(1.0, _ANALYSIS_SIDE / max(gray.size))
+    small = gray.resize((max(1, int(gray.width * f)), max(1, int(gray.height * f))), Image.BILINEAR) if f < 1 else gray
+    small = ImageOps.autocontrast(small)
+    return small.point(lambda x: 255 if x < 140 else 0), 1.0 / f
+
+def _row_profile(bw: Image.Image) -> List[int]:
+    w, h = bw.size
+    data = bw.tobytes()
+    return [data[y * w:(y + 1) * w].count(255) for y in range(h)]
+
+def _col_profile(bw: Image.Image) -> List[int]:
+    return _row_profile(bw.transpose(Image.Transpose.ROTATE_90))[::-1]
+
+def _estimate_skew(bw: Image.Image, max_deg: float = OCR_DESKEW_MAX_DEG, step: float = 0.5) -> float:
+    """Projektionsprofil: bei korrektem Winkel sind die Zeilensummen am „schärfsten“ (max. Varianz)."""
+    best_angle, best_score = 0.0, -1.0
+    n = int(max_deg / step)
+    for i in range(-n, n + 1):
+        angle = i * step
+        rows = _row_profile(bw.rotate(angle, resample=Image.NEAREST, fillcolor=0))
+        score = sum((rows[k] - rows[k - 1]) ** 2 for k in range(1, len(rows)))
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+def _span(profile: List[int], length: int, lo: float, hi: float) -> Optional[Tuple[int, int]]:
+    lo_n, hi_n = math.ceil(length * lo), int(length * hi)
+    idx = [i for i, v in enumerate(profile) if lo_n <= v <= hi_n]
+    return (idx[0], idx[-1] + 1) if idx else None
+
+def _text_bbox(bw: Image.Image, pad: float = 0.02) -> Optional[Tuple[int, int, int, int]]:
+    """Bereich mit Text. Erst das Papier (Zeilen/Spalten überwiegend hell – dunkler
+       Tisch/Hintergrund auf Fotos fällt heraus), darin Zeilen/Spalten mit etwas Tinte."""
+    w, h = bw.size
+    ys, xs = _span(_row_profile(bw), w, 0.0, 0.5), _span(_col_profile(bw), h, 0.0, 0.5)
+    if not ys or not xs:
+        return None
+    paper = bw.crop((xs[0], ys[0], xs[1], ys[1]))
+    pw, ph = paper.size
+    ty, tx = _span(_row_profile(paper), pw, 0.005, 0.6), _span(_col_profile(paper), ph, 0.005, 0.6)
+    if not ty or not tx:
+        return None
+    px, py = int(w * pad), int(h * pad)   # Rand bleibt innerhalb des Papiers
+    return (max(xs[0], xs[0] + tx[0] - px), max(ys[0], ys[0] + ty[0] - py),
+            min(xs[1], xs[0] + tx[1] + px), min(ys[1], ys[0] + ty[1] + py))
+
+def _estimate_xheight(bw: Image.Image) -> Optional[float]:
+    """Median der Textzeilenhöhen (Läufe von Zeilen mit Tinte); x-Höhe ≈ halbe Zeilenhöhe."""
+    rows = _row_profile(bw)
+    base = sorted(rows)[len(rows) // 5]   # Grundrauschen (Ränder, Schmutz) zwischen den Zeilen
+    thresh = base + max(1, int(bw.width * 0.01))
+    runs, start = [], None
+    for y, v in enumerate(rows + [0]):
+        if v >= thresh and start is None:
+            start = y
+        elif v < thresh and start is not None:
+            if y - start >= 3:
+                runs.append(y - start)
+            start = None
+    if len(runs) < 2:
+        return None
+    runs.sort()
+    return runs[len(runs) // 2] / 2.0
+
+def _normalize_image(path: str) -> Image.Image:
+    """Graustufenbild für alle OCR-Passes: reduziert dekodiert, entzerrt, auf Text
+       zugeschnitten und so skaliert, dass die x-Höhe ~OCR_TARGET_XHEIGHT_PX beträgt."""
+    gray = _open_reduced(path)
+    if not OCR_NORMALIZE:
+        return gray
+    bw, k = _binary_small(gray)
+
+    angle = _estimate_skew(bw) if OCR_DESKEW_MAX_DEG > 0 else 0.0
+    if abs(angle) >= 0.5:
+        gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+        bw = bw.rotate(angle, resample=Image.NEAREST, expand=True, fillcolor=255)   # Ecken zählen nicht als Papier
+        k = gray.width / bw.width
+
+    box = _text_bbox(bw)
+    if box:
+        x0, y0, x1, y1 = box
+        if (x1 - x0) * (y1 - y0) < 0.9 * bw.width * bw.height:
+            gray = gray.crop((int(x0 * k), int(y0 * k), int(x1 * k), int(y1 * k)))
+            bw = bw.crop(box)
+
+    scale = 1.0
+    xh = _estimate_xheight(bw)
+    if xh:
+        scale = OCR_TARGET_XHEIGHT_PX / (xh * k)
+    scale = min(scale, 2.0, OCR_MAX_SIDE_PX / max(gray.size))
+    scale = max(scale, 0.25)
+    if abs(scale - 1.0) > 0.1:
+        gray = gray.resize((max(1, int(gray.width * scale)), max(1, int(gray.height * scale))), Image.LANCZOS)
+    return gray
+
+def _prepare_images(path: str) -> Dict[str, Image.Image]:
+    """Vorverarbeitungs-Varianten für den Pass-Scheduler (alle aus dem normalisierten Bild)."""
+    base = _normalize_image(path)
+    images: Dict[str, Image.Image] = {}
+    img = _preprocess_cv2(base)
+    if img is not None:
+        images["cv2"] = img
+    images["pil"] = _preprocess_pil(base)
+    return images
+
 def _avg_conf_from_data(d: dict) -> float:
     confs = []
     for c in d.get("conf", []):
@@ -79,27 +213,185 @@ def _avg_conf_from_data(d: dict) -> float:
         except: pass
     return float(sum(confs)/len(confs)) if confs else 0.0
 
+# ----------------------------- Tesseract-Engines -----------------------------
+# Gemeinsame Schnittstelle: image_to_data(img, config) → dict im pytesseract-Format
+# (text, conf, left, top, width, height) – der Rest der Pipeline bleibt unverändert.
+class PytesseractEngine:
+    """Fallback: ruft pro Aufruf das tesseract-Binary auf (Temp-Datei, Modell laden)."""
+    name = "pytesseract"
+
+    def image_to_data(self, img: Image.Image, config: str) -> dict:
+        return pytesseract.image_to_data(img, lang=LANGS, config=config, output_type=pytesseract.Output.DICT)
+
+class TesserocrEngine:
+    """In-Process über libtesseract (tesserocr): eine initialisierte API pro Thread,
+       wiederverwendet über Seiten und PSM-Modi – kein Prozessstart, kein Modell-Neuladen."""
+    name = "tesserocr"
+    _PSM_RE = re.compile(r"--psm\s+(\d+)")
+
+    def __init__(self):
+        self.tesserocr = importlib.import_module("tesserocr")
+        self._local = threading.local()
+        self._api()   # früh scheitern, falls Sprachdaten fehlen
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self.tesserocr.PyTessBaseAPI(lang=LANGS, oem=self.tesserocr.OEM.DEFAULT)
+            self._local.api = api
+        return api
+
+    def image_to_data(self, img: Image.Image, config: str) -> dict:
+        tr = self.tesserocr
+        m = self._PSM_RE.search(config or "")
+        api = self._api()
+        api.SetPageSegMode(int(m.group(1)) if m else tr.PSM.AUTO)
+        api.SetImage(img)
+        api.Recognize()   # gibt die GIL frei → Threads laufen parallel
+        data = {"text": [], "conf": [], "left": [], "top": [], "width": [], "height": []}
+        it = api.GetIterator()
+        level = tr.RIL.WORD
+        if it is not None:
+            for word in tr.iterate_level(it, level):
+                txt = word.GetUTF8Text(level)
+                box = word.BoundingBox(level)
+                if not txt or not box:
+                    continue
+                x0, y0, x1, y1 = box
+                data["text"].append(txt)
+                data["conf"].append(word.Confidence(level))
+                data["left"].append(x0); data["top"].append(y0)
+                data["width"].append(x1 - x0); data["height"].append(y1 - y0)
+        api.Clear()
+        return data
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def make_engine(backend: str = OCR_TESS_BACKEND):
+    if backend in ("auto", "tesserocr"):
+        try:
+            return TesserocrEngine()
+        except Exception:
+            if backend == "tesserocr":
+                raise
+    return PytesseractEngine()
+
+def get_engine():
+    """Prozessweite Engine (einmal gewählt, danach wiederverwendet)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = make_engine()
+        return _engine
+
 # ------------------------------- Tesseract OCR -------------------------------
-def _ocr_passes(pil_img: Image.Image) -> Tuple[str, float, dict]:
-    best_text, best_conf, best_data = "", 0.0, {}
-    for cfg in TESS_CONFIGS:
-        data = pytesseract.image_to_data(pil_img, lang=LANGS, config=cfg, output_type=pytesseract.Output.DICT)
-        text = " ".join([t for t in data.get("text", []) if t])
-        conf = _avg_conf_from_data(data)
-        if conf > best_conf:
-            best_text, best_conf, best_data = text, conf, data
-    return best_text, best_conf, best_data
+def _ocr_pass(pil_img: Image.Image, cfg: str, engine=None) -> Tuple[str, float, dict]:
+    data = (engine or get_engine()).image_to_data(pil_img, cfg)
+    text = " ".join([t for t in data.get("text", []) if t])
+    return text, _avg_conf_from_data(data), data
+
+# ------------------------------ Pass-Scheduler -------------------------------
+# Kandidaten = Vorverarbeitung × PSM-Modus. Tesseract läuft als eigener Prozess
+# (pytesseract) bzw. ohne GIL (tesserocr), Threads reichen also für echte
+# Parallelität. Der Thread-Pool bleibt bestehen, damit die Engines pro Thread
+# warm bleiben. Reihenfolge nach bisheriger Gewinnquote; sobald ein Lauf
+# OCR_EARLY_EXIT_CONF erreicht, werden die noch nicht gestarteten Läufe verworfen.
+class PassStats:
+    """Gewinnquote je Kandidat (Laplace-geglättet), pro Prozess, periodisch auf Platte."""
+
+    def __init__(self, path: str = OCR_PASS_STATS, save_every: int = 20):
+        self.path, self.save_every = path, save_every
+        self._lock = threading.Lock()
+        self._dirty = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            self.stats = {}
+
+    def score(self, key: str) -> float:
+        wins, trials = self.stats.get(key, (0, 0))
+        return (wins + 1) / (trials + 2)
+
+    def order(self, keys: List[str]) -> List[str]:
+        with self._lock:
+            return sorted(keys, key=lambda k: -self.score(k))   # stabil → Default-Reihenfolge bei Gleichstand
+
+    def record(self, tried: List[str], winner: Optional[str]) -> None:
+        with self._lock:
+            for k in tried:
+                wins, trials = self.stats.get(k, (0, 0))
+                self.stats[k] = [wins + (1 if k == winner else 0), trials + 1]
+            self._dirty += 1
+            if self._dirty >= self.save_every:
+                self._dirty = 0
+                self._save()
+
+    def _save(self) -> None:
+        try:
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.stats, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+_pass_stats: Optional[PassStats] = None
+_pass_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_pass_stats() -> PassStats:
+    global _pass_stats
+    if _pass_stats is None:
+        _pass_stats = PassStats()
+    return _pass_stats
+
+def _get_pass_pool() -> ThreadPoolExecutor:
+    global _pass_pool
+    with _engine_lock:
+        if _pass_pool is None:
+            _pass_pool = ThreadPoolExecutor(max_workers=max(1, OCR_PASS_CONCURRENCY),
+                                            thread_name_prefix="ocr-pass")
+        return _pass_pool
+
+def _schedule_passes(images: Dict[str, Image.Image], configs: List[str] = TESS_CONFIGS,
+                     concurrency: int = OCR_PASS_CONCURRENCY,
+                     early_exit_conf: float = OCR_EARLY_EXIT_CONF) -> Tuple[str, float, dict]:
+    """Bestes (text, conf, data) über alle Vorverarbeitungen × Configs – parallel, mit Early-Exit."""
+    stats = _get_pass_stats()
+    keys = stats.order([f"{name}|{cfg}" for name in images for cfg in configs])
+    best_key, best = None, ("", 0.0, {})
+    tried: List[str] = []
+
+    ex = _get_pass_pool()
+    queue = list(keys)
+    running = {}
+    try:
+        while queue or running:
+            while queue and len(running) < max(1, concurrency):
+                key = queue.pop(0)
+                name, cfg = key.split("|", 1)
+                # eigene Kopie je Thread – Engines lesen das Bild parallel
+                running[ex.submit(_ocr_pass, images[name].copy(), cfg)] = key
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = running.pop(fut)
+                tried.append(key)
+                text, conf, data = fut.result()
+                if conf > best[1]:
+                    best_key, best = key, (text, conf, data)
+            if best[1] >= early_exit_conf:
+                break   # laufende Passes dürfen auslaufen, Ergebnis wird nicht mehr gebraucht
+    finally:
+        for fut in running:
+            fut.cancel()
+
+    stats.record(tried, best_key)
+    return best
 
 def _ocr_with_tesseract(path: str) -> Tuple[str, float, List[dict]]:
-    img = _preprocess_cv2(path)
-    t1, c1, d1 = ("", 0.0, {})
-    if img is not None:
-        t1, c1, d1 = _ocr_passes(img)
-    pil = Image.open(path)
-    pil = _preprocess_pil(pil)
-    t2, c2, d2 = _ocr_passes(pil)
+    text, conf, data = _schedule_passes(_prepare_images(path))
     # Map to unified "lines"
-    text, conf, data = (t2, c2, d2) if c2 >= c1 else (t1, c1, d1)
     lines = []
     n = len(data.get("text", []))
     for i in range(n):
@@ -114,82 +406,17 @@ def _ocr_with_tesseract(path: str) -> Tuple[str, float, List[dict]]:
     lines.sort(key=lambda l: (round(l["bbox"][1]/15), l["bbox"][0]))
     return text, conf, lines
 
-# --------------------------- Paddle via Subprozess ---------------------------
-def _ocr_with_paddle_subprocess(path: str, timeout_sec: int = PADDLE_TIMEOUT_SEC) -> Tuple[str, float, List[dict]]:
-    """Startet diesen Code als Worker-Prozess, der PaddleOCR importiert.
+# --------------------------- Paddle via Worker-Pool --------------------------
+def _ocr_with_paddle(path: str, timeout_sec: int = PADDLE_TIMEOUT_SEC) -> Tuple[str, float, List[dict]]:
+    """OCR über einen langlebigen Paddle-Worker (paddle_pool), Modell bleibt geladen.
        Gibt (text, avg_conf, lines) zurück. Timeouts/Fehler → Exception."""
-    cmd = [sys.executable, os.path.abspath(__file__), "--paddle-worker", path]
-    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_sec)
-    if proc.returncode != 0:
-        raise RuntimeError(proc.stderr.strip() or "Paddle worker failed")
-    try:
-        payload = json.loads(proc.stdout.strip())
-        return payload["text"], float(payload["avg_conf"]), payload["lines"]
-    except Exception as e:
-        raise RuntimeError(f"Paddle worker invalid JSON: {e}")
+    import paddle_pool
+    payload = paddle_pool.get_pool().ocr(path, timeout=timeout_sec)
+    return payload["text"], float(payload["avg_conf"]), payload["lines"]
 
 # ------------------------------ Field Parsing -------------------------------
-def _extract_dates(text: str) -> List[str]:
-    dates: set[str] = set()
-    # dd.mm.yyyy
-    for d, m, y in DATE_FULL_RE.findall(text):
-        try:
-            year = int(y) if len(y) == 4 else 2000 + int(y)
-            month = int(m); day = int(d)
-            _ = _date(year, month, day)
-            dates.add(f"{year:04d}-{month:02d}-{day:02d}")
-        except: pass
-    # dd.mm
-    for d, m in DATE_DM_RE.findall(text):
-        # wenn dd.mm.yyyy schon existiert, skip duplicates
-        if re.search(rf'\b{re.escape(d)}\s*[\.\-/]\s*{re.escape(m)}\s*[\.\-/]\s*\d{{2,4}}\b', text):
-            continue
-        try:
-            month = int(m); day = int(d)
-            year = _guess_year(month)
-            _ = _date(year, month, day)
-            dates.add(f"{year:04d}-{month:02d}-{day:02d}")
-        except: pass
-    # 12. Aug 2025
-    for d, mw, y in DATE_WORD_RE.findall(text):
-        try:
-            day = int(d); mw = mw.lower()
-            month = next((v for k,v in MONTH_WORDS.items() if mw.startswith(k)), 0)
-            if not month: continue
-            year = int(y) if y else _guess_year(month)
-            if len(str(year)) == 2: year = 2000 + int(year)
-            _ = _date(year, month, day)
-            dates.add(f"{year:04d}-{month:02d}-{day:02d}")
-        except: pass
-    return sorted(dates)
-
-def _extract_time(text: str) -> Optional[str]:
-    m = TIME_RE.search(text)
-    if not m: return None
-    try:
-        return f"{int(m.group(1)):02d}:{int(m.group(2)):02d}"
-    except: return None
-
-def _find_prices(text: str) -> List[float]:
-    vals = []
-    for raw in PRICE_RE.findall(text):
-        try: vals.append(float(raw.replace('.','').replace(',','.')))
-        except: pass
-    return vals
-
-def _guess_is_free(text: str, prices: List[float]) -> Optional[bool]:
-    t = text.lower()
-    if any(h in t for h in FREE_HINTS): return True
-    if prices: return False
-    return None
-
-def _guess_location(text: str) -> Optional[str]:
-    for hint in LOCATION_HINTS:
-        if re.search(re.escape(hint), text, flags=re.I):
-            return hint
-    m = re.search(r'([A-Za-zÄÖÜäöüß\.\- ]+\s\d{1,4}[a-zA-Z]?,\s?\d{4,5}\s[A-Za-zÄÖÜäöüß\.\- ]+)', text)
-    return m.group(1) if m else None
-
+# Datum/Zeit/Preis/Ort/Kategorie/… kommen aus field_extract (ein Durchlauf über
+# den Text); hier bleibt nur der Titel, der die Zeilen-Boxen braucht.
 def _guess_title(lines: List[dict], raw_text: str) -> Optional[str]:
     # nimm Zeile mit größter Boxhöhe ohne typische Metawörter
     blacklist = {'datum','zeit','uhr','eintritt','preis','ort','adresse','location','tickets','info','jeweils','vorführungen','vorfuehrungen'}
@@ -210,72 +437,51 @@ def _guess_title(lines: List[dict], raw_text: str) -> Optional[str]:
             return ln[:160]
     return None
 
-def _guess_category(text: str) -> str:
-    t = text.lower()
-    if re.search(r'theater|theaterst(ü|u)ck', t): return "Theater"
-    if 'zirkus' in t or 'kinder' in t or 'familie' in t: return "Familie"
-    if 'konzert' in t or 'musik' in t: return "Konzert"
-    return "Sonstiges"
-
-def _any_url(text: str) -> Optional[str]:
-    m = URL_RE.search(text)
-    if not m: return None
-    u = m.group(1)
-    return "http://" + u if u.startswith("www.") else u
+# ---------------------------- Public API (Main) ------------------------------
+FIELD_KEYS = ["title","description","date","time","location","image_url","maps_url","source_url","source_name","lat","lon","price","is_free","is_outdoor","age_group","category"]
 
-def _guess_outdoor(text: str) -> Optional[bool]:
-    t = text.lower()
-    return True if any(h in t for h in OUTDOOR_HINTS) else None
+def _field_meta(fields: Dict[str, Any], conf_val: float) -> Tuple[List[str], List[str], Dict[str, float]]:
+    found = [k for k in FIELD_KEYS if fields.get(k) not in (None, "", [])]
+    missing = [k for k in FIELD_KEYS if k not in found]
+    return found, missing, {k: conf_val for k in FIELD_KEYS}
 
-# ---------------------------- Public API (Main) ------------------------------
-def extract_event_fields_from_path(path: str) -> OCRResult:
-    # 1) OCR (Paddle → Subprozess, sonst Tesseract)
+def _ocr_image(path: str) -> Tuple[str, float, List[dict]]:
+    """OCR eines Bildes (Paddle → Worker-Pool, sonst/bei Fehler Tesseract)."""
     if USE_PADDLE:
         try:
-            text, base_conf, lines = _ocr_with_paddle_subprocess(path, timeout_sec=PADDLE_TIMEOUT_SEC)
+            return _ocr_with_paddle(path, timeout_sec=PADDLE_TIMEOUT_SEC)
         except Exception:
-            text, base_conf, lines = _ocr_with_tesseract(path)
-    else:
-        text, base_conf, lines = _ocr_with_tesseract(path)
+            pass
+    return _ocr_with_tesseract(path)
 
+def _build_result(text: str, base_conf: float, lines: List[dict]) -> OCRResult:
+    """OCR-Text → Felder + Kandidaten (ein Event pro erkanntem Datum)."""
     raw_text = _normalize_text(text or "")
     oneline  = re.sub(r'\s+', ' ', raw_text)
 
-    # 2) Kernfelder
-    dates = _extract_dates(oneline)
-    time  = _extract_time(oneline)
-    prices = _find_prices(oneline)
-    price  = min(prices) if prices else None
-    is_free = _guess_is_free(oneline, prices)
+    # Kernfelder
+    ex = extract_fields(oneline)
+    dates, time = ex.dates, ex.time
     title = _guess_title(lines, raw_text)
-    location = _guess_location(oneline)
-    category = _guess_category(oneline)
-    age_group = None
-    m_age = re.search(r'\bab\s*(\d{1,2})\s*(?:J|Jahre|Jahren)\b', oneline, flags=re.I)
-    if m_age: age_group = f"ab {m_age.group(1)} Jahren"
-    elif re.search(r'Kinder|Familie|Kids', oneline, flags=re.I):
-        age_group = "Familie/Kinder"
-    source_url = _any_url(oneline)
-    is_outdoor = _guess_outdoor(oneline)
 
     base_fields = {
         "title": title,
         "description": raw_text[:1000] if raw_text else None,
-        "location": location,
-        "category": category or "Unbekannt",
+        "location": ex.location,
+        "category": ex.category or "Unbekannt",
         "maps_url": None,
-        "source_url": source_url,
+        "source_url": ex.url,
         "source_name": None,
         "lat": None,
         "lon": None,
-        "price": price,
-        "is_free": is_free,
-        "is_outdoor": is_outdoor,
-        "age_group": age_group,
+        "price": ex.price,
+        "is_free": ex.is_free,
+        "is_outdoor": ex.is_outdoor,
+        "age_group": ex.age_group,
         "image_url": None
     }
 
-    # 3) Kandidaten (ein Event pro Datum)
+    # Kandidaten (ein Event pro Datum)
     candidates: List[Dict[str, Any]] = []
     if dates:
         for d in dates:
@@ -289,18 +495,124 @@ def extract_event_fields_from_path(path: str) -> OCRResult:
 
     fields = dict(candidates[0])
 
-    keys = ["title","description","date","time","location","image_url","maps_url","source_url","source_name","lat","lon","price","is_free","is_outdoor","age_group","category"]
-    found = [k for k in keys if fields.get(k) not in (None, "", [])]
-    missing = [k for k in keys if k not in found]
-    conf_val = max(min(float(base_conf)/100.0, 1.0), 0.0)
-    confidence = {k: conf_val for k in keys}
+    found, missing, confidence = _field_meta(fields, max(min(float(base_conf)/100.0, 1.0), 0.0))
+    return OCRResult(text=raw_text, fields=fields, found=found, missing=missing, confidence=confidence,
+                     candidates=candidates, spans=ex.spans)
 
-    return OCRResult(text=raw_text, fields=fields, found=found, missing=missing, confidence=confidence, candidates=candidates)
+
+# ------------------------------------ PDF ------------------------------------
+# Programmhefte haben schnell 40+ Seiten. convert_from_path() ohne Seitenbereich
+# rastert alle auf einmal in den Speicher – hier wird jede Seite einzeln als
+# PNG in ein Temp-Verzeichnis gerendert, erkannt und sofort wieder gelöscht.
+# Höchstens OCR_PDF_PAGE_CONCURRENCY Seiten sind gleichzeitig in Arbeit; die
+# Tesseract-Passes aller Seiten teilen sich den Pass-Pool (CPU bleibt begrenzt).
+def is_pdf(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == ".pdf"
+
+def pdf_page_count(path: str) -> int:
+    return int(pdfinfo_from_path(path).get("Pages") or 0)
+
+def _ocr_pdf_page(path: str, page: int, tmp_dir: str) -> Optional[OCRResult]:
+    paths = convert_from_path(path, dpi=OCR_PDF_DPI, first_page=page, last_page=page,
+                              output_folder=tmp_dir, output_file=f"p{page:04d}",
+                              fmt="png", grayscale=True, paths_only=True)
+    try:
+        return _build_result(*_ocr_image(paths[0])) if paths else None
+    finally:
+        for p in paths:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+def iter_pdf_pages(path: str, concurrency: int = OCR_PDF_PAGE_CONCURRENCY,
+                   max_pages: int = OCR_PDF_MAX_PAGES) -> Iterator[Tuple[int, int, OCRResult]]:
+    """Liefert (seite, seiten_gesamt, ergebnis) sobald eine Seite fertig ist (Reihenfolge
+       nach Fertigstellung). Fehlerhafte/leere Seiten werden übersprungen."""
+    total = min(pdf_page_count(path), max_pages)
+    concurrency = max(1, concurrency)
+    pages = iter(range(1, total + 1))
+    with tempfile.TemporaryDirectory(prefix="ocr-pdf-") as tmp_dir, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ocr-page") as ex:
+        running: Dict[Any, int] = {}
+        while True:
+            while len(running) < concurrency:
+                page = next(pages, None)
+                if page is None:
+                    break
+                running[ex.submit(_ocr_pdf_page, path, page, tmp_dir)] = page
+            if not running:
+                return
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                page = running.pop(fut)
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    print(f"[ocr] PDF-Seite {page} fehlgeschlagen: {e}")
+                    continue
+                if res is not None:
+                    yield page, total, res
+
+def page_candidates(page: int, res: OCRResult) -> List[Dict[str, Any]]:
+    """Kandidaten einer Seite, mit Seitennummer markiert."""
+    return [dict(c, page=page) for c in res.candidates]
+
+def merge_pdf_pages(pages: List[Tuple[int, OCRResult]]) -> OCRResult:
+    """Seitenergebnisse → ein OCRResult. Kandidaten mit Datum aus allen Seiten;
+       undatierte nur, wenn das ganze Dokument kein Datum enthält."""
+    pages = sorted(pages, key=lambda pr: pr[0])
+    if not pages:
+        return _build_result("", 0.0, [])
+    text = "\n\n".join(r.text for _, r in pages if r.text)
+    cands = [c for n, r in pages for c in page_candidates(n, r)]
+    dated = [c for c in cands if c.get("date")]
+    candidates = dated or cands[:1]
+    fields = {k: v for k, v in candidates[0].items() if k != "page"}
+    conf_val = sum(next(iter(r.confidence.values()), 0.0) for _, r in pages) / len(pages)
+    found, missing, confidence = _field_meta(fields, conf_val)
+    return OCRResult(text=text, fields=fields, found=found, missing=missing, confidence=confidence, candidates=candidates)
+
+# --------------------------------- Einstieg ----------------------------------
+def extract_event_fields_from_path(path: str) -> OCRResult:
+    if is_pdf(path):
+        return merge_pdf_pages([(page, res) for page, _, res in iter_pdf_pages(path)])
+    return _build_result(*_ocr_image(path))
 
 # ----------------------------- Helper CLI Worker -----------------------------
-# Wird von _ocr_with_paddle_subprocess() aufgerufen.
-# Führt PaddleOCR NUR in einem Subprozess aus und gibt JSON nach stdout.
+# PaddleOCR läuft NUR in eigenen Prozessen (Import/Modell isoliert vom Web-Prozess).
+def _paddle_ocr(ocr, image_path: str) -> dict:
+    result = ocr.ocr(image_path, cls=False)
+    lines = []
+    text_chunks = []
+    confs = []
+    if result and result[0]:
+        for det in result[0]:
+            box, (txt, conf) = det
+            if not txt: continue
+            xs = [p[0] for p in box]; ys = [p[1] for p in box]
+            x_min, y_min, x_max, y_max = min(xs), min(ys), max(xs), max(ys)
+            h = y_max - y_min
+            lines.append({"text": txt, "conf": float(conf), "bbox": [x_min, y_min, x_max, y_max], "height": h})
+            text_chunks.append(txt); confs.append(float(conf))
+    return {
+        "text": " ".join(text_chunks),
+        "avg_conf": float(sum(confs)/len(confs)) if confs else 0.0,
+        "lines": lines
+    }
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for ln in f:
+                if ln.startswith("VmRSS:"):
+                    return int(ln.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
 def _paddle_worker(image_path: str) -> int:
+    """Einmal-Modus (Debug): ein Bild, JSON nach stdout."""
     try:
         from paddleocr import PaddleOCR  # type: ignore # Import hier → isoliert
     except Exception as e:
@@ -308,30 +620,50 @@ def _paddle_worker(image_path: str) -> int:
         return 2
     try:
         ocr = PaddleOCR(lang='german', use_angle_cls=False, show_log=False)
-        result = ocr.ocr(image_path, cls=False)
-        lines = []
-        text_chunks = []
-        confs = []
-        if result and result[0]:
-            for det in result[0]:
-                box, (txt, conf) = det
-                if not txt: continue
-                xs = [p[0] for p in box]; ys = [p[1] for p in box]
-                x_min, y_min, x_max, y_max = min(xs), min(ys), max(xs), max(ys)
-                h = y_max - y_min
-                lines.append({"text": txt, "conf": float(conf), "bbox": [x_min, y_min, x_max, y_max], "height": h})
-                text_chunks.append(txt); confs.append(float(conf))
-        payload = {
-            "text": " ".join(text_chunks),
-            "avg_conf": float(sum(confs)/len(confs)) if confs else 0.0,
-            "lines": lines
-        }
-        sys.stdout.write(json.dumps(payload, ensure_ascii=False))
+        sys.stdout.write(json.dumps(_paddle_ocr(ocr, image_path), ensure_ascii=False))
         return 0
     except Exception as e:
         sys.stderr.write(str(e))
         return 1
 
+def _paddle_serve() -> int:
+    """Dauer-Modus für paddle_pool: Modell einmal laden, dann JSON-Lines über stdin/stdout."""
+    # stdout gehört dem Protokoll – alles andere (auch C-Bibliotheken) geht nach stderr
+    proto = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    def send(msg: dict) -> None:
+        proto.write(json.dumps(msg, ensure_ascii=False) + "\n")
+        proto.flush()
+
+    try:
+        from paddleocr import PaddleOCR  # type: ignore
+        ocr = PaddleOCR(lang='german', use_angle_cls=False, show_log=False)
+    except Exception as e:
+        send({"ready": False, "error": f"{type(e).__name__}: {e}"})
+        return 2
+    send({"ready": True, "pid": os.getpid()})
+
+    for raw in sys.stdin:
+        try:
+            req = json.loads(raw)
+        except ValueError:
+            continue
+        rid = req.get("id")
+        try:
+            if req.get("op") == "ping":
+                send({"id": rid, "ok": True, "rss_mb": _rss_mb()})
+            elif req.get("op") == "ocr":
+                send({"id": rid, "ok": True, "rss_mb": _rss_mb(), **_paddle_ocr(ocr, req["path"])})
+            else:
+                send({"id": rid, "ok": False, "error": "unbekannte Operation"})
+        except Exception as e:
+            send({"id": rid, "ok": False, "error": str(e), "rss_mb": _rss_mb()})
+    return 0
+
 if __name__ == "__main__":
     if len(sys.argv) >= 3 and sys.argv[1] == "--paddle-worker":
         sys.exit(_paddle_worker(sys.argv[2]))
+    if len(sys.argv) >= 2 and sys.argv[1] == "--paddle-serve":
+        sys.exit(_paddle_serve())
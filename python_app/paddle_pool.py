@@ -0,0 +1,212 @@
+# paddle_pool.py
+"""
+Langlebige PaddleOCR-Worker statt eines neuen Prozesses pro Bild.
+
+Jeder Worker ist `python ocr_utils.py --paddle-serve`: lädt PaddleOCR(lang='german')
+einmal, meldet {"ready": true} und beantwortet danach Anfragen als JSON-Lines
+über stdin/stdout:
+
+    → {"id": 1, "op": "ocr", "path": "/data/uploads/ab/cd/<hash>.jpg"}
+    ← {"id": 1, "ok": true, "text": "...", "avg_conf": 0.93, "lines": [...]}
+    → {"id": 2, "op": "ping"}            ← {"id": 2, "ok": true, "rss_mb": 612.4}
+
+Der Pool (PADDLE_POOL_SIZE Worker, Default 1) prüft Worker vor der Nutzung
+(ping nach Leerlauf), ersetzt sie nach PADDLE_MAX_JOBS Aufträgen oder wenn
+der Speicher über PADDLE_MAX_RSS_MB wächst, und beendet hängende Worker
+nach PADDLE_TIMEOUT_SEC. Startet Paddle nicht (Import-/Modellfehler), ist der
+Pool für PADDLE_RETRY_SEC gesperrt – ocr_utils fällt dann auf Tesseract zurück.
+"""
+from __future__ import annotations
+import atexit, itertools, json, os, queue, subprocess, sys, threading, time
+from typing import Optional
+
+PADDLE_POOL_SIZE = int(os.getenv("PADDLE_POOL_SIZE", "1"))
+PADDLE_TIMEOUT_SEC = int(os.getenv("PADDLE_TIMEOUT_SEC", "25"))
+PADDLE_START_TIMEOUT_SEC = int(os.getenv("PADDLE_START_TIMEOUT_SEC", "90"))
+PADDLE_MAX_JOBS = int(os.getenv("PADDLE_MAX_JOBS", "200"))
+PADDLE_MAX_RSS_MB = float(os.getenv("PADDLE_MAX_RSS_MB", "900"))
+PADDLE_PING_AFTER_IDLE_SEC = 30
+PADDLE_RETRY_SEC = int(os.getenv("PADDLE_RETRY_SEC", "300"))
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_utils.py")
+
+
+class PaddleUnavailable(RuntimeError):
+    pass
+
+
+# ---------------------------------- Worker -----------------------------------
+class PaddleWorker:
+    def __init__(self):
+        self.proc: Optional[subprocess.Popen] = None
+        self.jobs = 0
+        self.last_used = 0.0
+        self._ids = itertools.count(1)
+        self._out: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    def start(self, timeout: float = PADDLE_START_TIMEOUT_SEC) -> None:
+        # Neustart nach close(): frische Queue, sonst liest der neue Prozess das
+        # EOF-None des alten _pump-Threads und gilt sofort als beendet.
+        self.jobs = 0
+        self._ids = itertools.count(1)
+        self._out = queue.Queue()
+        self.proc = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, "--paddle-serve"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=None,
+            text=True, encoding="utf-8", bufsize=1,
+        )
+        threading.Thread(target=self._pump, args=(self.proc, self._out), daemon=True).start()
+        msg = self._read(timeout)
+        if not msg.get("ready"):
+            self.close()
+            raise PaddleUnavailable(msg.get("error") or "Paddle-Worker nicht bereit")
+        self.last_used = time.monotonic()
+
+    @staticmethod
+    def _pump(proc: subprocess.Popen, out: "queue.Queue[Optional[str]]") -> None:
+        """Liest stdout zeilenweise in eine Queue – so sind Timeouts beim Lesen möglich.
+
+        Prozess und Queue kommen als Argumente: ein Pump-Thread bleibt an
+        seinen Prozess gebunden, auch wenn der Worker neu gestartet wurde.
+        """
+        for line in proc.stdout:
+            out.put(line)
+        out.put(None)   # EOF
+
+    def _read(self, timeout: float) -> dict:
+        try:
+            line = self._out.get(timeout=timeout)
+        except queue.Empty:
+            self.close()
+            raise TimeoutError("Paddle-Worker antwortet nicht")
+        if line is None:
+            self.close()
+            raise PaddleUnavailable("Paddle-Worker beendet")
+        return json.loads(line)
+
+    def request(self, payload: dict, timeout: float) -> dict:
+        if not self.alive():
+            raise PaddleUnavailable("Paddle-Worker läuft nicht")
+        payload = {"id": next(self._ids), **payload}
+        try:
+            self.proc.stdin.write(json.dumps(payload) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.close()
+            raise PaddleUnavailable(str(e))
+        while True:
+            msg = self._read(timeout)
+            if msg.get("id") == payload["id"]:
+                self.last_used = time.monotonic()
+                return msg
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def healthy(self) -> bool:
+        if not self.alive():
+            return False
+        if time.monotonic() - self.last_used < PADDLE_PING_AFTER_IDLE_SEC:
+            return True
+        try:
+            msg = self.request({"op": "ping"}, timeout=5)
+        except Exception:
+            return False
+        return bool(msg.get("ok")) and float(msg.get("rss_mb") or 0) < PADDLE_MAX_RSS_MB
+
+    def worn_out(self, rss_mb: Optional[float]) -> bool:
+        return self.jobs >= PADDLE_MAX_JOBS or (rss_mb is not None and rss_mb >= PADDLE_MAX_RSS_MB)
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        try:
+            if self.proc.poll() is None:
+                self.proc.stdin.close()
+                try:
+                    self.proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    self.proc.kill()
+        except Exception:
+            pass
+        self.proc = None
+
+
+# ----------------------------------- Pool ------------------------------------
+class PaddlePool:
+    def __init__(self, size: int = PADDLE_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle: "queue.Queue[PaddleWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._disabled_until = 0.0
+        self._all: list = []
+
+    def _acquire(self) -> PaddleWorker:
+        if time.monotonic() < self._disabled_until:
+            raise PaddleUnavailable("Paddle vorübergehend deaktiviert")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            spawn = self._created < self.size
+            if spawn:
+                self._created += 1
+        if spawn:
+            w = PaddleWorker()
+            self._all.append(w)
+            return w
+        return self._idle.get(timeout=PADDLE_TIMEOUT_SEC)
+
+    def _release(self, w: PaddleWorker, keep: bool) -> None:
+        if keep:
+            self._idle.put(w)
+            return
+        w.close()
+        with self._lock:
+            self._created -= 1
+            if w in self._all:
+                self._all.remove(w)
+
+    def ocr(self, path: str, timeout: float = PADDLE_TIMEOUT_SEC) -> dict:
+        """{"text", "avg_conf", "lines"} – Fehler/Timeouts → Exception (Aufrufer fällt zurück)."""
+        try:
+            w = self._acquire()
+        except queue.Empty:
+            raise PaddleUnavailable("alle Paddle-Worker belegt")
+        keep = False
+        try:
+            if w.alive() and not w.healthy():
+                w.close()
+            if not w.alive():
+                try:
+                    w.start()
+                except Exception:
+                    self._disabled_until = time.monotonic() + PADDLE_RETRY_SEC
+                    raise
+            msg = w.request({"op": "ocr", "path": os.path.abspath(path)}, timeout=timeout)
+            w.jobs += 1
+            keep = w.alive() and not w.worn_out(msg.get("rss_mb"))
+            if not msg.get("ok"):
+                raise RuntimeError(msg.get("error") or "Paddle-OCR fehlgeschlagen")
+            return msg
+        finally:
+            self._release(w, keep)
+
+    def close(self) -> None:
+        for w in list(self._all):
+            w.close()
+        self._all.clear()
+
+
+_pool: Optional[PaddlePool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> PaddlePool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PaddlePool()
+            atexit.register(_pool.close)   # Worker sterben mit dem OCR-Prozess
+        return _pool
@@ -0,0 +1,236 @@
+# result_cache.py
+"""
+Ergebnis-Cache für die Event-Suche (/results, /results/more, /api/events).
+
+Gecacht wird pro Seite nur das Ergebnis der teuren Suche – die Event-IDs in
+Trefferreihenfolge (+ Distanzen, nächster Cursor). Die Events selbst werden
+bei einem Treffer mit einer einzigen Primärschlüssel-Abfrage nachgeladen.
+
+Invalidierung über einen globalen Versionszähler: jeder Commit, der Events
+anlegt/ändert/löscht (event_erstellen, KingKalli-Upsert, …), erhöht ihn.
+Die Version steckt im Schlüssel, alte Einträge werden so nie mehr gelesen
+und laufen per TTL/LRU aus.
+
+Backends:
+  - REDIS_URL gesetzt (und Paket `redis` installiert) → Werte + Version in
+    Redis, geteilt von allen gunicorn-Workern. LRU übernimmt Redis selbst
+    (maxmemory-policy allkeys-lru).
+  - sonst lokal: Werte in einem LRU-Dict pro Prozess, die Version in einer
+    kleinen Datei (RESULT_CACHE_DIR), damit ein Schreiben in Worker A auch
+    die Einträge in Worker B entwertet.
+
+Die Versionszähler sind benannt ("results", "users", …) und stehen auch
+anderen Caches zur Verfügung (user_cache).
+"""
+from __future__ import annotations
+import importlib, json, os, threading, time
+from collections import OrderedDict
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as _SASession
+
+from models import Event
+import event_search
+
+RESULT_CACHE_TTL_SEC = int(os.getenv("RESULT_CACHE_TTL_SEC", "300"))
+RESULT_CACHE_MAX = int(os.getenv("RESULT_CACHE_MAX", "512"))
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "/tmp/familysout-cache")
+REDIS_URL = os.getenv("REDIS_URL", "")
+KEY_PREFIX = "fs:results:"
+
+
+# --------------------------------- Backends ---------------------------------
+class LocalBackend:
+    """LRU+TTL im Prozess, Versionszähler als Dateien (für alle Worker sichtbar)."""
+
+    def __init__(self, directory: str = RESULT_CACHE_DIR, maxsize: int = RESULT_CACHE_MAX):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        try:
+            self._fcntl = importlib.import_module("fcntl")
+        except ImportError:  # Windows-Entwicklung: ohne Dateisperre
+            self._fcntl = None
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            expires, value = hit
+            if time.monotonic() > expires:
+                self._data.pop(key, None)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _version_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.version")
+
+    def version(self, name: str = "results") -> int:
+        try:
+            with open(self._version_path(name), "r") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self, name: str = "results") -> int:
+        with open(self._version_path(name), "a+") as f:
+            if self._fcntl:
+                self._fcntl.flock(f, self._fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    v = int(f.read().strip() or 0) + 1
+                except ValueError:
+                    v = 1
+                f.seek(0)
+                f.truncate()
+                f.write(str(v))
+                f.flush()
+            finally:
+                if self._fcntl:
+                    self._fcntl.flock(f, self._fcntl.LOCK_UN)
+        return v
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        redis = importlib.import_module("redis")
+        self.r = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> Optional[str]:
+        raw = self.r.get(KEY_PREFIX + key)
+        return raw.decode() if raw is not None else None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.r.set(KEY_PREFIX + key, value, ex=ttl)
+
+    def version(self, name: str = "results") -> int:
+        return int(self.r.get(f"fs:version:{name}") or 0)
+
+    def bump(self, name: str = "results") -> int:
+        return int(self.r.incr(f"fs:version:{name}"))
+
+    def clear(self) -> None:
+        pass   # alte Schlüssel laufen per TTL aus
+
+
+def _make_backend():
+    if REDIS_URL:
+        try:
+            backend = RedisBackend(REDIS_URL)
+            backend.r.ping()
+            return backend
+        except Exception as e:
+            print(f"[result_cache] Redis nicht verfügbar ({e}) → lokaler Cache")
+    return LocalBackend()
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _make_backend()
+    return _backend
+
+
+# -------------------------------- Version -----------------------------------
+def current_version(name: str = "results") -> int:
+    try:
+        return backend().version(name)
+    except Exception:
+        return -1   # Backend gestört → Version, unter der nie etwas gespeichert wird
+
+def bump_version(name: str = "results") -> None:
+    try:
+        backend().bump(name)
+        if name == "results":
+            backend().clear()   # eigene Einträge sofort freigeben
+    except Exception as e:
+        print(f"[result_cache] Version {name} konnte nicht erhöht werden: {e}")
+
+def mark_events_written(session) -> None:
+    """Für Schreibvorgänge an der ORM-Unit-of-Work vorbei (Bulk-INSERT, Core):
+       beim nächsten Commit wird die Version trotzdem erhöht."""
+    session.info["results_dirty"] = True
+
+@event.listens_for(_SASession, "after_flush")
+def _mark_event_writes(session, flush_context):
+    if any(isinstance(o, Event) for o in (*session.new, *session.dirty, *session.deleted)):
+        session.info["results_dirty"] = True
+
+@event.listens_for(_SASession, "after_commit")
+def _bump_after_commit(session):
+    if session.info.pop("results_dirty", False):
+        bump_version()
+
+@event.listens_for(_SASession, "after_rollback")
+def _reset_after_rollback(session):
+    session.info.pop("results_dirty", None)
+
+
+# ---------------------------------- Suche -----------------------------------
+def _key(p: event_search.SearchParams, cursor: Optional[str], limit: int, version: int) -> str:
+    parts = [str(version), p.cache_key(), cursor or "", str(limit)]
+    if p.when:
+        parts.append(date.today().isoformat())   # today/weekend hängen vom Tag ab
+    return "|".join(parts)
+
+def _load_events(sess, ids: List[int], dist: Optional[List[float]]) -> List[Event]:
+    by_id = {e.id: e for e in sess.query(Event).filter(Event.id.in_(ids or [-1])).all()}
+    events = []
+    for n, i in enumerate(ids):
+        ev = by_id.get(i)
+        if ev is None:
+            continue
+        if dist is not None:
+            ev.distance_km = dist[n]
+        events.append(ev)
+    return events
+
+def fetch_page(sess, p: event_search.SearchParams, cursor: Optional[str] = None,
+               limit: int = event_search.PAGE_SIZE) -> Tuple[List[Event], Optional[str]]:
+    """Wie event_search.fetch_page, aber mit Ergebnis-Cache davor."""
+    limit = max(1, min(int(limit or event_search.PAGE_SIZE), event_search.MAX_PAGE_SIZE))
+    version = current_version()
+    key = _key(p, cursor, limit, version) if version >= 0 else None
+
+    if key:
+        try:
+            raw = backend().get(key)
+        except Exception:
+            raw = None
+        if raw is not None:
+            data = json.loads(raw)
+            return _load_events(sess, data["ids"], data.get("dist")), data["next"]
+
+    events, next_cursor = event_search.fetch_page(sess, p, cursor, limit)
+
+    if key:
+        dist = [e.distance_km for e in events] if events and hasattr(events[0], "distance_km") else None
+        payload = json.dumps({"ids": [e.id for e in events], "dist": dist, "next": next_cursor},
+                             separators=(",", ":"))
+        try:
+            backend().set(key, payload, RESULT_CACHE_TTL_SEC)
+        except Exception:
+            pass
+    return events, next_cursor
@@ -0,0 +1,175 @@
+# search_index.py
+"""
+Volltextsuche über Titel, Beschreibung und Ort.
+
+- SQLite: FTS5-Tabelle `events_fts` (external content auf `events`),
+  per Trigger bei INSERT/UPDATE/DELETE synchron gehalten. Der Tokenizer
+  faltet Umlaute (ä → a); die Query wird zusätzlich leicht gestemmt und
+  als Präfix gesucht ("Kindern" → kind*), Ranking über bm25().
+- Postgres: generierte Spalte `events.search_vector` (tsvector, Konfiguration
+  'german' mit Snowball-Stemming) + GIN-Index, Ranking über ts_rank_cd().
+
+Ist der Index (noch) nicht angelegt, fällt die Suche auf ILIKE zurück.
+
+Index anlegen / neu aufbauen (SQLite):
+    python search_index.py --rebuild
+"""
+from __future__ import annotations
+import re, sys
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, func, literal_column, text
+
+from models import Event
+
+# Gewichte für bm25(): title, description, location
+BM25_WEIGHTS = (10.0, 1.0, 4.0)
+UMLAUT_FOLD = ("ÄÖÜäöüß", "AOUaous")
+
+_TOKEN_RE = re.compile(r"\w+", re.U)
+_SUFFIXES_LONG = ("ern", "em", "er", "en", "es")
+_SUFFIXES_SHORT = ("e", "s", "n")
+_STOPWORDS = {"der", "die", "das", "den", "dem", "des", "ein", "eine", "und", "oder", "mit",
+              "für", "fuer", "im", "in", "am", "an", "auf", "zum", "zur", "von", "bei", "ab"}
+
+_available: dict = {}
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        title, description, location,
+        content='events', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2"
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF title, description, location ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO events_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END""",
+]
+
+
+# ------------------------------ Query-Aufbereitung ---------------------------
+def _stem_de(tok: str) -> str:
+    """Sehr leichter deutscher Stemmer (nur Flexionsendungen, kein Wörterbuch)."""
+    if len(tok) > 5:
+        for suf in _SUFFIXES_LONG:
+            if tok.endswith(suf):
+                return tok[:-len(suf)]
+    if len(tok) > 4:
+        for suf in _SUFFIXES_SHORT:
+            if tok.endswith(suf):
+                return tok[:-1]
+    return tok
+
+def _variants(tok: str) -> List[str]:
+    """Schreibvarianten: Umlaut ↔ ae/oe/ue, ß ↔ ss."""
+    out = {tok}
+    if re.search(r"[äöü]", tok):
+        out.add(tok.replace("ä", "ae").replace("ö", "oe").replace("ü", "ue"))
+    if re.search(r"ae|oe|ue", tok):
+        out.add(tok.replace("ae", "ä").replace("oe", "ö").replace("ue", "ü"))
+    for v in list(out):
+        if "ß" in v: out.add(v.replace("ß", "ss"))
+        if "ss" in v: out.add(v.replace("ss", "ß"))
+    return sorted(out)
+
+def query_tokens(q: str) -> List[str]:
+    toks = [t for t in _TOKEN_RE.findall((q or "").lower()) if len(t) >= 2 or t.isdigit()]
+    return [t for t in toks if t not in _STOPWORDS] or toks
+
+def build_fts5_query(q: str) -> Optional[str]:
+    """'Märchen für Kinder' → ("maerch"* OR "märch"*) "kind"*"""
+    parts = []
+    for tok in query_tokens(q):
+        terms = sorted({f'"{_stem_de(v)}"*' for v in _variants(tok)})
+        parts.append(terms[0] if len(terms) == 1 else "(" + " OR ".join(terms) + ")")
+    return " ".join(parts) or None
+
+
+# ------------------------------- Verfügbarkeit -------------------------------
+def fts_available(sess) -> bool:
+    dialect = sess.get_bind().dialect.name
+    if dialect not in _available:
+        try:
+            if dialect == "sqlite":
+                row = sess.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'events_fts'")).first()
+            elif dialect == "postgresql":
+                row = sess.execute(text(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = 'events' AND column_name = 'search_vector'"
+                )).first()
+            else:
+                row = None
+            _available[dialect] = row is not None
+        except Exception:
+            _available[dialect] = False
+    return _available[dialect]
+
+def ensure_sqlite_fts(conn, rebuild: bool = False) -> None:
+    """Legt FTS5-Tabelle + Trigger an (idempotent); optional kompletter Neuaufbau."""
+    for ddl in SQLITE_DDL:
+        conn.execute(text(ddl))
+    if rebuild:
+        conn.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+    _available.pop("sqlite", None)
+
+
+# ---------------------------------- Suche -----------------------------------
+def _ilike_filter(qset, q: str):
+    like = f"%{q}%"
+    return qset.filter(
+        (Event.title.ilike(like)) |
+        (Event.description.ilike(like)) |
+        (Event.location.ilike(like))
+    )
+
+def apply_text_search(sess, qset, q: str) -> Tuple[object, Optional[object]]:
+    """Filtert `qset` auf Treffer für `q`.
+       Rückgabe: (query, rank_expr) – rank_expr aufsteigend sortieren (kleiner = besser),
+       None beim ILIKE-Fallback."""
+    q = (q or "").strip()
+    if not q:
+        return qset, None
+    if not fts_available(sess):
+        return _ilike_filter(qset, q), None
+
+    dialect = sess.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = build_fts5_query(q)
+        if not match:
+            return _ilike_filter(qset, q), None
+        w = ", ".join(str(x) for x in BM25_WEIGHTS)
+        hits = (
+            text(f"SELECT rowid AS event_id, bm25(events_fts, {w}) AS rank "
+                 "FROM events_fts WHERE events_fts MATCH :fts_q")
+            .bindparams(fts_q=match)
+            .columns(event_id=Integer, rank=Float)
+            .subquery("fts_hits")
+        )
+        return qset.join(hits, hits.c.event_id == Event.id), hits.c.rank
+
+    # postgresql
+    folded = q.translate(str.maketrans(*UMLAUT_FOLD))
+    tsq = func.websearch_to_tsquery("german", folded)
+    vec = literal_column("events.search_vector")
+    return qset.filter(vec.op("@@")(tsq)), -func.ts_rank_cd(vec, tsq)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--rebuild":
+        from db import engine
+        if engine.dialect.name != "sqlite":
+            print("[search_index] Postgres: search_vector wird per Migration generiert – nichts zu tun")
+            sys.exit(0)
+        with engine.begin() as conn:
+            ensure_sqlite_fts(conn, rebuild=True)
+        print("[search_index] events_fts neu aufgebaut")
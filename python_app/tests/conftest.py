@@ -0,0 +1,5 @@
+# python_app/tests/conftest.py
+# Die Module liegen flach in python_app/ (wie beim Start von app.py) → auf den Pfad.
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+# python_app/tests/test_event_fields.py
+"""Gemeinsame Feld-Umwandlung für Formular, Bulk-Endpoint und ocr_batch."""
+from datetime import datetime
+
+from event_bulk import candidate_to_row
+from event_fields import parse_event_datetime, to_bool
+
+
+def test_to_bool_unknown_is_none():
+    assert to_bool("unbekannt") is None
+    assert to_bool("wahr") is True and to_bool("falsch") is False
+    assert to_bool("") is None
+
+
+def test_parse_event_datetime_iso_and_fallback():
+    assert parse_event_datetime("2025-08-14T13:00:00+02:00") == datetime(2025, 8, 14, 13, 0)
+    assert parse_event_datetime("14.08.25") == datetime(2025, 8, 14, 9, 0)
+
+
+def test_candidate_to_row_form_values():
+    row = candidate_to_row({"title": " Fest ", "date": "2026-11-01", "time": "10:30", "price": "8,50",
+                            "is_free": "unbekannt", "is_outdoor": "wahr", "source_url": "https://www.x.de/a"})
+    assert row["date"] == "2026-11-01 10:30 Uhr"
+    assert row["start_at"] == datetime(2026, 11, 1, 10, 30)
+    assert (row["title"], row["price"], row["is_free"], row["is_outdoor"]) == ("Fest", 8.5, None, True)
+    assert row["source_name"] == "x.de"
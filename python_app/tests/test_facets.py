@@ -0,0 +1,53 @@
+# python_app/tests/test_facets.py
+"""Facetten-Zähler: atomare Updates, auch mit zwei gleichzeitigen Writern."""
+import threading, time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import facets
+from models import CategoryFacet
+
+
+def _engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'facets.db'}", connect_args={"timeout": 10})
+    CategoryFacet.__table__.create(eng)
+    return eng
+
+def _counts(eng):
+    with Session(eng) as s:
+        return dict(s.execute(select(CategoryFacet.name, CategoryFacet.count)).all())
+
+
+def test_changes_add_move_and_remove(tmp_path):
+    eng = _engine(tmp_path)
+    with Session(eng) as s:
+        facets.record_categories_added(s, ["Familie, Sport", "Familie"])
+        s.commit()
+        facets.record_category_change(s, "Sport", "Theater")
+        s.commit()
+    assert _counts(eng) == {"Familie": 2, "Theater": 1}
+
+
+def test_concurrent_writers_create_same_category(tmp_path):
+    eng = _engine(tmp_path)
+    first = Session(eng)
+    facets.record_categories_added(first, ["Neu"])    # hält die Schreibsperre, noch kein Commit
+    errors = []
+
+    def second():
+        with Session(eng) as s:
+            try:
+                facets.record_categories_added(s, ["Neu"])
+                s.commit()
+            except Exception as e:   # vorher: IntegrityError auf category_facets.name
+                errors.append(e)
+
+    t = threading.Thread(target=second)
+    t.start()
+    time.sleep(0.5)   # zweiter Writer hat gelesen und wartet auf die Sperre
+    first.commit()
+    first.close()
+    t.join(timeout=15)
+    assert not errors
+    assert _counts(eng) == {"Neu": 2}
@@ -0,0 +1,8 @@
+# python_app/tests/test_field_extract.py
+"""Korrektheitsfälle aus jobs.field_bench gegen field_extract."""
+from jobs.field_bench import CASES, check_cases
+
+
+def test_field_bench_cases():
+    assert CASES
+    assert check_cases() == []
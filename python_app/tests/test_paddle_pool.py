@@ -0,0 +1,53 @@
+# python_app/tests/test_paddle_pool.py
+"""Neustart eines PaddleWorker – mit einem Fake-Worker statt PaddleOCR."""
+import textwrap
+
+import paddle_pool
+
+FAKE_WORKER = textwrap.dedent('''
+    import json, sys
+    print(json.dumps({"ready": True}), flush=True)
+    for line in sys.stdin:
+        req = json.loads(line)
+        if req.get("op") == "ping":
+            print(json.dumps({"id": req["id"], "ok": True, "rss_mb": 1.0}), flush=True)
+        else:
+            print(json.dumps({"id": req["id"], "ok": True, "text": req.get("path", ""),
+                              "avg_conf": 1.0, "lines": []}), flush=True)
+''')
+
+
+def _fake_worker(tmp_path, monkeypatch):
+    script = tmp_path / "fake_paddle.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    monkeypatch.setattr(paddle_pool, "WORKER_SCRIPT", str(script))
+
+
+def test_worker_restart_after_close(tmp_path, monkeypatch):
+    _fake_worker(tmp_path, monkeypatch)
+    w = paddle_pool.PaddleWorker()
+    w.start(timeout=10)
+    assert w.request({"op": "ping"}, timeout=5)["ok"]
+    w.jobs = 5
+    w.close()
+    w._out.get(timeout=5)      # EOF des alten Pump-Threads liegt in der alten Queue
+
+    w.start(timeout=10)        # darf das alte EOF nicht sehen
+    assert w.alive()
+    assert w.jobs == 0
+    msg = w.request({"op": "ping"}, timeout=5)
+    assert msg["ok"] and msg["id"] == 1
+    w.close()
+
+
+def test_pool_restarts_unhealthy_worker(tmp_path, monkeypatch):
+    _fake_worker(tmp_path, monkeypatch)
+    pool = paddle_pool.PaddlePool(size=1)
+    try:
+        assert pool.ocr("a.jpg", timeout=10)["ok"]
+        w = pool._all[0]
+        w.close()              # Worker stirbt zwischen zwei Aufträgen
+        assert pool.ocr("b.jpg", timeout=10)["text"].endswith("b.jpg")
+        assert pool._disabled_until == 0.0
+    finally:
+        pool.close()
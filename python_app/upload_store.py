@@ -0,0 +1,67 @@
+# upload_store.py
+"""
+Inhaltsadressierte Ablage für Uploads.
+
+Die Datei wird beim Speichern in Blöcken gestreamt und dabei gehasht (SHA-256);
+abgelegt wird sie unter  <root>/<h[0:2]>/<h[2:4]>/<hash><ext>.
+Derselbe Flyer landet so genau einmal auf der Platte, und der Hash dient
+als Schlüssel für den OCR-Cache (ocr_cache).
+"""
+from __future__ import annotations
+import hashlib, os, tempfile
+from dataclasses import dataclass
+
+CHUNK_SIZE = 64 * 1024
+EXT_ALIASES = {".jpeg": ".jpg", ".tif": ".tiff"}
+
+
+@dataclass
+class StoredUpload:
+    path: str        # absoluter/relativer Pfad auf der Platte
+    relpath: str     # relativ zu root, mit "/" (für url_for('static', …))
+    sha256: str
+    size: int
+    existed: bool    # True → Inhalt lag schon vor (Dedupe)
+
+
+def normalize_ext(ext: str) -> str:
+    ext = (ext or "").lower()
+    return EXT_ALIASES.get(ext, ext)
+
+def relpath_for(digest: str, ext: str) -> str:
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{normalize_ext(ext)}"
+
+def save_stream(stream, root: str, ext: str) -> StoredUpload:
+    """Schreibt `stream` (file-like) nach root und gibt Hash + Zielpfad zurück."""
+    os.makedirs(root, exist_ok=True)
+    h = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(prefix=".upload-", dir=root)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                h.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        digest = h.hexdigest()
+        rel = relpath_for(digest, ext)
+        dest = os.path.join(root, *rel.split("/"))
+        if os.path.exists(dest):
+            os.remove(tmp)
+            return StoredUpload(dest, rel, digest, size, existed=True)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.chmod(tmp, 0o644)   # mkstemp legt 0600 an – Static-Server/Sidecar unter anderem User brauchen Lesezugriff
+        os.replace(tmp, dest)
+        return StoredUpload(dest, rel, digest, size, existed=False)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def save_file_storage(file_storage, root: str) -> StoredUpload:
+    """Werkzeug-FileStorage (request.files[…]) inhaltsadressiert speichern."""
+    ext = os.path.splitext(file_storage.filename or "")[1]
+    return save_stream(file_storage.stream, root, ext)
@@ -0,0 +1,83 @@
+# user_cache.py
+"""
+Kurzlebiger Cache für den eingeloggten User (Flask-Login user_loader).
+
+Statt bei jedem Request den User aus der DB zu lesen, halten wir pro Prozess
+die Spaltenwerte (ohne Passwort-Hash) für USER_CACHE_TTL_SEC Sekunden und
+bauen daraus ein losgelöstes User-Objekt – jeder Request bekommt sein eigenes,
+Änderungen daran (z. B. checkout → s.merge(current_user)) teilen sich nicht.
+
+Invalidierung: jeder Commit, der einen User anlegt/ändert/löscht (Profilbild,
+Stripe-Webhook, Checkout, …), erhöht den geteilten Zähler "users" aus
+result_cache – damit verwerfen alle Worker ihre Einträge.
+"""
+from __future__ import annotations
+import os, threading, time
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as _SASession, make_transient_to_detached
+
+from models import User
+import result_cache
+
+USER_CACHE_TTL_SEC = int(os.getenv("USER_CACHE_TTL_SEC", "60"))
+USER_CACHE_MAX = 1024
+_EXCLUDE = {"password_hash"}
+
+_lock = threading.Lock()
+_cache: dict = {}   # user_id → (ts, version, {spalte: wert})
+
+
+def _snapshot(user: User) -> dict:
+    return {a.key: getattr(user, a.key) for a in inspect(User).column_attrs if a.key not in _EXCLUDE}
+
+def _rebuild(values: dict) -> User:
+    user = User(**values)
+    make_transient_to_detached(user)   # gilt als persistent, ohne Session und ohne DB-Zugriff
+    return user
+
+def invalidate(user_id: Optional[int] = None) -> None:
+    with _lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(int(user_id), None)
+
+def load_user(sess, user_id) -> Optional[User]:
+    try:
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    version = result_cache.current_version("users")
+    with _lock:
+        hit = _cache.get(uid)
+    if hit and hit[1] == version and time.monotonic() - hit[0] < USER_CACHE_TTL_SEC:
+        return _rebuild(hit[2])
+
+    user = sess.get(User, uid)
+    if user is None:
+        return None
+    if version >= 0:
+        with _lock:
+            if len(_cache) >= USER_CACHE_MAX:
+                _cache.pop(next(iter(_cache)))
+            _cache[uid] = (time.monotonic(), version, _snapshot(user))
+    return user
+
+
+# ------------------------------ Invalidierung --------------------------------
+@event.listens_for(_SASession, "after_flush")
+def _mark_user_writes(session, flush_context):
+    if any(isinstance(o, User) for o in (*session.new, *session.dirty, *session.deleted)):
+        session.info["users_dirty"] = True
+
+@event.listens_for(_SASession, "after_commit")
+def _bump_after_commit(session):
+    if session.info.pop("users_dirty", False):
+        invalidate()
+        result_cache.bump_version("users")
+
+@event.listens_for(_SASession, "after_rollback")
+def _reset_after_rollback(session):
+    session.info.pop("users_dirty", None)